@@ -44,12 +44,45 @@ DATABASES = {
 	} 
 } 
 
+# Cache for topic, layout and tile entries. Set CACHE_LOCATION to a
+# directory to share entries and recompute locks between the web and
+# topics_worker processes; without it every process caches on its own.
+# Invalidation does not depend on it: the version counters embedded in
+# the keys live in the database (thoughts_api.DataVersion).
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+CACHES = {
+	'default': {
+		'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+		'LOCATION': CACHE_LOCATION,
+		'OPTIONS': {'MAX_ENTRIES': 10000},
+	} if CACHE_LOCATION else {
+		'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+	}
+}
+
 # Neo4j Configuration 
 NEO4J_URI = os.getenv('NEO4J_URI') 
 NEO4J_USERNAME = os.getenv('NEO4J_USERNAME') 
 NEO4J_PASSWORD = os.getenv('NEO4J_PASSWORD') 
 NEO4J_DATABASE = os.getenv('NEO4J_DATABASE', 'neo4j') 
 
+# Seconds a single Neo4j query may run before the server aborts it
+NEO4J_QUERY_TIMEOUT = float(os.getenv('NEO4J_QUERY_TIMEOUT', '15'))
+# Consecutive outage errors that open the Neo4j circuit breaker, and
+# seconds it stays open before a probe query is let through
+NEO4J_BREAKER_FAILURES = int(os.getenv('NEO4J_BREAKER_FAILURES', '5'))
+NEO4J_BREAKER_RESET_TIMEOUT = float(os.getenv('NEO4J_BREAKER_RESET_TIMEOUT', '30'))
+
+# Default engine behind /api/search/ ('cypher', 'fulltext', 'memory' or
+# 'sqlite'); clients can override it per request with ?mode=. 'sqlite' also
+# backs topic search
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'cypher')
+
+# Where the content list, detail and tag views read from: 'neo4j' queries
+# AuraDB live, 'mirror' serves the Django mirror kept current by the
+# topics_worker sync jobs
+CONTENT_BACKEND = os.getenv('CONTENT_BACKEND', 'neo4j')
+
 AUTH_PASSWORD_VALIDATORS = [ 
 	{ 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', }, 
 	{ 'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', }, 
@@ -0,0 +1,231 @@
+"""
+In-memory adjacency store for node-detail graph expansions.
+
+The whole content graph is loaded once into compact integer ids with
+CSR (compressed sparse row) neighbour arrays, and ego networks around a
+node are answered by a breadth-first walk over those arrays without
+touching Neo4j. The store reloads when the shared content version moves,
+which every sync that changes content bumps.
+"""
+
+from array import array
+from collections import deque
+import threading
+import logging
+
+from thoughts_api.neo4j_service import neo4j_service
+from thoughts_api.snapshot import get_content_version
+from .snapshot import GRAPH_LABELS, NODE_GROUPS, OTHER_GROUP
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 4
+DEFAULT_EGO_NODES = 200
+
+
+class AdjacencyGraph:
+    """
+    Immutable graph with integer node ids and CSR neighbour lists
+
+    Every relationship is stored under both of its ends; ``outgoing`` marks
+    the copy stored under the relationship's start node, so each link can
+    be reported once and in its original direction.
+    """
+
+    def __init__(self, node_rows, link_rows):
+        self.keys = []        # node id -> (type, name)
+        self.index = {}       # (type, name) -> node id
+        self.by_name = {}     # name -> [node ids], names are unique per label only
+        self.titles = []
+        self.levels = []
+        self.tags = []
+        self.type_names = list(GRAPH_LABELS)
+        type_codes = {name: code for code, name in enumerate(self.type_names)}
+        self.types = array('B')
+        for row in node_rows:
+            key = (row['type'], row['id'])
+            if row['id'] is None or key in self.index:
+                continue
+            node = len(self.keys)
+            self.index[key] = node
+            self.keys.append(key)
+            self.by_name.setdefault(row['id'], []).append(node)
+            self.titles.append(row.get('title'))
+            self.levels.append(row.get('level'))
+            self.tags.append(row.get('tags'))
+            if row['type'] not in type_codes:
+                type_codes[row['type']] = len(self.type_names)
+                self.type_names.append(row['type'])
+            self.types.append(type_codes[row['type']])
+
+        self.rel_types = []
+        rel_codes = {}
+        edges = []
+        for row in link_rows:
+            source = self.index.get((row['source_type'], row['source']))
+            target = self.index.get((row['target_type'], row['target']))
+            if source is None or target is None:
+                continue
+            if row['type'] not in rel_codes:
+                rel_codes[row['type']] = len(self.rel_types)
+                self.rel_types.append(row['type'])
+            edges.append((source, target, rel_codes[row['type']]))
+
+        # Counting sort of both edge directions into CSR arrays
+        n_nodes = len(self.keys)
+        self.offsets = array('l', [0] * (n_nodes + 1))
+        for source, target, _ in edges:
+            self.offsets[source + 1] += 1
+            self.offsets[target + 1] += 1
+        for node in range(n_nodes):
+            self.offsets[node + 1] += self.offsets[node]
+        size = self.offsets[n_nodes]
+        self.neighbors = array('l', [0] * size)
+        self.edge_types = array('H', [0] * size)
+        self.outgoing = array('b', [0] * size)
+        fill = array('l', self.offsets[:n_nodes])
+        for source, target, rel in edges:
+            for node, other, out in ((source, target, 1), (target, source, 0)):
+                slot = fill[node]
+                self.neighbors[slot] = other
+                self.edge_types[slot] = rel
+                self.outgoing[slot] = out
+                fill[node] = slot + 1
+        self.link_count = len(edges)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def find(self, name, node_type=None):
+        """Node id for a name, or None; without a type the first label wins"""
+        if node_type:
+            return self.index.get((node_type, name))
+        nodes = self.by_name.get(name)
+        return nodes[0] if nodes else None
+
+    def node_type(self, node):
+        return self.type_names[self.types[node]]
+
+    def ego_network(self, center, depth=DEFAULT_DEPTH, types=None, max_nodes=DEFAULT_EGO_NODES):
+        """
+        Nodes within ``depth`` hops of ``center`` and the links among them
+
+        Args:
+            center: Node id to expand around
+            depth: Maximum hop count
+            types: Optional node labels to keep; other nodes are neither
+                returned nor walked through
+            max_nodes: Node budget; nearer nodes are taken first
+
+        Returns:
+            Dict with 'nodes', 'links' and 'meta' like the overview snapshot
+        """
+        allowed = None
+        if types:
+            allowed = {code for code, name in enumerate(self.type_names) if name in types}
+        hops = {center: 0}
+        order = [center]
+        queue = deque([center])
+        truncated = False
+        while queue and not truncated:
+            node = queue.popleft()
+            if hops[node] >= depth:
+                continue
+            for slot in range(self.offsets[node], self.offsets[node + 1]):
+                other = self.neighbors[slot]
+                if other in hops or (allowed is not None and self.types[other] not in allowed):
+                    continue
+                if len(order) >= max_nodes:
+                    truncated = True
+                    break
+                hops[other] = hops[node] + 1
+                order.append(other)
+                queue.append(other)
+
+        nodes = []
+        links = []
+        for node in order:
+            node_type = self.node_type(node)
+            nodes.append({
+                'id': self.keys[node][1],
+                'title': self.titles[node],
+                'type': node_type,
+                'level': self.levels[node],
+                'tags': self.tags[node],
+                'group': NODE_GROUPS.get(node_type, OTHER_GROUP),
+                'hops': hops[node],
+            })
+            for slot in range(self.offsets[node], self.offsets[node + 1]):
+                other = self.neighbors[slot]
+                if self.outgoing[slot] and other in hops:
+                    links.append({
+                        'source': self.keys[node][1],
+                        'target': self.keys[other][1],
+                        'type': self.rel_types[self.edge_types[slot]],
+                    })
+        return {
+            'nodes': nodes,
+            'links': links,
+            'meta': {
+                'node_count': len(nodes),
+                'link_count': len(links),
+                'truncated': truncated,
+            },
+        }
+
+
+class AdjacencyStore:
+    """
+    Lazily loaded AdjacencyGraph, reloaded when the content version moves
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self._graph = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        node_rows = []
+        link_rows = []
+        for label in GRAPH_LABELS:
+            node_rows.extend(self.service.stream_query(*self.service.adjacency_nodes_query(label)))
+        for label in GRAPH_LABELS:
+            link_rows.extend(self.service.stream_query(*self.service.adjacency_links_query(label, GRAPH_LABELS)))
+        graph = AdjacencyGraph(node_rows, link_rows)
+        logger.info(f"Loaded adjacency graph with {len(graph)} nodes, {graph.link_count} links")
+        return graph
+
+    def get_graph(self):
+        """Current graph, reloading it if content changed since it was built"""
+        version = get_content_version()
+        if self._graph is not None and self._version == version:
+            return self._graph
+        with self._lock:
+            if self._graph is None or self._version != version:
+                self._graph = self.load()
+                self._version = version
+            return self._graph
+
+    def invalidate(self):
+        with self._lock:
+            self._graph = None
+
+    def ego_network(self, node_id, node_type=None, depth=DEFAULT_DEPTH, types=None,
+                    max_nodes=DEFAULT_EGO_NODES):
+        """
+        Ego network around a node by name
+
+        Returns:
+            Graph dict, or None if the node is unknown
+        """
+        graph = self.get_graph()
+        center = graph.find(node_id, node_type)
+        if center is None:
+            return None
+        return graph.ego_network(center, depth=depth, types=types, max_nodes=max_nodes)
+
+
+# Global adjacency store instance
+adjacency_store = AdjacencyStore(neo4j_service)
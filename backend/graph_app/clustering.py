@@ -0,0 +1,240 @@
+"""
+Level-of-detail views of the content graph.
+
+The adjacency graph is folded into a forest along its hierarchy
+relationships (TOPIC -HAS_CHILD-> item, item -HAS_CONTENT-> body, ...).
+A view shows at most ``budget`` items: it starts from the roots and
+keeps expanding the largest collapsed subtree whose children still fit.
+Subtrees that stay collapsed are sent as one supernode carrying their
+size, and links between hidden nodes are aggregated onto the visible
+items that contain them. Expanding a supernode is the same view rooted
+at that node, so every response stays within the budget however large
+the corpus grows.
+"""
+
+from array import array
+from collections import defaultdict
+import hashlib
+import heapq
+import threading
+import logging
+
+from django.core.cache import cache
+
+from thoughts_api.snapshot import get_content_version
+from .adjacency import adjacency_store
+from .snapshot import NODE_GROUPS, OTHER_GROUP
+
+logger = logging.getLogger(__name__)
+
+# Relationships that make their end node a child of their start node,
+# most authoritative first when a node has several parents
+HIERARCHY_RELATIONSHIPS = ('HAS_CHILD', 'HAS_THOUGHT', 'HAS_DESCRIPTION', 'HAS_CONTENT')
+
+DEFAULT_BUDGET = 150
+MAX_BUDGET = 2000
+
+LOD_CACHE_PREFIX = 'graph:lod:'
+LOD_CACHE_TIMEOUT = 60 * 60
+
+
+class ClusterTree:
+    """
+    Spanning forest of an AdjacencyGraph along its hierarchy relationships
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        n_nodes = len(graph)
+        rank = {
+            graph.rel_types.index(rel): i
+            for i, rel in enumerate(HIERARCHY_RELATIONSHIPS) if rel in graph.rel_types
+        }
+
+        # Each node's parent is the start of its best-ranked incoming
+        # hierarchy relationship
+        self.parent = array('l', [-1] * n_nodes)
+        best = [len(HIERARCHY_RELATIONSHIPS)] * n_nodes
+        for node in range(n_nodes):
+            for slot in range(graph.offsets[node], graph.offsets[node + 1]):
+                rel_rank = rank.get(graph.edge_types[slot])
+                if rel_rank is None or graph.outgoing[slot] or rel_rank >= best[node]:
+                    continue
+                other = graph.neighbors[slot]
+                if other != node:
+                    best[node] = rel_rank
+                    self.parent[node] = other
+        self._break_cycles()
+
+        self.children = defaultdict(list)
+        for node in range(n_nodes):
+            if self.parent[node] >= 0:
+                self.children[self.parent[node]].append(node)
+        self.roots = [node for node in range(n_nodes) if self.parent[node] < 0]
+
+        # Subtree sizes, children before parents
+        self.size = array('l', [1] * n_nodes)
+        for node in reversed(self._preorder(self.roots)):
+            if self.parent[node] >= 0:
+                self.size[self.parent[node]] += self.size[node]
+        for kids in self.children.values():
+            kids.sort(key=lambda kid: (-self.size[kid], graph.keys[kid][1]))
+        self.roots.sort(key=lambda root: (-self.size[root], graph.keys[root][1]))
+
+    def _break_cycles(self):
+        # Parent links may loop if the data does; cut each loop once
+        state = [0] * len(self.parent)  # 0 unseen, 1 on current walk, 2 done
+        for start in range(len(self.parent)):
+            walk = []
+            node = start
+            while node >= 0 and state[node] == 0:
+                state[node] = 1
+                walk.append(node)
+                node = self.parent[node]
+            if node >= 0 and state[node] == 1:
+                self.parent[node] = -1
+            for visited in walk:
+                state[visited] = 2
+
+    def _preorder(self, roots):
+        order = []
+        stack = list(reversed(roots))
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(reversed(self.children.get(node, ())))
+        return order
+
+    def view(self, roots=None, budget=DEFAULT_BUDGET):
+        """
+        Level-of-detail view below the given roots
+
+        Args:
+            roots: Node ids to start from; the forest roots by default
+            budget: Maximum number of visible items
+
+        Returns:
+            Dict with 'nodes', 'links' and 'meta' like the overview snapshot;
+            collapsed nodes have cluster=True and the size of their subtree
+        """
+        graph = self.graph
+        roots = list(self.roots if roots is None else roots)
+        truncated = len(roots) > budget
+        visible = roots[:budget]
+        expanded = set()
+        heap = [(-self.size[node], node) for node in visible if node in self.children]
+        heapq.heapify(heap)
+        while heap:
+            _, node = heapq.heappop(heap)
+            kids = self.children[node]
+            if len(visible) + len(kids) > budget:
+                continue
+            expanded.add(node)
+            visible.extend(kids)
+            for kid in kids:
+                if kid in self.children:
+                    heapq.heappush(heap, (-self.size[kid], kid))
+
+        # Every node is represented by the visible item containing it
+        rep = array('l', [-1] * len(graph))
+        for node in visible:
+            rep[node] = node
+        for node in visible:
+            if node in self.children and node not in expanded:
+                for hidden in self._preorder(self.children[node]):
+                    rep[hidden] = node
+
+        links = {}
+        for node in range(len(graph)):
+            source = rep[node]
+            if source < 0:
+                continue
+            for slot in range(graph.offsets[node], graph.offsets[node + 1]):
+                target = rep[graph.neighbors[slot]]
+                if not graph.outgoing[slot] or target < 0 or target == source:
+                    continue
+                link = links.get((source, target))
+                if link is None:
+                    links[(source, target)] = link = {
+                        'source': graph.keys[source][1],
+                        'target': graph.keys[target][1],
+                        'type': graph.rel_types[graph.edge_types[slot]],
+                        'weight': 0,
+                    }
+                link['weight'] += 1
+
+        nodes = []
+        for node in visible:
+            node_type = graph.node_type(node)
+            collapsed = node in self.children and node not in expanded
+            nodes.append({
+                'id': graph.keys[node][1],
+                'title': graph.titles[node],
+                'type': node_type,
+                'level': graph.levels[node],
+                'tags': graph.tags[node],
+                'group': NODE_GROUPS.get(node_type, OTHER_GROUP),
+                'cluster': collapsed,
+                'size': self.size[node] if collapsed else 1,
+            })
+        return {
+            'nodes': nodes,
+            'links': list(links.values()),
+            'meta': {
+                'node_count': len(nodes),
+                'link_count': len(links),
+                'truncated': truncated,
+                'budget': budget,
+            },
+        }
+
+
+class ClusterIndex:
+    """
+    ClusterTree over the adjacency store's current graph, with views cached
+    in the Django cache per content version
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._tree = None
+        self._lock = threading.Lock()
+
+    def get_tree(self):
+        graph = self.store.get_graph()
+        tree = self._tree
+        if tree is None or tree.graph is not graph:
+            with self._lock:
+                if self._tree is None or self._tree.graph is not graph:
+                    self._tree = ClusterTree(graph)
+                    logger.info(f"Built cluster tree with {len(self._tree.roots)} roots")
+                tree = self._tree
+        return tree
+
+    def view(self, node_id=None, node_type=None, budget=DEFAULT_BUDGET):
+        """
+        Level-of-detail view of the whole graph, or expanded below a node
+
+        Returns:
+            Graph dict, or None if node_id is given but unknown
+        """
+        variant = repr((node_id, node_type, budget)).encode('utf-8')
+        key = f"{LOD_CACHE_PREFIX}v{get_content_version()}:{hashlib.md5(variant).hexdigest()}"
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        tree = self.get_tree()
+        roots = None
+        if node_id is not None:
+            center = tree.graph.find(node_id, node_type)
+            if center is None:
+                return None
+            roots = [center]
+        result = tree.view(roots, budget)
+        cache.set(key, result, LOD_CACHE_TIMEOUT)
+        return result
+
+
+# Global cluster index instance
+cluster_index = ClusterIndex(adjacency_store)
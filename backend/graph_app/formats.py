@@ -0,0 +1,186 @@
+"""
+Compact encodings of {nodes, links} graph payloads.
+
+``format=columnar`` sends one array per field instead of one object per
+node and link: strings (ids, titles, tags, node and link types) are
+interned into a single table and referenced by index, link ends are node
+positions, levels and groups are plain integer arrays, and each node's
+tags are a list of string indices.
+
+``format=binary`` packs the same columns into little-endian typed
+arrays, each section aligned to 4 bytes so a browser can view them
+with Int32Array/Uint32Array/Int16Array/Uint8Array without copying:
+
+    magic 'BOTG', u8 version, 3 pad bytes
+    u32 string count, u32 node count, u32 link count, u32 string bytes
+    u32[string count + 1] string offsets, then UTF-8 string bytes (padded)
+    i32[nodes] id, i32[nodes] title, i32[nodes] type
+    i16[nodes] level (padded), u8[nodes] group (padded)
+    u32[nodes + 1] tag offsets, i32[last offset] tags: the tags of node i
+    are the string indices tags[offsets[i]:offsets[i + 1]]
+    u32[links] source, u32[links] target, i32[links] type
+    u32 trailer length, UTF-8 JSON {meta, columns, link_columns} holding
+    any extra per-node and per-link fields (EXTRA_NODE_FIELDS and
+    EXTRA_LINK_FIELDS)
+
+Missing strings are -1 and missing levels are LEVEL_NONE.
+"""
+
+from array import array
+import json
+import struct
+import sys
+
+from django.http import HttpResponse, JsonResponse
+
+GRAPH_FORMATS = ('json', 'columnar', 'binary')
+BINARY_MAGIC = b'BOTG'
+BINARY_VERSION = 2
+BINARY_CONTENT_TYPE = 'application/octet-stream'
+LEVEL_NONE = -1
+# Optional per-node and per-link fields, sent as extra columns when every
+# node (link) has them: layout positions, ego-network hops, LOD clusters,
+# tile edges
+EXTRA_NODE_FIELDS = ('x', 'y', 'hops', 'cluster', 'size', 'external')
+EXTRA_LINK_FIELDS = ('weight',)
+
+
+class StringTable:
+    """Interns strings to their position in a shared table"""
+
+    def __init__(self):
+        self.strings = []
+        self._index = {}
+
+    def intern(self, value):
+        if value is None:
+            return -1
+        value = str(value)
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+
+def _tag_list(tags):
+    if not tags:
+        return []
+    return [tags] if isinstance(tags, str) else list(tags)
+
+
+def to_columnar(graph):
+    """
+    Convert a {nodes, links} graph to columnar form
+
+    Links whose ends are not among the nodes are dropped.
+    """
+    table = StringTable()
+    nodes = graph.get('nodes', [])
+    positions = {}
+    columns = {'id': [], 'title': [], 'type': [], 'level': [], 'group': [], 'tags': []}
+    for node in nodes:
+        positions.setdefault(node['id'], len(columns['id']))
+        columns['id'].append(table.intern(node['id']))
+        columns['title'].append(table.intern(node.get('title')))
+        columns['type'].append(table.intern(node.get('type')))
+        level = node.get('level')
+        columns['level'].append(LEVEL_NONE if level is None else int(level))
+        columns['group'].append(int(node.get('group') or 0))
+        columns['tags'].append([table.intern(tag) for tag in _tag_list(node.get('tags'))])
+
+    link_columns = {'source': [], 'target': [], 'type': []}
+    kept = []
+    for link in graph.get('links', []):
+        source = positions.get(link['source'])
+        target = positions.get(link['target'])
+        if source is None or target is None:
+            continue
+        link_columns['source'].append(source)
+        link_columns['target'].append(target)
+        link_columns['type'].append(table.intern(link.get('type')))
+        kept.append(link)
+
+    for field in EXTRA_NODE_FIELDS:
+        if nodes and all(field in node for node in nodes):
+            columns[field] = [node[field] for node in nodes]
+    for field in EXTRA_LINK_FIELDS:
+        if kept and all(field in link for link in kept):
+            link_columns[field] = [link[field] for link in kept]
+
+    return {
+        'format': 'columnar',
+        'strings': table.strings,
+        'nodes': columns,
+        'links': link_columns,
+        'meta': graph.get('meta', {}),
+    }
+
+
+def _pack(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    data = packed.tobytes()
+    return data + b'\0' * (-len(data) % 4)
+
+
+def to_binary(graph):
+    """Encode a {nodes, links} graph in the binary columnar layout"""
+    columnar = to_columnar(graph)
+    encoded = [s.encode('utf-8') for s in columnar['strings']]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    string_bytes = b''.join(encoded)
+    nodes = columnar['nodes']
+    links = columnar['links']
+    tag_offsets = [0]
+    tags = []
+    for node_tags in nodes['tags']:
+        tags.extend(node_tags)
+        tag_offsets.append(len(tags))
+
+    parts = [
+        BINARY_MAGIC,
+        struct.pack('<B3x', BINARY_VERSION),
+        struct.pack('<IIII', len(encoded), len(nodes['id']), len(links['source']), len(string_bytes)),
+        _pack('I', offsets),
+        string_bytes + b'\0' * (-len(string_bytes) % 4),
+        _pack('i', nodes['id']),
+        _pack('i', nodes['title']),
+        _pack('i', nodes['type']),
+        _pack('h', nodes['level']),
+        _pack('B', nodes['group']),
+        _pack('I', tag_offsets),
+        _pack('i', tags),
+        _pack('I', links['source']),
+        _pack('I', links['target']),
+        _pack('i', links['type']),
+    ]
+    trailer = {
+        'meta': columnar['meta'],
+        'columns': {field: nodes[field] for field in EXTRA_NODE_FIELDS if field in nodes},
+        'link_columns': {field: links[field] for field in EXTRA_LINK_FIELDS if field in links},
+    }
+    meta = json.dumps(trailer, separators=(',', ':')).encode('utf-8')
+    parts.append(struct.pack('<I', len(meta)))
+    parts.append(meta)
+    return b''.join(parts)
+
+
+def get_graph_format(request):
+    """Requested graph format; raises ValueError for unknown formats"""
+    fmt = request.GET.get('format', 'json')
+    if fmt not in GRAPH_FORMATS:
+        raise ValueError(f"Unknown graph format: {fmt}")
+    return fmt
+
+
+def graph_response(graph, fmt='json'):
+    """Render a {nodes, links} graph as an HTTP response in the given format"""
+    if fmt == 'binary':
+        return HttpResponse(to_binary(graph), content_type=BINARY_CONTENT_TYPE)
+    if fmt == 'columnar':
+        return JsonResponse(to_columnar(graph))
+    return JsonResponse(graph, safe=False)
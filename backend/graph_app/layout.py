@@ -0,0 +1,198 @@
+"""
+Server-side force-directed layout for graph snapshots.
+
+Positions are computed with a NumPy-vectorized Fruchterman-Reingold
+layout (exact repulsion for small graphs, a single-level Barnes-Hut
+grid approximation for large ones) and cached in the Django cache per content version and snapshot
+parameters, so every worker reuses one layout until content changes.
+Coordinates are centred on the origin with an ideal link length of
+LINK_DISTANCE, matching the client's d3 link force; clients translate
+them into view and only run a few refinement ticks.
+"""
+
+import hashlib
+import logging
+
+import numpy as np
+from django.core.cache import cache
+
+from thoughts_api.snapshot import get_content_version
+
+logger = logging.getLogger(__name__)
+
+LINK_DISTANCE = 100.0
+ITERATIONS = 100
+MIN_ITERATIONS = 50
+# Rows of the pairwise repulsion computed at once; bounds temporary
+# memory to about BLOCK_SIZE * nodes * 24 bytes
+BLOCK_SIZE = 256
+# Above this many nodes repulsion is approximated on a grid
+EXACT_REPULSION_LIMIT = 1000
+NODES_PER_CELL = 16
+MIN_DISTANCE2 = 1e-2
+# Pull towards the origin; balances repulsion at a radius of about
+# LINK_DISTANCE * sqrt(nodes / GRAVITY)
+GRAVITY = 1.0
+
+LAYOUT_CACHE_PREFIX = 'graph:layout:'
+LAYOUT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def iterations_for(n_nodes):
+    """Fewer passes for large graphs to bound the time of a rebuild"""
+    if n_nodes <= 1000:
+        return ITERATIONS
+    return max(MIN_ITERATIONS, int(ITERATIONS * 1000 / n_nodes))
+
+
+def _exact_repulsion(pos, disp, k2):
+    """Repulsion k^2 / d between every pair, one block of rows at a time"""
+    x, y = pos[:, 0], pos[:, 1]
+    for start in range(0, len(pos), BLOCK_SIZE):
+        stop = start + BLOCK_SIZE
+        dx = x[start:stop, None] - x[None, :]
+        dy = y[start:stop, None] - y[None, :]
+        weight = k2 / np.maximum(dx * dx + dy * dy, MIN_DISTANCE2)
+        disp[start:stop, 0] += (dx * weight).sum(axis=1)
+        disp[start:stop, 1] += (dy * weight).sum(axis=1)
+
+
+def _grid_repulsion(pos, disp, k2):
+    """
+    Single-level Barnes-Hut approximation of the pairwise repulsion
+
+    Nodes are bucketed into a square grid. Each node is pushed exactly by
+    the other nodes in its own cell and by every other cell as one body
+    of the cell's mass at its centroid.
+    """
+    n_nodes = len(pos)
+    side = max(2, int(np.sqrt(n_nodes / NODES_PER_CELL)))
+    low = pos.min(axis=0)
+    span = max(float((pos.max(axis=0) - low).max()), 1e-9)
+    grid = np.minimum(((pos - low) / span * side).astype(np.intp), side - 1)
+    cell = grid[:, 0] * side + grid[:, 1]
+
+    counts = np.bincount(cell, minlength=side * side)
+    occupied = np.nonzero(counts)[0]
+    mass = counts[occupied].astype(float)
+    center_x = np.bincount(cell, pos[:, 0], side * side)[occupied] / mass
+    center_y = np.bincount(cell, pos[:, 1], side * side)[occupied] / mass
+    own = np.searchsorted(occupied, cell)
+
+    x, y = pos[:, 0], pos[:, 1]
+    for start in range(0, n_nodes, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, n_nodes)
+        dx = x[start:stop, None] - center_x[None, :]
+        dy = y[start:stop, None] - center_y[None, :]
+        weight = k2 * mass / np.maximum(dx * dx + dy * dy, MIN_DISTANCE2)
+        weight[np.arange(stop - start), own[start:stop]] = 0
+        disp[start:stop, 0] += (dx * weight).sum(axis=1)
+        disp[start:stop, 1] += (dy * weight).sum(axis=1)
+
+    order = np.argsort(cell, kind='stable')
+    bounds = np.cumsum(counts[occupied])
+    for end, size in zip(bounds, counts[occupied]):
+        if size > 1:
+            members = order[end - size:end]
+            _exact_repulsion_within(pos, disp, members, k2)
+
+
+def _exact_repulsion_within(pos, disp, members, k2):
+    local = pos[members]
+    dx = local[:, None, 0] - local[None, :, 0]
+    dy = local[:, None, 1] - local[None, :, 1]
+    weight = k2 / np.maximum(dx * dx + dy * dy, MIN_DISTANCE2)
+    disp[members, 0] += (dx * weight).sum(axis=1)
+    disp[members, 1] += (dy * weight).sum(axis=1)
+
+
+def force_layout(n_nodes, sources, targets, iterations=None, seed=0):
+    """
+    Fruchterman-Reingold layout
+
+    Args:
+        n_nodes: Number of nodes
+        sources: Link start positions (node indexes)
+        targets: Link end positions (node indexes)
+        iterations: Number of passes; defaults to iterations_for(n_nodes)
+        seed: Seed for the initial positions, so layouts are reproducible
+
+    Returns:
+        float array of shape (n_nodes, 2)
+    """
+    if n_nodes == 0:
+        return np.zeros((0, 2))
+    if iterations is None:
+        iterations = iterations_for(n_nodes)
+    k = LINK_DISTANCE
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-0.5, 0.5, (n_nodes, 2)) * k * np.sqrt(n_nodes)
+    sources = np.asarray(sources, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+
+    temperature = k * np.sqrt(n_nodes) / 10
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+        if n_nodes <= EXACT_REPULSION_LIMIT:
+            _exact_repulsion(pos, disp, k * k)
+        else:
+            _grid_repulsion(pos, disp, k * k)
+        # Attraction d^2 / k along links
+        if len(sources):
+            delta = pos[sources] - pos[targets]
+            dist = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+            force = delta * (dist / k)[:, None]
+            np.subtract.at(disp, sources, force)
+            np.add.at(disp, targets, force)
+        # Gravity towards the origin keeps disconnected parts from drifting
+        disp -= GRAVITY * pos
+        # Move each node at most `temperature`
+        length = np.maximum(np.sqrt(np.einsum('ij,ij->i', disp, disp)), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    return pos - pos.mean(axis=0)
+
+
+def _cache_key(version, variant):
+    digest = hashlib.md5(repr(variant).encode('utf-8')).hexdigest()
+    return f"{LAYOUT_CACHE_PREFIX}v{version}:{digest}"
+
+
+def apply_layout(graph, variant=()):
+    """
+    Add x and y to every node of a {nodes, links} graph
+
+    Args:
+        graph: Graph dict; nodes are updated in place
+        variant: Hashable description of how the graph was built (filters,
+            caps), so differently built graphs get their own cached layout
+
+    Returns:
+        The graph
+    """
+    nodes = graph['nodes']
+    version = get_content_version()
+    key = _cache_key(version, variant)
+    positions = cache.get(key)
+    if positions is None or any(node['id'] not in positions for node in nodes):
+        index = {node['id']: i for i, node in enumerate(nodes)}
+        sources = []
+        targets = []
+        for link in graph['links']:
+            if link['source'] in index and link['target'] in index:
+                sources.append(index[link['source']])
+                targets.append(index[link['target']])
+        coords = force_layout(len(nodes), sources, targets)
+        positions = {
+            node['id']: (round(float(x), 1), round(float(y), 1))
+            for node, (x, y) in zip(nodes, coords)
+        }
+        cache.set(key, positions, LAYOUT_CACHE_TIMEOUT)
+        logger.info(f"Computed layout for {len(nodes)} nodes at content v{version}")
+
+    for node in nodes:
+        node['x'], node['y'] = positions[node['id']]
+    graph.setdefault('meta', {})['layout'] = {'version': version, 'link_distance': LINK_DISTANCE}
+    return graph
@@ -0,0 +1,187 @@
+"""
+Overview graph snapshot for the visualization.
+
+Nodes and links are fetched in separate streamed, label-scoped queries and
+assembled into {nodes, links} here in a single pass over each stream, so
+building the overview is linear in what is returned. Node and link caps
+stop the streams early instead of trimming an aggregated result.
+"""
+
+from contextlib import aclosing
+import logging
+
+from asgiref.sync import sync_to_async
+
+from .layout import apply_layout
+
+logger = logging.getLogger(__name__)
+
+# Node labels in the graph, in the order nodes are taken when capped.
+# A node's group (used for colouring) is its position, starting at 1.
+GRAPH_LABELS = ('TOPIC', 'THOUGHT', 'QUOTE', 'PASSAGE', 'CONTENT', 'DESCRIPTION')
+NODE_GROUPS = {label: group for group, label in enumerate(GRAPH_LABELS, start=1)}
+OTHER_GROUP = len(GRAPH_LABELS) + 1
+
+DEFAULT_MAX_NODES = 500
+DEFAULT_MAX_LINKS = 2000
+
+
+def graph_labels(types=None):
+    """Labels to include, in GRAPH_LABELS order; all of them when types is empty"""
+    if not types:
+        return list(GRAPH_LABELS)
+    unknown = set(types) - set(GRAPH_LABELS)
+    if unknown:
+        raise ValueError(f"Unsupported node type: {', '.join(sorted(unknown))}")
+    return [label for label in GRAPH_LABELS if label in types]
+
+
+class GraphSnapshotBuilder:
+    """
+    Accumulates streamed node and link rows into a capped {nodes, links} graph
+    """
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES, max_links=DEFAULT_MAX_LINKS):
+        self.max_nodes = max_nodes
+        self.max_links = max_links
+        self.nodes = []
+        self.links = []
+        self.node_ids = set()
+        self._link_keys = set()
+        self.nodes_truncated = False
+        self.links_truncated = False
+
+    @property
+    def truncated(self):
+        return self.nodes_truncated or self.links_truncated
+
+    @property
+    def nodes_remaining(self):
+        return self.max_nodes - len(self.nodes)
+
+    @property
+    def links_remaining(self):
+        return self.max_links - len(self.links)
+
+    def add_node(self, row):
+        """Add a node row; returns False once the node cap is reached"""
+        if row['id'] is None or row['id'] in self.node_ids:
+            return True
+        if not self.nodes_remaining:
+            self.nodes_truncated = True
+            return False
+        self.node_ids.add(row['id'])
+        self.nodes.append({
+            'id': row['id'],
+            'title': row.get('title'),
+            'type': row['type'],
+            'level': row.get('level'),
+            'tags': row.get('tags'),
+            'group': NODE_GROUPS.get(row['type'], OTHER_GROUP),
+        })
+        return True
+
+    def add_link(self, row):
+        """Add a link row; returns False once the link cap is reached"""
+        key = (row['source'], row['target'], row['type'])
+        if key in self._link_keys:
+            return True
+        if row['source'] not in self.node_ids or row['target'] not in self.node_ids:
+            return True
+        if not self.links_remaining:
+            self.links_truncated = True
+            return False
+        self._link_keys.add(key)
+        self.links.append({'source': row['source'], 'target': row['target'], 'type': row['type']})
+        return True
+
+    def result(self):
+        return {
+            'nodes': self.nodes,
+            'links': self.links,
+            'meta': {
+                'node_count': len(self.nodes),
+                'link_count': len(self.links),
+                'truncated': self.truncated,
+            },
+        }
+
+
+def _layout_variant(labels, max_nodes, max_links):
+    return ('overview', tuple(labels), max_nodes, max_links)
+
+
+def build_graph_snapshot(service, types=None, max_nodes=DEFAULT_MAX_NODES,
+                         max_links=DEFAULT_MAX_LINKS, layout=False):
+    """
+    Build the overview graph with a Neo4jService
+
+    Args:
+        service: Service providing stream_query and the graph Cypher builders
+        types: Optional node labels to include
+        max_nodes: Maximum number of nodes returned
+        max_links: Maximum number of links returned
+        layout: Whether to add precomputed x/y positions to the nodes
+
+    Returns:
+        Dict with 'nodes', 'links' and 'meta' (counts and whether a cap was hit)
+    """
+    labels = graph_labels(types)
+    builder = GraphSnapshotBuilder(max_nodes, max_links)
+
+    for label in labels:
+        # One row past the cap tells us whether anything was left out
+        query = service.graph_nodes_query(label, builder.nodes_remaining + 1)
+        for row in service.stream_query(*query):
+            if not builder.add_node(row):
+                break
+        if builder.nodes_truncated:
+            break
+
+    for label in labels:
+        if not builder.node_ids:
+            break
+        query = service.graph_links_query(label, labels, builder.node_ids, builder.links_remaining + 1)
+        for row in service.stream_query(*query):
+            if not builder.add_link(row):
+                break
+        if builder.links_truncated:
+            break
+
+    logger.debug(f"Built graph snapshot with {len(builder.nodes)} nodes, {len(builder.links)} links")
+    graph = builder.result()
+    if layout:
+        apply_layout(graph, _layout_variant(labels, max_nodes, max_links))
+    return graph
+
+
+async def abuild_graph_snapshot(service, types=None, max_nodes=DEFAULT_MAX_NODES,
+                                max_links=DEFAULT_MAX_LINKS, layout=False):
+    """Async variant of build_graph_snapshot for the AsyncNeo4jService"""
+    labels = graph_labels(types)
+    builder = GraphSnapshotBuilder(max_nodes, max_links)
+
+    for label in labels:
+        query = service.graph_nodes_query(label, builder.nodes_remaining + 1)
+        async with aclosing(service.stream_query(*query)) as rows:
+            async for row in rows:
+                if not builder.add_node(row):
+                    break
+        if builder.nodes_truncated:
+            break
+
+    for label in labels:
+        if not builder.node_ids:
+            break
+        query = service.graph_links_query(label, labels, builder.node_ids, builder.links_remaining + 1)
+        async with aclosing(service.stream_query(*query)) as rows:
+            async for row in rows:
+                if not builder.add_link(row):
+                    break
+        if builder.links_truncated:
+            break
+
+    graph = builder.result()
+    if layout:
+        await sync_to_async(apply_layout)(graph, _layout_variant(labels, max_nodes, max_links))
+    return graph
@@ -0,0 +1,228 @@
+"""
+Spatial index and map-style tiles over the laid-out content graph.
+
+Every node of the adjacency graph gets a position from the server-side
+layout. Nodes are bucketed into a uniform grid with one cell per tile at
+MAX_ZOOM, so a tile or bounding box is answered by slicing the cells it
+covers. Tiles use z/x/y addressing over the square world bounds: at zoom
+z the world is split into 2^z x 2^z tiles. A tile returns its nodes,
+highest degree first and capped at TILE_NODE_LIMIT so low zoom levels
+show the hubs, plus the links incident to them. Tiles are cached per
+content version, so panning and zooming become small cacheable requests.
+"""
+
+import threading
+import logging
+
+import numpy as np
+from django.core.cache import cache
+
+from thoughts_api.snapshot import get_content_version
+from .adjacency import adjacency_store
+from .layout import force_layout
+from .snapshot import NODE_GROUPS, OTHER_GROUP
+
+logger = logging.getLogger(__name__)
+
+MAX_ZOOM = 8
+TILE_NODE_LIMIT = 300
+TILE_LINK_LIMIT = 1500
+
+TILE_CACHE_PREFIX = 'graph:tile:'
+TILE_CACHE_TIMEOUT = 60 * 60
+POSITIONS_CACHE_PREFIX = 'graph:tile-layout:'
+POSITIONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class TileIndex:
+    """
+    Grid index over node positions of an AdjacencyGraph
+    """
+
+    def __init__(self, graph, positions):
+        self.graph = graph
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.degree = np.diff(np.asarray(graph.offsets, dtype=np.int64))
+
+        if len(self.positions):
+            low = self.positions.min(axis=0)
+            span = float((self.positions.max(axis=0) - low).max())
+        else:
+            low, span = np.zeros(2), 0.0
+        self.origin = low
+        # Pad so the farthest node falls inside the last cell
+        self.extent = max(span, 1.0) * (1 + 1e-6)
+
+        self.side = 2 ** MAX_ZOOM
+        cells = self._cells(self.positions)
+        keys = cells[:, 0] * self.side + cells[:, 1]
+        # Within a cell, higher degree first
+        self.order = np.lexsort((-self.degree, keys))
+        self.keys = keys[self.order]
+
+    def _cells(self, points):
+        scaled = (points - self.origin) / self.extent * self.side
+        return np.clip(np.floor(scaled).astype(np.int64), 0, self.side - 1)
+
+    @property
+    def bounds(self):
+        min_x, min_y = self.origin
+        return [float(min_x), float(min_y), float(min_x + self.extent), float(min_y + self.extent)]
+
+    def tile_bounds(self, z, x, y):
+        size = self.extent / 2 ** z
+        min_x = self.origin[0] + x * size
+        min_y = self.origin[1] + y * size
+        return [float(min_x), float(min_y), float(min_x + size), float(min_y + size)]
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """Node ids inside a bounding box, in no particular order"""
+        low, high = self._cells(np.array([[min_x, min_y], [max_x, max_y]], dtype=float))
+        found = []
+        for cx in range(low[0], high[0] + 1):
+            start = np.searchsorted(self.keys, cx * self.side + low[1], side='left')
+            stop = np.searchsorted(self.keys, cx * self.side + high[1], side='right')
+            if stop > start:
+                found.append(self.order[start:stop])
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        nodes = np.concatenate(found)
+        points = self.positions[nodes]
+        inside = ((points[:, 0] >= min_x) & (points[:, 0] < max_x)
+                  & (points[:, 1] >= min_y) & (points[:, 1] < max_y))
+        return nodes[inside]
+
+    def tile(self, z, x, y):
+        """
+        Nodes and incident links of one tile
+
+        Returns:
+            Dict with 'nodes', 'links' and 'meta'; nodes outside the tile
+            that links lead to are included with external=True
+        """
+        if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Tile {z}/{x}/{y} is out of range")
+        bounds = self.tile_bounds(z, x, y)
+        nodes = self.query(*bounds)
+        total = len(nodes)
+        if total > TILE_NODE_LIMIT:
+            nodes = nodes[np.argsort(-self.degree[nodes], kind='stable')[:TILE_NODE_LIMIT]]
+        selected = set(int(node) for node in nodes)
+
+        graph = self.graph
+        links = []
+        external = {}  # used as an ordered set
+        for node in nodes:
+            node = int(node)
+            for slot in range(graph.offsets[node], graph.offsets[node + 1]):
+                other = graph.neighbors[slot]
+                inside = other in selected
+                # Links inside the tile are listed once, from their start node
+                if inside and not graph.outgoing[slot]:
+                    continue
+                if len(links) >= TILE_LINK_LIMIT:
+                    break
+                source, target = (node, other) if graph.outgoing[slot] else (other, node)
+                links.append({
+                    'source': graph.keys[source][1],
+                    'target': graph.keys[target][1],
+                    'type': graph.rel_types[graph.edge_types[slot]],
+                })
+                if not inside:
+                    external.setdefault(other, None)
+
+        return {
+            'nodes': ([self._node(int(node)) for node in nodes]
+                      + [self._node(node, external=True) for node in external]),
+            'links': links,
+            'meta': {
+                'tile': [z, x, y],
+                'bounds': bounds,
+                'node_count': len(nodes),
+                'external_count': len(external),
+                'link_count': len(links),
+                'truncated': total > len(nodes) or len(links) >= TILE_LINK_LIMIT,
+            },
+        }
+
+    def _node(self, node, external=False):
+        graph = self.graph
+        node_type = graph.node_type(node)
+        x, y = self.positions[node]
+        return {
+            'id': graph.keys[node][1],
+            'title': graph.titles[node],
+            'type': node_type,
+            'level': graph.levels[node],
+            'group': NODE_GROUPS.get(node_type, OTHER_GROUP),
+            'x': round(float(x), 1),
+            'y': round(float(y), 1),
+            'external': external,
+        }
+
+
+class TileStore:
+    """
+    TileIndex over the adjacency store's current graph; layouts and tiles
+    are cached in the Django cache per content version
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _positions(self, graph, version):
+        key = f"{POSITIONS_CACHE_PREFIX}v{version}"
+        data = cache.get(key)
+        if data is not None and len(data) == len(graph) * 2 * 4:
+            return np.frombuffer(data, dtype=np.float32).reshape(-1, 2)
+        sources = []
+        targets = []
+        for node in range(len(graph)):
+            for slot in range(graph.offsets[node], graph.offsets[node + 1]):
+                if graph.outgoing[slot]:
+                    sources.append(node)
+                    targets.append(graph.neighbors[slot])
+        positions = force_layout(len(graph), sources, targets).astype(np.float32)
+        cache.set(key, positions.tobytes(), POSITIONS_CACHE_TIMEOUT)
+        logger.info(f"Computed tile layout for {len(graph)} nodes at content v{version}")
+        return positions
+
+    def get_index(self):
+        version = get_content_version()
+        graph = self.store.get_graph()
+        index = self._index
+        if index is None or index.graph is not graph:
+            with self._lock:
+                if self._index is None or self._index.graph is not graph:
+                    self._index = TileIndex(graph, self._positions(graph, version))
+                index = self._index
+        return index
+
+    @property
+    def version(self):
+        return get_content_version()
+
+    def info(self):
+        """World bounds and tile limits clients need to address tiles"""
+        index = self.get_index()
+        return {
+            'bounds': index.bounds,
+            'max_zoom': MAX_ZOOM,
+            'tile_node_limit': TILE_NODE_LIMIT,
+            'version': self.version,
+            'node_count': len(index.graph),
+        }
+
+    def tile(self, z, x, y):
+        key = f"{TILE_CACHE_PREFIX}v{self.version}:{z}/{x}/{y}"
+        result = cache.get(key)
+        if result is None:
+            result = self.get_index().tile(z, x, y)
+            cache.set(key, result, TILE_CACHE_TIMEOUT)
+        return result
+
+
+# Global tile store instance
+tile_store = TileStore(adjacency_store)
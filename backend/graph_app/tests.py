@@ -1,3 +1,332 @@
+import struct
+
+import numpy as np
+from django.core.cache import cache
 from django.test import TestCase
+from unittest.mock import Mock, patch
+
+from thoughts_api.snapshot import bump_content_version
+
+from .adjacency import AdjacencyGraph
+from .clustering import ClusterTree
+from .formats import BINARY_CONTENT_TYPE, BINARY_MAGIC, LEVEL_NONE, to_binary, to_columnar
+from .layout import apply_layout, force_layout
+from .snapshot import GraphSnapshotBuilder, build_graph_snapshot, graph_labels
+from .spatial import TileIndex
+
+
+def _node(node_id, node_type='TOPIC'):
+    return {'id': node_id, 'title': node_id, 'type': node_type, 'level': 0, 'tags': []}
+
+
+class TestGraphSnapshot(TestCase):
+
+    def _service(self, nodes, links):
+        service = Mock()
+        service.graph_nodes_query.side_effect = lambda label, limit: (label, {'limit': limit})
+        service.graph_links_query.side_effect = lambda label, labels, ids, limit: ('links:' + label, {'limit': limit})
+
+        def stream(query, params):
+            if query.startswith('links:'):
+                return iter(links.get(query[6:], []))
+            return iter(nodes.get(query, [])[:params['limit']])
+        service.stream_query.side_effect = stream
+        return service
+
+    def test_links_only_join_kept_nodes_and_are_deduplicated(self):
+        builder = GraphSnapshotBuilder(max_nodes=2, max_links=10)
+        for node_id in ('a', 'b', 'c'):
+            builder.add_node(_node(node_id))
+        builder.add_link({'source': 'a', 'target': 'b', 'type': 'HAS_CHILD'})
+        builder.add_link({'source': 'a', 'target': 'b', 'type': 'HAS_CHILD'})
+        builder.add_link({'source': 'a', 'target': 'c', 'type': 'HAS_CHILD'})
+
+        result = builder.result()
+        self.assertEqual(len(result['nodes']), 2)
+        self.assertEqual(result['links'], [{'source': 'a', 'target': 'b', 'type': 'HAS_CHILD'}])
+        self.assertTrue(result['meta']['truncated'])
+
+    def test_node_cap_stops_later_labels(self):
+        service = self._service(
+            {'TOPIC': [_node('a'), _node('b')], 'THOUGHT': [_node('t', 'THOUGHT')]},
+            {'TOPIC': [{'source': 'a', 'target': 'b', 'type': 'HAS_CHILD'}]},
+        )
+
+        result = build_graph_snapshot(service, max_nodes=2)
+
+        self.assertEqual([n['id'] for n in result['nodes']], ['a', 'b'])
+        self.assertEqual(len(result['links']), 1)
+        self.assertTrue(result['meta']['truncated'])
+        queried = [call.args[0] for call in service.graph_nodes_query.call_args_list]
+        self.assertEqual(queried, ['TOPIC', 'THOUGHT'])
+
+    def test_type_filter(self):
+        self.assertEqual(graph_labels(['QUOTE', 'TOPIC']), ['TOPIC', 'QUOTE'])
+        with self.assertRaises(ValueError):
+            graph_labels(['Tag'])
+
+    @patch('graph_app.views.build_graph_snapshot')
+    def test_graph_data_api_params(self, mock_build):
+        mock_build.return_value = {'nodes': [], 'links': [], 'meta': {}}
+
+        response = self.client.get('/graph/api/data/', {'type': 'topic,thought', 'max_nodes': 100000})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_build.call_args.kwargs['types'], ['TOPIC', 'THOUGHT'])
+        self.assertEqual(mock_build.call_args.kwargs['max_nodes'], 5000)
+        self.assertEqual(self.client.get('/graph/api/data/', {'type': 'tag'}).status_code, 400)
+
+
+NODE_ROWS = [_node('root'), _node('t1', 'THOUGHT'), _node('q1', 'QUOTE'), _node('c1', 'CONTENT'), _node('far')]
+LINK_ROWS = [
+    {'source': 'root', 'source_type': 'TOPIC', 'target': 't1', 'target_type': 'THOUGHT', 'type': 'HAS_THOUGHT'},
+    {'source': 't1', 'source_type': 'THOUGHT', 'target': 'c1', 'target_type': 'CONTENT', 'type': 'HAS_CONTENT'},
+    {'source': 'q1', 'source_type': 'QUOTE', 'target': 'root', 'target_type': 'TOPIC', 'type': 'HAS_CHILD'},
+    {'source': 'c1', 'source_type': 'CONTENT', 'target': 'far', 'target_type': 'TOPIC', 'type': 'MENTIONS'},
+]
+
+
+class TestAdjacencyGraph(TestCase):
+
+    def setUp(self):
+        self.graph = AdjacencyGraph(NODE_ROWS, LINK_ROWS)
+
+    def test_csr_holds_both_directions(self):
+        root = self.graph.find('root', 'TOPIC')
+        neighbors = self.graph.neighbors[self.graph.offsets[root]:self.graph.offsets[root + 1]]
+
+        self.assertEqual(sorted(self.graph.keys[n][1] for n in neighbors), ['q1', 't1'])
+        self.assertEqual(self.graph.link_count, 4)
+
+    def test_ego_network_depth_counts_hops(self):
+        result = self.graph.ego_network(self.graph.find('root'), depth=2)
+
+        self.assertEqual({n['id']: n['hops'] for n in result['nodes']}, {'root': 0, 't1': 1, 'q1': 1, 'c1': 2})
+        self.assertIn({'source': 'q1', 'target': 'root', 'type': 'HAS_CHILD'}, result['links'])
+        self.assertEqual(len(result['links']), 3)
+
+    def test_ego_network_type_filter_and_budget(self):
+        filtered = self.graph.ego_network(self.graph.find('root'), depth=3, types=['TOPIC', 'THOUGHT'])
+        budget = self.graph.ego_network(self.graph.find('root'), depth=3, max_nodes=2)
+
+        self.assertEqual([n['id'] for n in filtered['nodes']], ['root', 't1'])
+        self.assertEqual(len(budget['nodes']), 2)
+        self.assertTrue(budget['meta']['truncated'])
+
+    @patch('graph_app.views.adjacency_store')
+    def test_node_detail_uses_store(self, mock_store):
+        mock_store.ego_network.return_value = None
+
+        response = self.client.get('/graph/api/node/missing/', {'depth': 9, 'type': 'TOPIC'})
+
+        self.assertEqual(response.status_code, 404)
+        mock_store.ego_network.assert_called_once_with(
+            'missing', node_type='TOPIC', depth=4, types=['TOPIC'], max_nodes=200
+        )
+
+
+GRAPH = {
+    'nodes': [_node('root'), _node('t1', 'THOUGHT'), {'id': 'n', 'title': None, 'type': 'TOPIC', 'level': None}],
+    'links': [{'source': 'root', 'target': 't1', 'type': 'HAS_THOUGHT'},
+              {'source': 'root', 'target': 'gone', 'type': 'HAS_THOUGHT'}],
+    'meta': {'truncated': False},
+}
+
+
+class TestGraphFormats(TestCase):
+
+    def test_columnar_interns_strings(self):
+        data = to_columnar(GRAPH)
+
+        self.assertEqual(data['strings'], ['root', 'TOPIC', 't1', 'THOUGHT', 'n', 'HAS_THOUGHT'])
+        self.assertEqual(data['nodes']['type'], [1, 3, 1])
+        self.assertEqual(data['nodes']['title'], [0, 2, -1])
+        self.assertEqual(data['nodes']['level'], [0, 0, LEVEL_NONE])
+        self.assertEqual(data['links'], {'source': [0], 'target': [1], 'type': [5]})
+
+    def test_tags_are_interned_per_node(self):
+        graph = {'nodes': [dict(_node('a'), tags=['grace', 'faith']), dict(_node('b'), tags='grace'),
+                           dict(_node('c'), tags=None)], 'links': []}
+
+        data = to_columnar(graph)
+        tags = [[data['strings'][i] for i in node_tags] for node_tags in data['nodes']['tags']]
+        self.assertEqual(tags, [['grace', 'faith'], ['grace'], []])
+
+        payload = to_binary(graph)
+        n_strings, n_nodes, _, n_bytes = struct.unpack_from('<IIII', payload, 8)
+        # offsets and strings, then id, title, type, level and group
+        offset = 24 + 4 * (n_strings + 1) + n_bytes + (-n_bytes % 4) + 3 * 4 * n_nodes + 8 + 4
+        tag_offsets = struct.unpack_from(f'<{n_nodes + 1}I', payload, offset)
+        self.assertEqual(tag_offsets, (0, 2, 3, 3))
+        flat = struct.unpack_from('<3i', payload, offset + 4 * (n_nodes + 1))
+        self.assertEqual(list(flat), data['nodes']['tags'][0] + data['nodes']['tags'][1])
+
+    def test_binary_layout(self):
+        payload = to_binary(GRAPH)
+
+        self.assertEqual(payload[:4], BINARY_MAGIC)
+        n_strings, n_nodes, n_links, n_bytes = struct.unpack_from('<IIII', payload, 8)
+        self.assertEqual((n_strings, n_nodes, n_links), (6, 3, 1))
+        offset = 24 + 4 * (n_strings + 1)
+        strings_end = offset + n_bytes
+        self.assertEqual(payload[offset:strings_end].decode('utf-8'), 'rootTOPICt1THOUGHTnHAS_THOUGHT')
+        ids = struct.unpack_from('<3i', payload, strings_end + (-n_bytes % 4))
+        self.assertEqual(ids, (0, 2, 4))
+
+    @patch('graph_app.views.build_graph_snapshot')
+    def test_graph_data_api_formats(self, mock_build):
+        mock_build.return_value = GRAPH
+
+        binary = self.client.get('/graph/api/data/', {'format': 'binary'})
+        columnar = self.client.get('/graph/api/data/', {'format': 'columnar'})
+
+        self.assertEqual(binary['Content-Type'], BINARY_CONTENT_TYPE)
+        self.assertEqual(binary.content, to_binary(GRAPH))
+        self.assertEqual(columnar.json()['strings'][0], 'root')
+        self.assertEqual(self.client.get('/graph/api/data/', {'format': 'xml'}).status_code, 400)
+
+    @patch('thoughts_api.views.neo4j_service')
+    def test_drf_graph_view_accepts_format(self, mock_service):
+        mock_service.get_graph_data.return_value = [GRAPH]
+
+        response = self.client.get('/api/graph/', {'format': 'columnar'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['format'], 'columnar')
+
+
+class TestLayout(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_linked_nodes_end_up_closer(self):
+        # Two triangles joined by nothing: within-triangle distances stay short
+        pos = force_layout(6, [0, 1, 2, 3, 4, 5], [1, 2, 0, 4, 5, 3])
+
+        linked = np.linalg.norm(pos[0] - pos[1])
+        unlinked = min(np.linalg.norm(pos[i] - pos[j]) for i in range(3) for j in range(3, 6))
+        self.assertLess(linked, unlinked)
+        self.assertTrue(np.allclose(pos, force_layout(6, [0, 1, 2, 3, 4, 5], [1, 2, 0, 4, 5, 3])))
+
+    def test_layout_is_cached_per_content_version(self):
+        graph = {'nodes': [_node('a'), _node('b')], 'links': [{'source': 'a', 'target': 'b', 'type': 'X'}]}
+
+        apply_layout(graph, 'test')
+        with patch('graph_app.layout.force_layout') as mock_layout:
+            again = apply_layout({'nodes': [_node('a'), _node('b')], 'links': []}, 'test')
+            mock_layout.assert_not_called()
+        self.assertEqual((again['nodes'][0]['x'], again['nodes'][0]['y']), (graph['nodes'][0]['x'], graph['nodes'][0]['y']))
+
+        bump_content_version()
+        with patch('graph_app.layout.force_layout', return_value=np.zeros((2, 2))) as mock_layout:
+            apply_layout({'nodes': [_node('a'), _node('b')], 'links': []}, 'test')
+            mock_layout.assert_called_once()
+
+
+def _tree_rows():
+    nodes = [_node('root'), _node('a'), _node('b')]
+    links = [
+        {'source': 'root', 'source_type': 'TOPIC', 'target': 'a', 'target_type': 'TOPIC', 'type': 'HAS_CHILD'},
+        {'source': 'root', 'source_type': 'TOPIC', 'target': 'b', 'target_type': 'TOPIC', 'type': 'HAS_CHILD'},
+    ]
+    for i in range(4):
+        nodes.append(_node(f'a{i}', 'THOUGHT'))
+        links.append({'source': 'a', 'source_type': 'TOPIC', 'target': f'a{i}',
+                      'target_type': 'THOUGHT', 'type': 'HAS_CHILD'})
+    nodes.append(_node('b0', 'QUOTE'))
+    links.append({'source': 'b', 'source_type': 'TOPIC', 'target': 'b0', 'target_type': 'QUOTE', 'type': 'HAS_CHILD'})
+    links.append({'source': 'a0', 'source_type': 'THOUGHT', 'target': 'b0', 'target_type': 'QUOTE', 'type': 'MENTIONS'})
+    links.append({'source': 'a1', 'source_type': 'THOUGHT', 'target': 'b0', 'target_type': 'QUOTE', 'type': 'MENTIONS'})
+    return nodes, links
+
+
+class TestClusterTree(TestCase):
+
+    def setUp(self):
+        self.tree = ClusterTree(AdjacencyGraph(*_tree_rows()))
+
+    def test_subtree_sizes(self):
+        graph = self.tree.graph
+        self.assertEqual([graph.keys[r][1] for r in self.tree.roots], ['root'])
+        self.assertEqual(self.tree.size[graph.find('root')], 8)
+        self.assertEqual(self.tree.size[graph.find('a')], 5)
+
+    def test_budget_collapses_largest_fitting_subtrees(self):
+        view = self.tree.view(budget=4)
+
+        nodes = {n['id']: n for n in view['nodes']}
+        self.assertEqual(set(nodes), {'root', 'a', 'b', 'b0'})
+        self.assertEqual((nodes['a']['cluster'], nodes['a']['size']), (True, 5))
+        # Both hidden a* -> b0 mentions fold into one weighted link
+        self.assertIn({'source': 'a', 'target': 'b0', 'type': 'MENTIONS', 'weight': 2}, view['links'])
+
+    def test_expand_is_view_rooted_at_supernode(self):
+        graph = self.tree.graph
+        view = self.tree.view([graph.find('a')], budget=10)
+
+        self.assertEqual([n['id'] for n in view['nodes']], ['a', 'a0', 'a1', 'a2', 'a3'])
+        self.assertFalse(any(n['cluster'] for n in view['nodes']))
+
+    def test_parent_cycles_are_broken(self):
+        nodes = [_node('x'), _node('y')]
+        links = [
+            {'source': 'x', 'source_type': 'TOPIC', 'target': 'y', 'target_type': 'TOPIC', 'type': 'HAS_CHILD'},
+            {'source': 'y', 'source_type': 'TOPIC', 'target': 'x', 'target_type': 'TOPIC', 'type': 'HAS_CHILD'},
+        ]
+        tree = ClusterTree(AdjacencyGraph(nodes, links))
+
+        self.assertEqual(len(tree.roots), 1)
+        self.assertEqual(tree.size[tree.roots[0]], 2)
+
+    @patch('graph_app.views.cluster_index')
+    def test_lod_mode_and_expand_endpoint(self, mock_index):
+        mock_index.view.return_value = {'nodes': [], 'links': [], 'meta': {}}
+
+        self.assertEqual(self.client.get('/graph/api/data/', {'mode': 'lod', 'budget': 50}).status_code, 200)
+        mock_index.view.assert_called_with(budget=50)
+        self.client.get('/graph/api/cluster/a/', {'node_type': 'topic'})
+        mock_index.view.assert_called_with('a', node_type='TOPIC', budget=150)
+        mock_index.view.return_value = None
+        self.assertEqual(self.client.get('/graph/api/cluster/missing/').status_code, 404)
+
+
+class TestTileIndex(TestCase):
+
+    def setUp(self):
+        graph = AdjacencyGraph(NODE_ROWS, LINK_ROWS)
+        # root, t1, q1 in the low corner; c1 and far in the high one
+        positions = [(0, 0), (10, 0), (0, 10), (100, 100), (90, 90)]
+        self.index = TileIndex(graph, [positions[graph.find(row['id'])] for row in NODE_ROWS])
+
+    def test_query_bounding_box(self):
+        found = self.index.query(-1, -1, 20, 20)
+
+        self.assertEqual(sorted(self.index.graph.keys[n][1] for n in found), ['q1', 'root', 't1'])
+        self.assertEqual(len(self.index.query(40, 40, 60, 60)), 0)
+
+    def test_tile_marks_link_ends_outside_it(self):
+        tile = self.index.tile(1, 0, 0)
+
+        nodes = {n['id']: n['external'] for n in tile['nodes']}
+        self.assertEqual(nodes, {'root': False, 't1': False, 'q1': False, 'c1': True})
+        self.assertEqual(len(tile['links']), 3)
+        self.assertEqual(len(self.index.tile(0, 0, 0)['nodes']), 5)
+        with self.assertRaises(ValueError):
+            self.index.tile(1, 2, 0)
+
+    @patch('graph_app.views.tile_store')
+    def test_tile_endpoint_is_cacheable(self, mock_store):
+        mock_store.tile.return_value = {'nodes': [], 'links': [], 'meta': {}}
+        mock_store.version = 7
+
+        response = self.client.get('/graph/api/tile/', {'z': 2, 'x': 1, 'y': 3})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"7-2-1-3-json"')
+        self.assertIn('max-age=300', response['Cache-Control'])
+        mock_store.tile.assert_called_once_with(2, 1, 3)
+        cached = self.client.get('/graph/api/tile/', {'z': 2, 'x': 1, 'y': 3}, HTTP_IF_NONE_MATCH='"7-2-1-3-json"')
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(mock_store.tile.call_count, 1)
+        self.assertEqual(self.client.get('/graph/api/tile/', {'z': 2}).status_code, 400)
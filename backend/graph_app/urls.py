@@ -7,4 +7,7 @@ urlpatterns = [
     path('', views.graph_view, name='graph_view'),
     path('api/data/', views.graph_data_api, name='graph_data'),
     path('api/node/<str:node_id>/', views.graph_node_detail, name='node_detail'),
+    path('api/cluster/<str:node_id>/', views.graph_cluster_expand, name='cluster_expand'),
+    path('api/tile/', views.graph_tile, name='tile'),
+    path('api/tiles/', views.graph_tiles_info, name='tiles_info'),
 ]
\ No newline at end of file
@@ -1,6 +1,50 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+import logging
 from thoughts_api.neo4j_service import neo4j_service
+from .adjacency import DEFAULT_DEPTH, DEFAULT_EGO_NODES, MAX_DEPTH, adjacency_store
+from .clustering import DEFAULT_BUDGET, MAX_BUDGET, cluster_index
+from .formats import get_graph_format, graph_response
+from .spatial import tile_store
+from .snapshot import DEFAULT_MAX_LINKS, DEFAULT_MAX_NODES, build_graph_snapshot, graph_labels
+
+logger = logging.getLogger(__name__)
+
+# 'full' sends the capped overview; 'lod' a clustered level-of-detail view
+GRAPH_MODES = ('full', 'lod')
+
+# Tiles only change with the content version, which is part of the ETag
+TILE_MAX_AGE = 300
+
+# Upper bounds on the caps a client may ask for
+MAX_NODES_LIMIT = 5000
+MAX_LINKS_LIMIT = 20000
+
+
+def _get_budget(request):
+    budget = min(int(request.GET.get('budget', DEFAULT_BUDGET)), MAX_BUDGET)
+    if budget < 1:
+        raise ValueError("budget must be positive")
+    return budget
+
+
+def _get_graph_params(request, default_max_nodes=DEFAULT_MAX_NODES):
+    """
+    Read node type filter and caps from a request
+
+    Returns:
+        Tuple of (types, max_nodes, max_links); types is None for all labels
+    """
+    types = []
+    for value in request.GET.getlist('type'):
+        types.extend(t.strip().upper() for t in value.split(',') if t.strip())
+    max_nodes = min(int(request.GET.get('max_nodes', default_max_nodes)), MAX_NODES_LIMIT)
+    max_links = min(int(request.GET.get('max_links', DEFAULT_MAX_LINKS)), MAX_LINKS_LIMIT)
+    if max_nodes < 1 or max_links < 0:
+        raise ValueError("max_nodes must be positive and max_links not negative")
+    graph_labels(types)  # rejects unknown labels
+    return types or None, max_nodes, max_links
 
 def graph_view(request):
     """Render the dedicated graph visualization page"""
@@ -9,20 +53,103 @@ def graph_view(request):
 def graph_data_api(request):
     """API endpoint for graph data - separate from thoughts_api"""
     try:
-        graph_data = neo4j_service.get_graph_data()
-        # neo4j_service.get_graph_data() returns a list with one dict, we need just the dict
-        if graph_data and len(graph_data) > 0:
-            return JsonResponse(graph_data[0], safe=False)
+        fmt = get_graph_format(request)
+        mode = request.GET.get('mode', 'full')
+        if mode not in GRAPH_MODES:
+            raise ValueError(f"Unknown graph mode: {mode}")
+        if mode == 'lod':
+            budget = _get_budget(request)
         else:
-            return JsonResponse({'nodes': [], 'links': []}, safe=False)
+            types, max_nodes, max_links = _get_graph_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        if mode == 'lod':
+            return graph_response(cluster_index.view(budget=budget), fmt)
+        graph_data = build_graph_snapshot(
+            neo4j_service, types=types, max_nodes=max_nodes, max_links=max_links,
+            layout=request.GET.get('layout', '1') != '0'
+        )
+        return graph_response(graph_data, fmt)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 def graph_node_detail(request, node_id):
-    """Get detailed information about a specific node"""
+    """Get the graph around a specific node"""
+    try:
+        node_type = request.GET.get('node_type', 'TOPIC').upper()
+        depth = min(int(request.GET.get('depth', DEFAULT_DEPTH)), MAX_DEPTH)
+        types, max_nodes, _ = _get_graph_params(request, default_max_nodes=DEFAULT_EGO_NODES)
+        fmt = get_graph_format(request)
+        graph_labels([node_type])
+        if depth < 0:
+            raise ValueError("depth must not be negative")
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        node_data = adjacency_store.ego_network(
+            node_id, node_type=node_type, depth=depth, types=types, max_nodes=max_nodes
+        )
+    except Exception as e:
+        # Store could not be loaded; fall back to a two-hop traversal in Neo4j
+        logger.warning(f"Adjacency store unavailable, querying Neo4j: {e}")
+        try:
+            rows = neo4j_service.get_graph_data(node_id=node_id, node_type=node_type)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+        node_data = rows[0] if rows else None
+    if node_data is None:
+        return JsonResponse({'error': 'Node not found'}, status=404)
+    return graph_response(node_data, fmt)
+
+
+def graph_cluster_expand(request, node_id):
+    """Expand a supernode: the level-of-detail view rooted at that node"""
+    try:
+        fmt = get_graph_format(request)
+        budget = _get_budget(request)
+        node_type = request.GET.get('node_type')
+        if node_type:
+            node_type = node_type.upper()
+            graph_labels([node_type])
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        graph_data = cluster_index.view(node_id, node_type=node_type, budget=budget)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+    if graph_data is None:
+        return JsonResponse({'error': 'Node not found'}, status=404)
+    return graph_response(graph_data, fmt)
+
+
+def graph_tiles_info(request):
+    """World bounds and zoom range for addressing graph tiles"""
+    try:
+        return JsonResponse(tile_store.info())
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def graph_tile(request):
+    """Nodes and incident links of one z/x/y tile of the laid-out graph"""
+    try:
+        fmt = get_graph_format(request)
+        z, x, y = (int(request.GET[param]) for param in ('z', 'x', 'y'))
+    except (KeyError, ValueError) as e:
+        return JsonResponse({'error': f"z, x and y are required integers: {e}"}, status=400)
+    etag = f'"{tile_store.version}-{z}-{x}-{y}-{fmt}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
     try:
-        # You can add specific node detail logic here
-        node_data = neo4j_service.get_graph_data(node_id=node_id, node_type='TOPIC')
-        return JsonResponse(node_data, safe=False)
+        tile = tile_store.tile(z, x, y)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+    response = graph_response(tile, fmt)
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=TILE_MAX_AGE)
+    return response
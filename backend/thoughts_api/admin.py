@@ -1,3 +1,19 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ContentItem, ContentItemTag
+
+
+class ContentItemTagInline(admin.TabularInline):
+    model = ContentItemTag
+    extra = 0
+
+
+@admin.register(ContentItem)
+class ContentItemAdmin(admin.ModelAdmin):
+    """Read-only view of the mirrored thoughts, quotes and passages"""
+
+    list_display = ['neo4j_id', 'node_type', 'title', 'level', 'parent_topic', 'is_active', 'last_synced']
+    list_filter = ['node_type', 'is_active', 'level']
+    search_fields = ['neo4j_id', 'title', 'content']
+    readonly_fields = ['content_hash', 'last_synced']
+    inlines = [ContentItemTagInline]
@@ -0,0 +1,100 @@
+from neo4j import AsyncGraphDatabase
+from django.conf import settings
+from django.core.cache import cache
+from .neo4j_service import CypherQueries, Neo4jService, split_search_total
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncNeo4jService(CypherQueries):
+    """
+    Async counterpart of Neo4jService for views served under ASGI.
+    Shares the Cypher builders with the sync service so both stay in step.
+    """
+
+    def __init__(self):
+        # The async driver binds its connection pool to the running event
+        # loop, so it is created on first use instead of at import time.
+        self.driver = None
+
+    def _get_driver(self):
+        if self.driver is None:
+            self.driver = AsyncGraphDatabase.driver(
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
+            )
+        return self.driver
+
+    async def close(self):
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+    async def run_query(self, query, parameters=None):
+        """Execute a Cypher query and return results"""
+        try:
+            async with self._get_driver().session(database=settings.NEO4J_DATABASE) as session:
+                result = await session.run(query, parameters or {})
+                return [record.data() async for record in result]
+        except Exception as e:
+            logger.error(f"Neo4j async query error: {e}")
+            raise
+
+    async def get_all_thoughts(self, skip=0, limit=20, after=None):
+        """Get all thoughts with pagination"""
+        return await self.run_query(*self.thoughts_query(skip, limit, after))
+
+    async def get_label_count(self, label):
+        """Get the number of nodes with a label, cached briefly per label"""
+        cache_key = f"{Neo4jService.COUNT_CACHE_PREFIX}{label}"
+        total = await cache.aget(cache_key)
+        if total is None:
+            result = await self.run_query(*self.count_query(label))
+            total = result[0]['total'] if result else 0
+            await cache.aset(cache_key, total, Neo4jService.COUNT_CACHE_TIMEOUT)
+        return total
+
+    async def get_all_quotes(self, skip=0, limit=20, after=None):
+        """Get all quotes with pagination"""
+        return await self.run_query(*self.quotes_query(skip, limit, after))
+
+    async def get_all_passages(self, skip=0, limit=20, after=None):
+        """Get all Bible passages with pagination"""
+        return await self.run_query(*self.passages_query(skip, limit, after))
+
+    async def get_item_by_id(self, item_id, node_type):
+        """Get a specific item by ID and type"""
+        result = await self.run_query(*self.item_query(item_id, node_type))
+        return result[0] if result else None
+
+    async def search_content(self, search_term, skip=0, limit=20, after=None):
+        """Search across all content types"""
+        return await self.run_query(*self.search_query(search_term, skip, limit, after))
+
+    async def fulltext_search(self, search_term, skip=0, limit=20):
+        """Search all content types through the Neo4j full-text indexes"""
+        rows = await self.run_query(*self.fulltext_search_query(search_term, skip, limit))
+        return split_search_total(rows)
+
+    async def stream_query(self, query, parameters=None):
+        """Execute a Cypher query and yield result rows as they arrive"""
+        try:
+            async with self._get_driver().session(database=settings.NEO4J_DATABASE) as session:
+                result = await session.run(query, parameters or {})
+                async for record in result:
+                    yield record.data()
+        except Exception as e:
+            logger.error(f"Neo4j async query error: {e}")
+            raise
+
+    async def get_graph_data(self, node_id=None, node_type=None):
+        """Get graph data for visualization"""
+        if not (node_id and node_type):
+            from graph_app.snapshot import abuild_graph_snapshot
+            return [await abuild_graph_snapshot(self, layout=True)]
+        return await self.run_query(*self.graph_query(node_id, node_type))
+
+
+# Global service instance
+async_neo4j_service = AsyncNeo4jService()
@@ -0,0 +1,155 @@
+"""
+Async API views for serving Neo4j reads under ASGI.
+DRF's APIView is sync-only, so these are plain Django async views that
+mirror the JSON shape of their counterparts in views.py.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views import View
+from graph_app.formats import get_graph_format, graph_response
+from .async_neo4j_service import async_neo4j_service
+from .fts_index import fts_index
+from .pagination import InvalidCursor, decode_cursor
+from .search_engine import search_engine
+from .views import SearchView
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncThoughtsListView(View):
+    """Async API view for listing thoughts"""
+
+    async def get(self, request):
+        try:
+            page = int(request.GET.get('page', 1))
+            page_size = int(request.GET.get('page_size', 20))
+            cursor = request.GET.get('cursor')
+            after = decode_cursor(cursor) if cursor else None
+            skip = 0 if after else (page - 1) * page_size
+
+            rows = await async_neo4j_service.get_all_thoughts(
+                skip=skip, limit=page_size + 1, after=after
+            )
+            thoughts, next_cursor = async_neo4j_service.thoughts_keyset.paginate(rows, page_size)
+
+            return JsonResponse({
+                'results': thoughts,
+                'count': await async_neo4j_service.get_label_count('THOUGHT'),
+                'page': page,
+                'page_size': page_size,
+                'next': next_cursor
+            })
+        except InvalidCursor:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+        except Exception as e:
+            logger.error(f"Error fetching thoughts: {e}")
+            return JsonResponse({'error': 'Failed to fetch thoughts'}, status=500)
+
+
+class AsyncSearchView(View):
+    """Async API view for searching content"""
+
+    async def get(self, request):
+        try:
+            search_term = request.GET.get('q', '').strip()
+            if not search_term:
+                return JsonResponse({'error': 'Search term is required'}, status=400)
+
+            mode = request.GET.get('mode', settings.SEARCH_BACKEND)
+            if mode not in SearchView.SEARCH_MODES:
+                return JsonResponse({'error': f"Unknown search mode: {mode}"}, status=400)
+
+            page = int(request.GET.get('page', 1))
+            page_size = int(request.GET.get('page_size', 20))
+            skip = (page - 1) * page_size
+
+            if mode == 'memory':
+                # Loading the snapshot may query Neo4j, so it runs in a thread
+                found = await sync_to_async(search_engine.search)(
+                    search_term,
+                    skip=skip,
+                    limit=page_size,
+                    types=request.GET.getlist('type') or None
+                )
+                return JsonResponse({
+                    'results': found['results'],
+                    'count': found['total'],
+                    'facets': found['facets'],
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size
+                })
+
+            if mode == 'sqlite':
+                results, total = await sync_to_async(fts_index.search)(
+                    search_term,
+                    skip=skip,
+                    limit=page_size,
+                    types=request.GET.getlist('type') or None
+                )
+                return JsonResponse({
+                    'results': results,
+                    'count': total,
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size
+                })
+
+            if mode == 'fulltext':
+                results, total = await async_neo4j_service.fulltext_search(
+                    search_term,
+                    skip=skip,
+                    limit=page_size
+                )
+                return JsonResponse({
+                    'results': results,
+                    'count': total,
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size
+                })
+
+            results = await async_neo4j_service.search_content(
+                search_term,
+                skip=skip,
+                limit=page_size
+            )
+
+            return JsonResponse({
+                'results': results,
+                'search_term': search_term,
+                'mode': mode,
+                'page': page,
+                'page_size': page_size
+            })
+        except Exception as e:
+            logger.error(f"Error searching content: {e}")
+            return JsonResponse({'error': 'Search failed'}, status=500)
+
+
+class AsyncGraphDataView(View):
+    """Async API view for getting graph visualization data"""
+
+    async def get(self, request):
+        try:
+            node_id = request.GET.get('node_id')
+            node_type = request.GET.get('node_type')
+            try:
+                fmt = get_graph_format(request)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
+            graph_data = await async_neo4j_service.get_graph_data(node_id, node_type)
+
+            if graph_data:
+                return graph_response(graph_data[0], fmt)
+            return graph_response({'nodes': [], 'links': []}, fmt)
+        except Exception as e:
+            logger.error(f"Error fetching graph data: {e}")
+            return JsonResponse({'error': 'Failed to fetch graph data'}, status=500)
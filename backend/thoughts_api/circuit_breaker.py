@@ -0,0 +1,132 @@
+"""
+Circuit breaker for calls to an unreliable backend such as AuraDB.
+
+After ``failure_threshold`` consecutive outage errors the breaker opens
+and calls fail at once with CircuitOpenError instead of each waiting for
+a driver timeout. Once ``reset_timeout`` seconds have passed it lets a
+single probe call through (half-open): success closes it again, another
+outage error reopens it for a new timeout. Errors that show the backend
+answered, such as a Cypher syntax error, count as successes.
+
+State is per process; every worker trips its own breaker after a few
+failed calls.
+"""
+
+from contextlib import contextmanager
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the backend while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed/open/half-open breaker
+
+    Args:
+        name: Name used in log messages and errors
+        failure_threshold: Consecutive outage errors that open the breaker
+        reset_timeout: Seconds the breaker stays open before a probe
+        is_failure: Callable deciding whether an exception is an outage;
+            every exception counts if None
+        clock: Monotonic time source
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, is_failure=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    @property
+    def is_open(self):
+        """Whether a call made now would be rejected"""
+        with self._lock:
+            if self._state == self.OPEN:
+                return self.clock() - self._opened_at < self.reset_timeout
+            return self._state == self.HALF_OPEN and self._probing
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self._state = self.HALF_OPEN
+                logger.info(f"{self.name} circuit half-open, probing")
+            if self._state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(f"{self.name} circuit is half-open and probing")
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(
+                        f"{self.name} circuit opened after {self._failures} failures "
+                        f"for {self.reset_timeout}s: {error}"
+                    )
+                self._state = self.OPEN
+                self._opened_at = self.clock()
+            self._probing = False
+
+    @contextmanager
+    def guard(self):
+        """
+        Run the enclosed block as one call through the breaker
+
+        Raises:
+            CircuitOpenError: When the breaker rejects the call
+        """
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure(e)
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # Abandoned generators and interrupts say nothing about the
+            # backend; just free the probe slot
+            with self._lock:
+                self._probing = False
+            raise
+        else:
+            self.record_success()
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker"""
+        with self.guard():
+            return func(*args, **kwargs)
@@ -0,0 +1,200 @@
+"""
+SQLite FTS5 full-text index over the mirrored content.
+
+The ``content_search`` virtual table (created by migration 0003) holds one
+row per active Topic and ContentItem: title, body and tags are indexed,
+the rest is stored alongside for display and filtering. The sync writers
+in topics.sync keep it current row by row, so unlike the in-memory
+search engine it lives on disk, survives restarts and is shared by every
+worker process. Rows are replaced and removed by rowid, which
+search_rowid() derives from the model pk, so a write never scans the
+table. Answers /api/search/?mode=sqlite and topic search.
+"""
+
+import html
+import re
+import logging
+
+from django.db import connection
+
+from .snapshot import item_key
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'content_search'
+# bm25() weights of the indexed columns: title, content, tags
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0)
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+# Private-use characters FTS5 wraps matches in; the text is HTML-escaped
+# before they are turned into HIGHLIGHT_START and HIGHLIGHT_END
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+SNIPPET_TOKENS = 24
+# Between the tags of an item in the tags column; tags may contain spaces
+TAG_SEPARATOR = ' | '
+
+# Keys per DELETE ... IN (...); stays below SQLite's bound-variable limit
+BATCH_SIZE = 500
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Every active mirrored item as (rowid, key, type, item_id, level, parent, title, content, tags)
+SOURCE_SQL = """
+SELECT -t.id, 'TOPIC:' || t.neo4j_id, 'TOPIC', t.neo4j_id, t.level, t.parent_id, t.title, t.description,
+       (SELECT group_concat(tag, ' | ') FROM topics_topictag WHERE topic_id = t.id)
+FROM topics_topic t WHERE t.is_active
+UNION ALL
+SELECT i.id, i.node_type || ':' || i.neo4j_id, i.node_type, i.neo4j_id, i.level, i.parent_id, i.title, i.content,
+       (SELECT group_concat(tag, ' | ') FROM thoughts_api_contentitemtag WHERE item_id = i.id)
+FROM thoughts_api_contentitem i WHERE i.is_active
+"""
+
+
+def search_rowid(node_type, pk):
+    """
+    rowid of a mirrored row: ContentItem pks as they are, Topic pks
+    negated so the two tables never collide
+    """
+    return -pk if node_type == 'TOPIC' else pk
+
+
+def match_expression(search_term):
+    """
+    Turn free text into an FTS5 query: every word must match, as a whole
+    word or a prefix, and FTS5 operators in the input are taken literally
+    """
+    words = TOKEN_RE.findall(search_term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _highlight_html(text):
+    """HTML-escape FTS5 output and mark its matches"""
+    if text is None:
+        return None
+    escaped = html.escape(text, quote=False)
+    return escaped.replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_END, HIGHLIGHT_END)
+
+
+def _enabled():
+    return connection.vendor == 'sqlite'
+
+
+class FullTextIndex:
+    """Maintenance and queries of the content_search table"""
+
+    def index(self, rows):
+        """
+        Add or replace items
+
+        Args:
+            rows: Iterable of dicts with pk (of the Topic or ContentItem),
+                type, id, level, parent, title, content and tags (a list)
+        """
+        values = [
+            (search_rowid(row['type'], row['pk']), item_key(row['type'], row['id']), row['type'], row['id'],
+             row.get('level'), row.get('parent'), row.get('title') or '', row.get('content') or '',
+             TAG_SEPARATOR.join(sorted(row.get('tags') or ())))
+            for row in rows
+        ]
+        if not values or not _enabled():
+            return 0
+        with connection.cursor() as cursor:
+            self._delete(cursor, [value[0] for value in values])
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, key, type, item_id, level, parent, title, content, tags) "
+                f"VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                values,
+            )
+        return len(values)
+
+    def remove(self, rowids):
+        """Drop items by search_rowid()"""
+        rowids = list(rowids)
+        if not rowids or not _enabled():
+            return 0
+        with connection.cursor() as cursor:
+            self._delete(cursor, rowids)
+        return len(rowids)
+
+    def _delete(self, cursor, rowids):
+        for start in range(0, len(rowids), BATCH_SIZE):
+            batch = rowids[start:start + BATCH_SIZE]
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(batch))})", batch)
+
+    def rebuild(self):
+        """Repopulate the index from the Topic and ContentItem tables"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE}")
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, key, type, item_id, level, parent, title, content, tags) {SOURCE_SQL}"
+            )
+            cursor.execute(f"SELECT count(*) FROM {TABLE}")
+            count = cursor.fetchone()[0]
+        logger.info(f"Rebuilt {TABLE} with {count} items")
+        return count
+
+    def search(self, search_term, skip=0, limit=20, types=None):
+        """
+        BM25-ranked search across the mirrored content
+
+        Args:
+            search_term: Free-text query
+            skip: Number of hits to skip
+            limit: Page size
+            types: Optional iterable of content types to keep
+
+        Returns:
+            Tuple of (result rows, total hit count). Rows carry a score
+            (higher is better), the title with matches highlighted and a
+            snippet of the body around the matches; both are HTML-escaped
+            apart from the highlight tags.
+        """
+        expression = match_expression(search_term)
+        if not expression:
+            return [], 0
+
+        where = f"{TABLE} MATCH %s"
+        params = [expression]
+        if types:
+            where += f" AND type IN ({', '.join(['%s'] * len(types))})"
+            params.extend(types)
+
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {TABLE} WHERE {where}", params)
+            total = cursor.fetchone()[0]
+            if not total:
+                return [], 0
+            cursor.execute(
+                f"""
+                SELECT item_id, type, level, parent, title, content, tags,
+                       -bm25({TABLE}, {weights}) AS score,
+                       highlight({TABLE}, 0, %s, %s) AS title_highlight,
+                       snippet({TABLE}, 1, %s, %s, '…', {SNIPPET_TOKENS}) AS snippet
+                FROM {TABLE} WHERE {where}
+                ORDER BY bm25({TABLE}, {weights}), item_id
+                LIMIT %s OFFSET %s
+                """,
+                [MATCH_START, MATCH_END, MATCH_START, MATCH_END, *params, limit, skip],
+            )
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        results = [{
+            'id': row['item_id'],
+            'title': row['title'],
+            'content': row['content'],
+            'type': row['type'],
+            'level': row['level'],
+            'parent': row['parent'],
+            'tags': row['tags'].split(TAG_SEPARATOR) if row['tags'] else [],
+            'score': row['score'],
+            'title_highlight': _highlight_html(row['title_highlight']),
+            'snippet': _highlight_html(row['snippet']),
+        } for row in rows]
+        return results, total
+
+
+# Global full-text index
+fts_index = FullTextIndex()
@@ -0,0 +1,61 @@
+"""
+Create and check the Neo4j indexes the API relies on.
+
+    python manage.py neo4j_indexes           # create missing indexes
+    python manage.py neo4j_indexes --check   # report state, fail if not ONLINE
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from thoughts_api.neo4j_service import FULLTEXT_INDEXES, RANGE_INDEXES, neo4j_service
+
+
+class Command(BaseCommand):
+    help = "Create or check the Neo4j full-text and range indexes used by the API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report index state; exit with an error if any index is missing or not ONLINE",
+        )
+        parser.add_argument(
+            '--wait', type=int, default=0, metavar='SECONDS',
+            help="After creating, wait up to SECONDS for the indexes to come ONLINE",
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            neo4j_service.create_fulltext_indexes()
+            neo4j_service.create_range_indexes()
+            self.stdout.write("Created missing full-text and range indexes")
+            if options['wait']:
+                neo4j_service.run_query(
+                    "CALL db.awaitIndexes($timeout)", {"timeout": options['wait']}
+                )
+
+        status = neo4j_service.get_fulltext_index_status()
+        status.update(neo4j_service.get_range_index_status())
+        expected = dict(FULLTEXT_INDEXES)
+        expected.update(
+            (name, ([label], [prop])) for name, (label, prop) in RANGE_INDEXES.items()
+        )
+        problems = []
+        for name, (labels, properties) in expected.items():
+            info = status.get(name)
+            if info is None:
+                problems.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: missing"))
+                continue
+            state = info.get('state')
+            line = (
+                f"{name}: {state} ({info.get('populationPercent', 0):.0f}% populated) "
+                f"on {'|'.join(labels)} [{', '.join(properties)}]"
+            )
+            if state == 'ONLINE':
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                problems.append(name)
+                self.stdout.write(self.style.WARNING(line))
+
+        if options['check'] and problems:
+            raise CommandError(f"Indexes not ready: {', '.join(problems)}")
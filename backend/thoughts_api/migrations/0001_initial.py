@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_type', models.CharField(choices=[('THOUGHT', 'Thought'), ('QUOTE', 'Quote'), ('PASSAGE', 'Passage')], max_length=20)),
+                ('neo4j_id', models.CharField(help_text='Name of the Neo4j node', max_length=255)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('content', models.TextField(blank=True, help_text='en_content of the HAS_CONTENT node')),
+                ('level', models.IntegerField(blank=True, null=True)),
+                ('parent_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('parent_topic', models.CharField(blank=True, help_text='Name of the TOPIC linking to this item with HAS_CHILD', max_length=255, null=True)),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('author', models.CharField(blank=True, max_length=255, null=True)),
+                ('source', models.CharField(blank=True, max_length=255, null=True)),
+                ('book', models.CharField(blank=True, max_length=100, null=True)),
+                ('chapter', models.IntegerField(blank=True, null=True)),
+                ('verse', models.IntegerField(blank=True, null=True)),
+                ('content_hash', models.CharField(blank=True, help_text='Fingerprint of the mirrored Neo4j fields and tags', max_length=40)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_synced', models.DateTimeField(auto_now=True, help_text='Last sync with Neo4j')),
+            ],
+            options={
+                'ordering': ['node_type', 'neo4j_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContentItemTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(db_index=True, max_length=100)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='item_tags', to='thoughts_api.contentitem')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='contentitem',
+            constraint=models.UniqueConstraint(fields=('node_type', 'neo4j_id'), name='unique_content_item'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='contentitemtag',
+            unique_together={('item', 'tag')},
+        ),
+    ]
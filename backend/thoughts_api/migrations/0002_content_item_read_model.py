@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:12
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thoughts_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentitem',
+            name='uid',
+            field=models.CharField(blank=True, help_text='id property of the Neo4j node', max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name='contentitem',
+            name='parent_topic',
+            field=models.CharField(blank=True, db_index=True, help_text='Name of the TOPIC linking to this item with HAS_CHILD', max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='contentitem',
+            index=models.Index(models.F('node_type'), django.db.models.functions.comparison.Coalesce('book', models.Value('')), django.db.models.functions.comparison.Coalesce('chapter', 0), django.db.models.functions.comparison.Coalesce('verse', 0), models.F('neo4j_id'), name='content_item_passage_order'),
+        ),
+    ]
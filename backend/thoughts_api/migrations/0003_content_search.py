@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+CREATE_SQL = """
+CREATE VIRTUAL TABLE content_search USING fts5(
+    title, content, tags,
+    key UNINDEXED, type UNINDEXED, item_id UNINDEXED, level UNINDEXED, parent UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+BACKFILL_SQL = """
+INSERT INTO content_search (key, type, item_id, level, parent, title, content, tags)
+SELECT 'TOPIC:' || t.neo4j_id, 'TOPIC', t.neo4j_id, t.level, t.parent_id, t.title, t.description,
+       (SELECT group_concat(tag, ' | ') FROM topics_topictag WHERE topic_id = t.id)
+FROM topics_topic t WHERE t.is_active
+UNION ALL
+SELECT i.node_type || ':' || i.neo4j_id, i.node_type, i.neo4j_id, i.level, i.parent_id, i.title, i.content,
+       (SELECT group_concat(tag, ' | ') FROM thoughts_api_contentitemtag WHERE item_id = i.id)
+FROM thoughts_api_contentitem i WHERE i.is_active
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thoughts_api', '0002_content_item_read_model'),
+        ('topics', '0005_sync_stage_stats'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, "DROP TABLE content_search"),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+# Refill content_search with rowids derived from the model pks (Topic pks
+# negated), which the sync writers now replace and remove rows by
+REFILL_SQL = [
+    "DELETE FROM content_search",
+    """
+INSERT INTO content_search (rowid, key, type, item_id, level, parent, title, content, tags)
+SELECT -t.id, 'TOPIC:' || t.neo4j_id, 'TOPIC', t.neo4j_id, t.level, t.parent_id, t.title, t.description,
+       (SELECT group_concat(tag, ' | ') FROM topics_topictag WHERE topic_id = t.id)
+FROM topics_topic t WHERE t.is_active
+UNION ALL
+SELECT i.id, i.node_type || ':' || i.neo4j_id, i.node_type, i.neo4j_id, i.level, i.parent_id, i.title, i.content,
+       (SELECT group_concat(tag, ' | ') FROM thoughts_api_contentitemtag WHERE item_id = i.id)
+FROM thoughts_api_contentitem i WHERE i.is_active
+""",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('thoughts_api', '0004_data_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(REFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,250 @@
+"""
+Read model over the Django mirror of the Neo4j content.
+
+MirrorService answers the list, detail and tag queries of Neo4jService
+from the ContentItem and Topic tables (filled by the topic and content
+syncs in topics.sync), returning rows of the same shape and ordered by
+the same keysets, so cursors are interchangeable between the two. With
+``CONTENT_BACKEND = 'mirror'`` the content views read through it and
+Neo4j is only queried by the sync workers.
+"""
+
+import heapq
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+
+from topics.models import Topic, TopicTag
+from .models import ContentItem
+from .neo4j_service import CypherQueries
+
+
+def _after(columns, after, descending=False):
+    """
+    Q selecting rows strictly after a keyset cursor
+
+    Args:
+        columns: Field or annotation names in sort order, last one unique
+        after: Decoded cursor values, one per column
+        descending: Whether the rows sort in descending order
+    """
+    op = 'lt' if descending else 'gt'
+    clause = None
+    for name, value in reversed(list(zip(columns, after))):
+        term = Q(**{f"{name}__{op}": value})
+        if clause is not None:
+            term |= Q(**{name: value}) & clause
+        clause = term
+    return clause
+
+
+class MirrorService:
+    """
+    Neo4jService-compatible reads served from indexed SQLite queries
+    """
+
+    COUNTABLE_LABELS = CypherQueries.COUNTABLE_LABELS
+    thoughts_keyset = CypherQueries.thoughts_keyset
+    quotes_keyset = CypherQueries.quotes_keyset
+    passages_keyset = CypherQueries.passages_keyset
+    tag_items_keyset = CypherQueries.tag_items_keyset
+
+    def _items(self, node_type):
+        return ContentItem.objects.filter(node_type=node_type, is_active=True)
+
+    def _page(self, queryset, columns, skip, limit, after, descending=False):
+        if after:
+            queryset = queryset.filter(_after(columns, after, descending))
+            skip = 0
+        order = [f"-{name}" if descending else name for name in columns]
+        return list(queryset.order_by(*order)[skip:skip + limit])
+
+    def get_label_count(self, label):
+        """Get the number of mirrored items with a label"""
+        if label not in self.COUNTABLE_LABELS:
+            raise ValueError(f"Unsupported label: {label}")
+        if label == 'TOPIC':
+            return Topic.objects.active().count()
+        return self._items(label).count()
+
+    def get_all_thoughts(self, skip=0, limit=20, after=None):
+        """Get all thoughts with pagination"""
+        items = self._page(self._items('THOUGHT'), ['neo4j_id'], skip, limit, after, descending=True)
+        return [{
+            'ID': item.uid,
+            'Name': item.neo4j_id,
+            'Parent': item.parent_id,
+            'Tags': item.tags,
+            'Level': item.level,
+        } for item in items]
+
+    def get_all_quotes(self, skip=0, limit=20, after=None):
+        """Get all quotes with pagination"""
+        items = self._page(self._items('QUOTE'), ['neo4j_id'], skip, limit, after)
+        return [{
+            'id': item.neo4j_id,
+            'title': item.title,
+            'content': item.content,
+            'author': item.author,
+            'source': item.source,
+            'level': item.level,
+            'parent': item.parent_id,
+            'tags': item.tags,
+            'parent_topic': item.parent_topic,
+        } for item in items]
+
+    def get_all_passages(self, skip=0, limit=20, after=None):
+        """Get all Bible passages with pagination"""
+        # Same expressions as the content_item_passage_order index
+        queryset = self._items('PASSAGE').annotate(
+            sort_book=Coalesce('book', Value('')),
+            sort_chapter=Coalesce('chapter', 0),
+            sort_verse=Coalesce('verse', 0),
+        )
+        columns = ['sort_book', 'sort_chapter', 'sort_verse', 'neo4j_id']
+        items = self._page(queryset, columns, skip, limit, after)
+        return [{
+            'id': item.neo4j_id,
+            'title': item.title,
+            'content': item.content,
+            'book': item.book,
+            'chapter': item.chapter,
+            'verse': item.verse,
+            'level': item.level,
+            'parent': item.parent_id,
+            'tags': item.tags,
+            'parent_topic': item.parent_topic,
+        } for item in items]
+
+    def get_item_by_id(self, item_id, node_type):
+        """Get a specific item by ID and type, shaped like Neo4jService.get_item_by_id"""
+        node_type = node_type.upper()
+        if node_type == 'TOPIC':
+            return self._topic_detail(item_id)
+        if node_type not in self.COUNTABLE_LABELS:
+            return None
+        item = self._items(node_type).filter(neo4j_id=item_id).first()
+        if item is None:
+            return None
+        node = {
+            'name': item.neo4j_id, 'id': item.uid, 'alias': item.title, 'level': item.level,
+            'parent': item.parent_id, 'tags': item.tags, 'author': item.author,
+            'source': item.source, 'book': item.book, 'chapter': item.chapter, 'verse': item.verse,
+        }
+        parent = None
+        if item.parent_topic:
+            parent = Topic.objects.active().filter(neo4j_id=item.parent_topic).values('neo4j_id', 'title').first()
+        return {
+            'n': {key: value for key, value in node.items() if value is not None},
+            'content': item.content,
+            'description': None,
+            'tags': item.tags,
+            'children': [],
+            'parent_name': parent['neo4j_id'] if parent else item.parent_topic,
+            'parent_alias': parent['title'] if parent else None,
+        }
+
+    def _topic_detail(self, topic_id):
+        topic = Topic.objects.active().filter(neo4j_id=topic_id).first()
+        if topic is None:
+            return None
+        tags = list(topic.topic_tags.order_by('tag').values_list('tag', flat=True))
+        children = [
+            {'name': name, 'alias': title, 'type': 'TOPIC'}
+            for name, title in Topic.objects.active().filter(parent_id=topic_id).values_list('neo4j_id', 'title')
+        ]
+        children.extend(
+            {'name': name, 'alias': title, 'type': node_type}
+            for name, title, node_type in ContentItem.objects.filter(
+                parent_topic=topic_id, is_active=True
+            ).values_list('neo4j_id', 'title', 'node_type')
+        )
+        parent = None
+        if topic.parent_id:
+            parent = Topic.objects.active().filter(neo4j_id=topic.parent_id).values('neo4j_id', 'title').first()
+        node = {'name': topic.neo4j_id, 'alias': topic.title, 'level': topic.level,
+                'parent': topic.parent_id, 'tags': tags}
+        return {
+            'n': {key: value for key, value in node.items() if value is not None},
+            'content': None,
+            'description': topic.description,
+            'tags': tags,
+            'children': children,
+            'parent_name': parent['neo4j_id'] if parent else None,
+            'parent_alias': parent['title'] if parent else None,
+        }
+
+    def _tag_labels(self, types):
+        if not types:
+            return list(self.COUNTABLE_LABELS)
+        unknown = set(types) - set(self.COUNTABLE_LABELS)
+        if unknown:
+            raise ValueError(f"Unsupported label: {', '.join(sorted(unknown))}")
+        return [label for label in self.COUNTABLE_LABELS if label in types]
+
+    def get_items_by_tag(self, tag_name, skip=0, limit=20, after=None, types=None):
+        """
+        Items carrying a tag in (level, name, type) order
+
+        Topics and content items are paged separately, each keeping its
+        first skip + limit rows, and merged like the label branches of
+        CypherQueries.items_by_tag_query.
+        """
+        labels = self._tag_labels(types)
+        columns = ['sort_level', 'neo4j_id', 'sort_type']
+        window = limit if after else skip + limit
+        sources = []
+
+        if 'TOPIC' in labels:
+            topics = Topic.objects.active().filter(topic_tags__tag=tag_name).annotate(
+                sort_level=Coalesce('level', 0), sort_type=Value('TOPIC'),
+            )
+            topics = self._page(topics, columns, 0, window, after)
+            tags = {}
+            for topic_id, tag in TopicTag.objects.filter(topic__in=topics).order_by('tag').values_list('topic_id', 'tag'):
+                tags.setdefault(topic_id, []).append(tag)
+            sources.append([{
+                'id': topic.neo4j_id,
+                'title': topic.title,
+                'content': topic.description or '',
+                'type': 'TOPIC',
+                'level': topic.level,
+                'tags': tags.get(topic.pk, []),
+            } for topic in topics])
+
+        item_labels = [label for label in labels if label != 'TOPIC']
+        if item_labels:
+            items = ContentItem.objects.filter(
+                is_active=True, node_type__in=item_labels, item_tags__tag=tag_name
+            ).annotate(sort_level=Coalesce('level', 0), sort_type=F('node_type'))
+            items = self._page(items, columns, 0, window, after)
+            sources.append([{
+                'id': item.neo4j_id,
+                'title': item.title,
+                'content': item.content,
+                'type': item.node_type,
+                'level': item.level,
+                'tags': item.tags,
+            } for item in items])
+
+        merged = heapq.merge(*sources, key=self.tag_items_keyset.row_key)
+        rows = list(merged)
+        start = 0 if after else skip
+        return rows[start:start + limit]
+
+    def get_tag_item_count(self, tag_name, types=None):
+        """Count items carrying a tag"""
+        labels = self._tag_labels(types)
+        total = 0
+        if 'TOPIC' in labels:
+            total += Topic.objects.active().filter(topic_tags__tag=tag_name).count()
+        item_labels = [label for label in labels if label != 'TOPIC']
+        if item_labels:
+            total += ContentItem.objects.filter(
+                is_active=True, node_type__in=item_labels, item_tags__tag=tag_name
+            ).count()
+        return total
+
+
+# Global mirror read service
+mirror_service = MirrorService()
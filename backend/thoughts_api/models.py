@@ -1,3 +1,105 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 
-# Create your models here.
+
+class ContentItem(models.Model):
+    """
+    Django mirror of a THOUGHT, QUOTE or PASSAGE node and its content body
+
+    Populated by the content sync (topics.sync.bulk_sync_items) and read
+    through thoughts_api.mirror; Neo4j stays the source of truth.
+    """
+
+    NODE_TYPES = [
+        ('THOUGHT', 'Thought'),
+        ('QUOTE', 'Quote'),
+        ('PASSAGE', 'Passage'),
+    ]
+
+    node_type = models.CharField(max_length=20, choices=NODE_TYPES)
+    neo4j_id = models.CharField(max_length=255, help_text="Name of the Neo4j node")
+    uid = models.CharField(max_length=255, blank=True, null=True, help_text="id property of the Neo4j node")
+    title = models.CharField(max_length=255, blank=True)
+    content = models.TextField(blank=True, help_text="en_content of the HAS_CONTENT node")
+    level = models.IntegerField(null=True, blank=True)
+    parent_id = models.CharField(max_length=255, blank=True, null=True)
+    parent_topic = models.CharField(max_length=255, blank=True, null=True, db_index=True,
+                                    help_text="Name of the TOPIC linking to this item with HAS_CHILD")
+    tags = models.JSONField(default=list, blank=True)
+
+    # Type-specific properties
+    author = models.CharField(max_length=255, blank=True, null=True)
+    source = models.CharField(max_length=255, blank=True, null=True)
+    book = models.CharField(max_length=100, blank=True, null=True)
+    chapter = models.IntegerField(null=True, blank=True)
+    verse = models.IntegerField(null=True, blank=True)
+
+    content_hash = models.CharField(max_length=40, blank=True,
+                                    help_text="Fingerprint of the mirrored Neo4j fields and tags")
+    is_active = models.BooleanField(default=True)
+    last_synced = models.DateTimeField(auto_now=True, help_text="Last sync with Neo4j")
+
+    class Meta:
+        ordering = ['node_type', 'neo4j_id']
+        constraints = [
+            # Also the index behind the name-ordered thought and quote lists
+            models.UniqueConstraint(fields=['node_type', 'neo4j_id'], name='unique_content_item'),
+        ]
+        indexes = [
+            # Passage list order, matching CypherQueries.passages_keyset
+            models.Index(
+                F('node_type'), Coalesce('book', Value('')), Coalesce('chapter', 0),
+                Coalesce('verse', 0), F('neo4j_id'), name='content_item_passage_order',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.node_type} {self.neo4j_id}"
+
+
+class ContentItemTag(models.Model):
+    """Tags of a mirrored content item, one row per tag"""
+
+    item = models.ForeignKey(ContentItem, on_delete=models.CASCADE, related_name='item_tags')
+    tag = models.CharField(max_length=100, db_index=True)
+
+    class Meta:
+        unique_together = ['item', 'tag']
+
+    def __str__(self):
+        return f"{self.item} - {self.tag}"
+
+
+class DataVersionManager(models.Manager):
+    """Reads and advances named version counters"""
+
+    def current(self, name):
+        """Current value of a counter; 1 until it is first bumped"""
+        value = self.filter(name=name).values_list('value', flat=True).first()
+        return value or 1
+
+    def bump(self, name):
+        """Advance a counter and return the new value"""
+        with transaction.atomic():
+            self.get_or_create(name=name)
+            self.filter(name=name).update(value=F('value') + 1)
+            return self.current(name)
+
+
+class DataVersion(models.Model):
+    """
+    Generation counter of a cached data set, such as the content snapshot
+
+    Kept in the database rather than the Django cache so that every web
+    and topics_worker process sees a bump, and a cache cull can never
+    reset it to an old value.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.PositiveBigIntegerField(default=1)
+
+    objects = DataVersionManager()
+
+    def __str__(self):
+        return f"{self.name} v{self.value}"
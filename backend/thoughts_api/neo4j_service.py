@@ -1,45 +1,126 @@
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, Query
+from neo4j.exceptions import Neo4jError, ServiceUnavailable, SessionExpired, TransientError
 from django.conf import settings
+from django.core.cache import cache
+from .circuit_breaker import CircuitBreaker
+from .pagination import Keyset
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
-class Neo4jService:
-    def __init__(self):
-        self.driver = GraphDatabase.driver(
-            settings.NEO4J_URI,
-            auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
-        )
-    
-    def close(self):
-        if self.driver:
-            self.driver.close()
-    
-    def run_query(self, query, parameters=None):
-        """Execute a Cypher query and return results"""
-        try:
-            with self.driver.session(database=settings.NEO4J_DATABASE) as session:
-                result = session.run(query, parameters or {})
-                return [record.data() for record in result]
-        except Exception as e:
-            logger.error(f"Neo4j query error: {e}")
-            raise
-    
-    def get_all_thoughts(self, skip=0, limit=20):
-        """Get all thoughts with pagination"""
-        query = """
+
+# Full-text indexes backing the 'fulltext' search mode, as
+# name -> (labels, properties). Created by `manage.py neo4j_indexes`.
+ITEM_TEXT_INDEX = 'bot_item_text'
+BODY_TEXT_INDEX = 'bot_body_text'
+FULLTEXT_INDEXES = {
+    ITEM_TEXT_INDEX: (['TOPIC', 'THOUGHT', 'QUOTE', 'PASSAGE'], ['alias', 'name', 'tags']),
+    BODY_TEXT_INDEX: (['CONTENT', 'DESCRIPTION'], ['en_content']),
+}
+
+# Range indexes on the content labels, as name -> (label, property).
+# Item lookups match on name, and label-scoped list queries such as
+# items_by_tag_query sort and page on it.
+RANGE_INDEXES = {
+    f"bot_{label.lower()}_name": (label, 'name')
+    for label in ('TOPIC', 'THOUGHT', 'QUOTE', 'PASSAGE')
+}
+
+LUCENE_SPECIAL_CHARS = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def build_lucene_query(search_term):
+    """
+    Turn free text into a Lucene query: every word must match, either
+    exactly (boosted) or as a prefix, so partially typed words still hit.
+    """
+    words = [LUCENE_SPECIAL_CHARS.sub(r'\\\1', word) for word in search_term.split()]
+    words = [word for word in words if word]
+    if not words:
+        return '""'
+    return ' AND '.join(f"({word}^2 OR {word}*)" for word in words)
+
+
+def is_outage(error):
+    """Whether a query error means Neo4j is unreachable or overloaded rather than the query being wrong"""
+    if isinstance(error, (ServiceUnavailable, SessionExpired, TransientError, OSError)):
+        return True
+    # Transactions cut off by the per-query timeout
+    return isinstance(error, Neo4jError) and 'TimedOut' in (error.code or '')
+
+
+def split_search_total(rows):
+    """Pull the per-row total of a full-text search out of its result rows"""
+    total = rows[0]['total'] if rows else 0
+    results = [{k: v for k, v in row.items() if k != 'total'} for row in rows]
+    return results, total
+
+
+class CypherQueries:
+    """
+    Cypher builders shared by the sync and async Neo4j services.
+    Each builder returns a (query, parameters) tuple.
+
+    List builders accept an optional ``after`` cursor (decoded sort values)
+    and then page with a keyset predicate instead of SKIP.
+    """
+
+    COUNTABLE_LABELS = ('TOPIC', 'THOUGHT', 'QUOTE', 'PASSAGE')
+    # Labels mirrored into thoughts_api.models.ContentItem
+    MIRROR_LABELS = ('THOUGHT', 'QUOTE', 'PASSAGE')
+
+    thoughts_keyset = Keyset([('t.name', 'Name', None)], descending=True)
+    topics_keyset = Keyset([('t.level', 'level', 0), ('t.name', 'id', None)])
+    quotes_keyset = Keyset([('q.name', 'id', None)])
+    passages_keyset = Keyset([
+        ('p.book', 'book', ''), ('p.chapter', 'chapter', 0),
+        ('p.verse', 'verse', 0), ('p.name', 'id', None),
+    ])
+    search_keyset = Keyset([
+        ('level', 'level', 0), ('title', 'title', ''),
+        ('type', 'type', None), ('id', 'id', None),
+    ])
+    tag_items_keyset = Keyset([
+        ('level', 'level', 0), ('id', 'id', None), ('type', 'type', None),
+    ])
+    # Same order, evaluated inside the per-label branches of items_by_tag_query
+    tag_items_branch_keyset = Keyset([
+        ('item.level', 'level', 0), ('item.name', 'id', None), ('type', 'type', None),
+    ])
+    mirror_keyset = Keyset([('n.name', 'id', None)])
+
+    def _keyset_filter(self, keyset, after, skip, limit):
+        """Build the WHERE clause and parameters for a keyset-paged query"""
+        if not after:
+            return "", {"skip": skip, "limit": limit}
+        params = keyset.parameters(after)
+        params.update({"skip": 0, "limit": limit})
+        return f"WHERE {keyset.predicate()}", params
+
+    def thoughts_query(self, skip=0, limit=20, after=None):
+        where, params = self._keyset_filter(self.thoughts_keyset, after, skip, limit)
+        query = f"""
         MATCH (t:THOUGHT)
-        OPTIONAL MATCH (t)-[:HAS_CONTENT]->(c:CONTENT)
-        RETURN t.id as ID, t.name as Name, t.parent as Parent, t.tags as Tags, 
+        {where}
+        RETURN t.id as ID, t.name as Name, t.parent as Parent, t.tags as Tags,
                t.level as Level
-        ORDER BY t.name DESC
+        ORDER BY {self.thoughts_keyset.order_by()}
+        SKIP $skip LIMIT $limit
         """
-        return self.run_query(query, {"skip": skip, "limit": limit})
-    
-    def get_all_topics(self, skip=0, limit=20):
-        """Get all topics with pagination"""
-        query = """
-        MATCH (t:TOPIC)
+        return query, params
+
+    def count_query(self, label):
+        if label not in self.COUNTABLE_LABELS:
+            raise ValueError(f"Unsupported label: {label}")
+        # A bare label count is answered from the count store, not a scan
+        query = f"""
+        MATCH (n:{label}) RETURN count(n) AS total
+        """
+        return query, None
+
+    # Topic row of the topic list, read by the topic sync
+    topic_row = """
         OPTIONAL MATCH (t)-[:HAS_THOUGHT]->(thought:THOUGHT)
         OPTIONAL MATCH (t)-[:HAS_DESCRIPTION]->(desc:DESCRIPTION)
         RETURN t.name as id, t.alias as title, t.notes as description,
@@ -47,15 +128,33 @@ class Neo4jService:
                count(DISTINCT thought) as thought_count,
                t.tags as tags,
                desc.en_content as en_description
-        ORDER BY t.level ASC, t.name ASC
+    """
+
+    def topics_query(self, skip=0, limit=20, after=None):
+        where, params = self._keyset_filter(self.topics_keyset, after, skip, limit)
+        query = f"""
+        MATCH (t:TOPIC)
+        {where}
+        {self.topic_row}
+        ORDER BY {self.topics_keyset.order_by()}
         SKIP $skip LIMIT $limit
         """
-        return self.run_query(query, {"skip": skip, "limit": limit})
-    
-    def get_all_quotes(self, skip=0, limit=20):
-        """Get all quotes with pagination"""
-        query = """
+        return query, params
+
+    def topics_by_id_query(self, topic_ids):
+        query = f"""
+        MATCH (t:TOPIC)
+        WHERE t.name IN $topic_ids
+        {self.topic_row}
+        ORDER BY {self.topics_keyset.order_by()}
+        """
+        return query, {"topic_ids": list(topic_ids)}
+
+    def quotes_query(self, skip=0, limit=20, after=None):
+        where, params = self._keyset_filter(self.quotes_keyset, after, skip, limit)
+        query = f"""
         MATCH (q:QUOTE)
+        {where}
         OPTIONAL MATCH (q)-[:HAS_CONTENT]->(content:CONTENT)
         OPTIONAL MATCH (q)<-[:HAS_CHILD]-(parent:TOPIC)
         RETURN q.name as id, q.alias as title, content.en_content as content,
@@ -63,15 +162,16 @@ class Neo4jService:
                q.level as level, q.parent as parent,
                q.tags as tags,
                parent.name as parent_topic
-        ORDER BY q.name ASC
+        ORDER BY {self.quotes_keyset.order_by()}
         SKIP $skip LIMIT $limit
         """
-        return self.run_query(query, {"skip": skip, "limit": limit})
-    
-    def get_all_passages(self, skip=0, limit=20):
-        """Get all Bible passages with pagination"""
-        query = """
+        return query, params
+
+    def passages_query(self, skip=0, limit=20, after=None):
+        where, params = self._keyset_filter(self.passages_keyset, after, skip, limit)
+        query = f"""
         MATCH (p:PASSAGE)
+        {where}
         OPTIONAL MATCH (p)-[:HAS_CONTENT]->(content:CONTENT)
         OPTIONAL MATCH (p)<-[:HAS_CHILD]-(parent:TOPIC)
         RETURN p.name as id, p.alias as title, content.en_content as content,
@@ -79,13 +179,34 @@ class Neo4jService:
                p.level as level, p.parent as parent,
                p.tags as tags,
                parent.name as parent_topic
-        ORDER BY p.book, p.chapter, p.verse
+        ORDER BY {self.passages_keyset.order_by()}
         SKIP $skip LIMIT $limit
         """
-        return self.run_query(query, {"skip": skip, "limit": limit})
-    
-    def get_item_by_id(self, item_id, node_type):
-        """Get a specific item by ID and type"""
+        return query, params
+
+    def mirror_query(self, label, skip=0, limit=1000, after=None):
+        # Every mirrored property of a THOUGHT, QUOTE or PASSAGE, one row per node
+        if label not in self.MIRROR_LABELS:
+            raise ValueError(f"Unsupported label: {label}")
+        where, params = self._keyset_filter(self.mirror_keyset, after, skip, limit)
+        query = f"""
+        MATCH (n:{label})
+        {where}
+        WITH n ORDER BY n.name SKIP $skip LIMIT $limit
+        OPTIONAL MATCH (n)-[:HAS_CONTENT]->(content:CONTENT)
+        OPTIONAL MATCH (n)<-[:HAS_CHILD]-(parent:TOPIC)
+        WITH n, head(collect(DISTINCT content.en_content)) as content,
+             head(collect(DISTINCT parent.name)) as parent_topic
+        RETURN n.name as id, n.id as uid, n.alias as title, content,
+               n.level as level, n.parent as parent, n.tags as tags,
+               n.author as author, n.source as source,
+               n.book as book, n.chapter as chapter, n.verse as verse,
+               parent_topic
+        ORDER BY {self.mirror_keyset.order_by()}
+        """
+        return query, params
+
+    def item_query(self, item_id, node_type):
         query = f"""
         MATCH (n:{node_type} {{name: $item_id}})
         OPTIONAL MATCH (n)-[:HAS_CONTENT]->(content:CONTENT)
@@ -100,69 +221,118 @@ class Neo4jService:
                parent.name as parent_name,
                parent.alias as parent_alias
         """
-        result = self.run_query(query, {"item_id": item_id})
-        return result[0] if result else None
-    
-    def search_content(self, search_term, skip=0, limit=20):
-        """Search across all content types"""
+        return query, {"item_id": item_id}
+
+    # Label and body relationship of each branch of search_query
+    SEARCH_BRANCHES = (
+        ('THOUGHT', 'HAS_CONTENT', 'CONTENT'),
+        ('TOPIC', 'HAS_DESCRIPTION', 'DESCRIPTION'),
+        ('QUOTE', 'HAS_CONTENT', 'CONTENT'),
+        ('PASSAGE', 'HAS_CONTENT', 'CONTENT'),
+    )
+
+    def search_query(self, search_term, skip=0, limit=20, after=None):
+        # Each label branch applies the cursor and keeps only its first
+        # skip + limit matches before the branches are merged, so a deep
+        # cursor page sorts no more rows than the first page.
+        where, params = self._keyset_filter(self.search_keyset, after, skip, limit)
+        params["term"] = search_term
+        branches = "\n            UNION".join(
+            f"""
+            MATCH (n:{label})
+            OPTIONAL MATCH (n)-[:{relationship}]->(body:{body})
+            WITH n, body
+            WHERE toLower(n.alias) CONTAINS toLower($term)
+               OR toLower(n.name) CONTAINS toLower($term)
+               OR toLower(body.en_content) CONTAINS toLower($term)
+               OR ANY(tag IN n.tags WHERE toLower(tag) CONTAINS toLower($term))
+            WITH n.name as id, n.alias as title, body.en_content as content,
+                 '{label}' as type, n.level as level, n.tags as tags
+            {where}
+            RETURN DISTINCT id, title, content, type, level, tags
+            ORDER BY {self.search_keyset.order_by()}
+            LIMIT $skip + $limit"""
+            for label, relationship, body in self.SEARCH_BRANCHES
+        )
+        query = f"""
+        CALL {{{branches}
+        }}
+        RETURN id, title, content, type, level, tags
+        ORDER BY {self.search_keyset.order_by()}
+        SKIP $skip LIMIT $limit
+        """
+        return query, params
+
+    def fulltext_search_query(self, search_term, skip=0, limit=20):
+        query = f"""
+        CALL {{
+            CALL db.index.fulltext.queryNodes('{ITEM_TEXT_INDEX}', $query) YIELD node, score
+            RETURN node AS item, score
+            UNION ALL
+            CALL db.index.fulltext.queryNodes('{BODY_TEXT_INDEX}', $query) YIELD node, score
+            MATCH (item)-[:HAS_CONTENT|HAS_DESCRIPTION]->(node)
+            WHERE item:TOPIC OR item:THOUGHT OR item:QUOTE OR item:PASSAGE
+            RETURN item, score
+        }}
+        WITH item, sum(score) AS score
+        WITH collect({{item: item, score: score}}) AS hits
+        WITH hits, size(hits) AS total
+        UNWIND hits AS hit
+        WITH hit.item AS item, hit.score AS score, total
+        ORDER BY score DESC, item.name ASC
+        SKIP $skip LIMIT $limit
+        OPTIONAL MATCH (item)-[:HAS_CONTENT]->(c:CONTENT)
+        OPTIONAL MATCH (item)-[:HAS_DESCRIPTION]->(d:DESCRIPTION)
+        RETURN item.name as id, item.alias as title,
+               coalesce(c.en_content, d.en_content) as content,
+               labels(item)[0] as type, item.level as level, item.tags as tags,
+               score, total
+        ORDER BY score DESC, id ASC
+        """
+        return query, {"query": build_lucene_query(search_term), "skip": skip, "limit": limit}
+
+    def content_documents_query(self):
         query = """
         CALL {
-            MATCH (t:THOUGHT)
-            OPTIONAL MATCH (t)-[:HAS_CONTENT]->(c:CONTENT)
-            WHERE toLower(t.alias) CONTAINS toLower($term) 
-               OR toLower(t.name) CONTAINS toLower($term)
-               OR toLower(c.en_content) CONTAINS toLower($term)
-               OR ANY(tag IN t.tags WHERE toLower(tag) CONTAINS toLower($term))
-            RETURN t.name as id, t.alias as title, c.en_content as content,
-                   'THOUGHT' as type, t.level as level, t.tags as tags
-            UNION
-            MATCH (t:TOPIC)
-            OPTIONAL MATCH (t)-[:HAS_DESCRIPTION]->(d:DESCRIPTION)
-            WHERE toLower(t.alias) CONTAINS toLower($term) 
-               OR toLower(t.name) CONTAINS toLower($term)
-               OR toLower(d.en_content) CONTAINS toLower($term)
-               OR ANY(tag IN t.tags WHERE toLower(tag) CONTAINS toLower($term))
-            RETURN t.name as id, t.alias as title, d.en_content as content,
-                   'TOPIC' as type, t.level as level, t.tags as tags
-            UNION
-            MATCH (q:QUOTE)
-            OPTIONAL MATCH (q)-[:HAS_CONTENT]->(c:CONTENT)
-            WHERE toLower(q.alias) CONTAINS toLower($term) 
-               OR toLower(q.name) CONTAINS toLower($term)
-               OR toLower(c.en_content) CONTAINS toLower($term)
-               OR ANY(tag IN q.tags WHERE toLower(tag) CONTAINS toLower($term))
-            RETURN q.name as id, q.alias as title, c.en_content as content,
-                   'QUOTE' as type, q.level as level, q.tags as tags
-            UNION
-            MATCH (p:PASSAGE)
-            OPTIONAL MATCH (p)-[:HAS_CONTENT]->(c:CONTENT)
-            WHERE toLower(p.alias) CONTAINS toLower($term) 
-               OR toLower(p.name) CONTAINS toLower($term)
-               OR toLower(c.en_content) CONTAINS toLower($term)
-               OR ANY(tag IN p.tags WHERE toLower(tag) CONTAINS toLower($term))
-            RETURN p.name as id, p.alias as title, c.en_content as content,
-                   'PASSAGE' as type, p.level as level, p.tags as tags
+            MATCH (n:TOPIC)
+            OPTIONAL MATCH (n)-[:HAS_DESCRIPTION]->(d:DESCRIPTION)
+            RETURN n, d.en_content as content
+            UNION ALL
+            MATCH (n:THOUGHT)
+            OPTIONAL MATCH (n)-[:HAS_CONTENT]->(c:CONTENT)
+            RETURN n, c.en_content as content
+            UNION ALL
+            MATCH (n:QUOTE)
+            OPTIONAL MATCH (n)-[:HAS_CONTENT]->(c:CONTENT)
+            RETURN n, c.en_content as content
+            UNION ALL
+            MATCH (n:PASSAGE)
+            OPTIONAL MATCH (n)-[:HAS_CONTENT]->(c:CONTENT)
+            RETURN n, c.en_content as content
         }
-        RETURN id, title, content, type, level, tags
-        ORDER BY level ASC, title ASC
-        SKIP $skip LIMIT $limit
+        RETURN n.name as id, n.alias as title, content,
+               labels(n)[0] as type, n.level as level, n.tags as tags,
+               n.parent as parent
         """
-        return self.run_query(query, {"term": search_term, "skip": skip, "limit": limit})
-    
-    def get_graph_data(self, node_id=None, node_type=None):
-        """Get graph data for visualization"""
+        return query, None
+
+    def graph_query(self, node_id=None, node_type=None):
         if node_id and node_type:
-            # Get focused graph around specific node
+            # Get focused graph: every node within two hops of the center
+            # and the relationships among them
             query = f"""
             MATCH (center:{node_type} {{name: $node_id}})
-            OPTIONAL MATCH (center)-[r1]-(connected)
-            OPTIONAL MATCH (connected)-[r2]-(secondLevel)
-            WHERE distance(center, secondLevel) <= 2
-            WITH collect(DISTINCT center) + collect(DISTINCT connected) + collect(DISTINCT secondLevel) as nodes,
-                 collect(DISTINCT r1) + collect(DISTINCT r2) as relationships
-            UNWIND nodes as n
-            UNWIND relationships as r
-            RETURN collect(DISTINCT {{
+            OPTIONAL MATCH (center)-[*1..2]-(reached)
+            WITH center, collect(DISTINCT reached) as reached
+            WITH [center] + [n IN reached WHERE n <> center] as nodes
+            CALL {{
+                WITH nodes
+                UNWIND nodes as a
+                MATCH (a)-[r]->(b)
+                WHERE b IN nodes
+                RETURN collect(DISTINCT r) as relationships
+            }}
+            RETURN [n IN nodes | {{
                 id: n.name, 
                 title: n.alias, 
                 type: labels(n)[0],
@@ -177,78 +347,292 @@ class Neo4jService:
                     WHEN 'DESCRIPTION' THEN 6
                     ELSE 7
                 END
-            }}) as nodes,
-            collect(DISTINCT {{
+            }}] as nodes,
+            [r IN relationships | {{
                 source: startNode(r).name,
                 target: endNode(r).name,
                 type: type(r)
-            }}) as links
+            }}] as links
             """
-            return self.run_query(query, {"node_id": node_id})
-        else:
-            # Get overall graph structure
-            query = """
-            MATCH (n)
-            WHERE n:TOPIC OR n:THOUGHT OR n:QUOTE OR n:PASSAGE OR n:CONTENT OR n:DESCRIPTION
-            OPTIONAL MATCH (n)-[r]-(m)
-            WHERE m:TOPIC OR m:THOUGHT OR m:QUOTE OR m:PASSAGE OR m:CONTENT OR m:DESCRIPTION
-            WITH collect(DISTINCT n) + collect(DISTINCT m) as allNodes, collect(DISTINCT r) as allRels
-            UNWIND allNodes as node
-            UNWIND allRels as rel
-            RETURN collect(DISTINCT {
-                id: node.name, 
-                title: node.alias, 
-                type: labels(node)[0],
-                level: node.level,
-                tags: node.tags,
-                group: CASE labels(node)[0]
-                    WHEN 'TOPIC' THEN 1
-                    WHEN 'THOUGHT' THEN 2
-                    WHEN 'QUOTE' THEN 3
-                    WHEN 'PASSAGE' THEN 4
-                    WHEN 'CONTENT' THEN 5
-                    WHEN 'DESCRIPTION' THEN 6
-                    ELSE 7
-                END
-            }) as nodes,
-            collect(DISTINCT {
-                source: startNode(rel).name,
-                target: endNode(rel).name,
-                type: type(rel)
-            }) as links
-            LIMIT 500
-            """
-            return self.run_query(query)
-    
-    def get_tags(self):
-        """Get all tags with usage count"""
+            return query, {"node_id": node_id}
+
+        raise ValueError("graph_query needs a node; the overview is built by graph_app.snapshot")
+
+    def graph_nodes_query(self, label, limit):
+        query = f"""
+        MATCH (n:{label})
+        RETURN n.name as id, n.alias as title, '{label}' as type,
+               n.level as level, n.tags as tags
+        ORDER BY coalesce(n.level, 0) ASC, n.name ASC
+        LIMIT $limit
+        """
+        return query, {"limit": limit}
+
+    def graph_links_query(self, label, labels, node_ids, limit):
+        # Only links whose ends are both among the nodes already fetched
+        query = f"""
+        MATCH (a:{label})-[r]->(b)
+        WHERE a.name IN $node_ids AND b.name IN $node_ids AND labels(b)[0] IN $labels
+        RETURN a.name as source, b.name as target, type(r) as type
+        LIMIT $limit
+        """
+        return query, {"labels": list(labels), "node_ids": list(node_ids), "limit": limit}
+
+    def adjacency_nodes_query(self, label):
+        query = f"""
+        MATCH (n:{label})
+        RETURN n.name as id, n.alias as title, '{label}' as type,
+               n.level as level, n.tags as tags
+        """
+        return query, None
+
+    def adjacency_links_query(self, label, labels):
+        query = f"""
+        MATCH (a:{label})-[r]->(b)
+        WHERE labels(b)[0] IN $labels
+        RETURN a.name as source, '{label}' as source_type,
+               b.name as target, labels(b)[0] as target_type, type(r) as type
+        """
+        return query, {"labels": list(labels)}
+
+    def tags_query(self):
         query = """
         MATCH (n) WHERE n.tags IS NOT NULL RETURN n.tags AS allTags
         """
-        return self.run_query(query)
-    
-    def get_items_by_tag(self, tag_name, skip=0, limit=20):
-        """Get all items with a specific tag (using node properties)"""
-        query = """
-        MATCH (item)
-        WHERE item.tags IS NOT NULL AND $tag_name IN item.tags
-        AND (labels(item)[0] = 'TOPIC' OR labels(item)[0] = 'THOUGHT' OR labels(item)[0] = 'QUOTE' OR labels(item)[0] = 'PASSAGE')
+        return query, None
+
+    def _tag_labels(self, types):
+        if not types:
+            return list(self.COUNTABLE_LABELS)
+        unknown = set(types) - set(self.COUNTABLE_LABELS)
+        if unknown:
+            raise ValueError(f"Unsupported label: {', '.join(sorted(unknown))}")
+        return [label for label in self.COUNTABLE_LABELS if label in types]
+
+    def items_by_tag_query(self, tag_name, skip=0, limit=20, after=None, types=None):
+        # One label-scoped branch per content type, so CONTENT and DESCRIPTION
+        # nodes are never scanned. Each branch applies the cursor and keeps
+        # only its first skip + limit rows before the branches are merged.
+        params = {"tag_name": tag_name, "skip": skip, "limit": limit}
+        branch_filter = ""
+        if after:
+            params.update(self.tag_items_keyset.parameters(after))
+            params["skip"] = 0
+            branch_filter = f"WHERE {self.tag_items_branch_keyset.predicate()}"
+        branches = "\n            UNION ALL".join(
+            f"""
+            MATCH (item:{label})
+            WHERE $tag_name IN item.tags
+            WITH item, '{label}' as type
+            {branch_filter}
+            RETURN item, type
+            ORDER BY {self.tag_items_branch_keyset.order_by(projected=False)}
+            LIMIT $skip + $limit"""
+            for label in self._tag_labels(types)
+        )
+        query = f"""
+        CALL {{{branches}
+        }}
+        WITH item, type, item.level as level, item.name as id
+        ORDER BY {self.tag_items_keyset.order_by()}
+        SKIP $skip LIMIT $limit
         OPTIONAL MATCH (item)-[:HAS_CONTENT]->(content:CONTENT)
         OPTIONAL MATCH (item)-[:HAS_DESCRIPTION]->(desc:DESCRIPTION)
-        RETURN item.name as id, item.alias as title, 
-               CASE 
+        RETURN item.name as id, item.alias as title,
+               CASE
                    WHEN content.en_content IS NOT NULL THEN content.en_content
                    WHEN desc.en_content IS NOT NULL THEN desc.en_content
                    WHEN item.notes IS NOT NULL THEN item.notes
                    ELSE ''
                END as content,
-               labels(item)[0] as type,
+               type,
                item.level as level,
                item.tags as tags
-        ORDER BY item.level ASC, item.name ASC
-        SKIP $skip LIMIT $limit
+        ORDER BY {self.tag_items_keyset.order_by()}
         """
-        return self.run_query(query, {"tag_name": tag_name, "skip": skip, "limit": limit})
+        return query, params
+
+    def tag_item_count_query(self, tag_name, types=None):
+        counts = " + ".join(
+            f"COUNT {{ MATCH (item:{label}) WHERE $tag_name IN item.tags }}"
+            for label in self._tag_labels(types)
+        )
+        query = f"""
+        RETURN {counts} AS total
+        """
+        return query, {"tag_name": tag_name}
+
+
+class Neo4jService(CypherQueries):
+    COUNT_CACHE_TIMEOUT = 60
+    COUNT_CACHE_PREFIX = 'neo4j:count:'
+
+    def __init__(self):
+        self.driver = GraphDatabase.driver(
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
+        )
+        # Fails queries fast while AuraDB is down; readers check
+        # breaker.is_open to go straight to the Django mirror
+        self.breaker = CircuitBreaker(
+            'neo4j',
+            failure_threshold=settings.NEO4J_BREAKER_FAILURES,
+            reset_timeout=settings.NEO4J_BREAKER_RESET_TIMEOUT,
+            is_failure=is_outage,
+        )
+
+    def _query(self, query):
+        # Bound how long the server may run the query
+        return Query(query, timeout=settings.NEO4J_QUERY_TIMEOUT)
+
+    def close(self):
+        if self.driver:
+            self.driver.close()
+
+    def run_query(self, query, parameters=None):
+        """
+        Execute a Cypher query and return results
+
+        Raises:
+            CircuitOpenError: Without contacting Neo4j while the breaker is open
+        """
+        try:
+            with self.breaker.guard():
+                with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+                    result = session.run(self._query(query), parameters or {})
+                    return [record.data() for record in result]
+        except Exception as e:
+            logger.error(f"Neo4j query error: {e}")
+            raise
+
+    def stream_query(self, query, parameters=None):
+        """Execute a Cypher query and yield result rows as they arrive"""
+        try:
+            with self.breaker.guard():
+                with self.driver.session(database=settings.NEO4J_DATABASE) as session:
+                    for record in session.run(self._query(query), parameters or {}):
+                        yield record.data()
+        except Exception as e:
+            logger.error(f"Neo4j query error: {e}")
+            raise
+
+    def _run(self, query, parameters):
+        # Keep the two-argument call shape for queries that take parameters
+        if parameters is None:
+            return self.run_query(query)
+        return self.run_query(query, parameters)
+
+    def get_all_thoughts(self, skip=0, limit=20, after=None):
+        """Get all thoughts with pagination"""
+        return self._run(*self.thoughts_query(skip, limit, after))
+
+    def get_label_count(self, label):
+        """Get the number of nodes with a label, cached briefly per label"""
+        cache_key = f"{self.COUNT_CACHE_PREFIX}{label}"
+        total = cache.get(cache_key)
+        if total is None:
+            result = self._run(*self.count_query(label))
+            total = result[0]['total'] if result else 0
+            cache.set(cache_key, total, self.COUNT_CACHE_TIMEOUT)
+        return total
+
+    def get_all_topics(self, skip=0, limit=20, after=None):
+        """Get all topics with pagination"""
+        return self._run(*self.topics_query(skip, limit, after))
+
+    def get_topics_by_id(self, topic_ids):
+        """Get the topic list rows of the given topic names"""
+        return self._run(*self.topics_by_id_query(topic_ids))
+
+    def get_all_quotes(self, skip=0, limit=20, after=None):
+        """Get all quotes with pagination"""
+        return self._run(*self.quotes_query(skip, limit, after))
+
+    def get_all_passages(self, skip=0, limit=20, after=None):
+        """Get all Bible passages with pagination"""
+        return self._run(*self.passages_query(skip, limit, after))
+
+    def get_mirror_rows(self, label, limit=1000, after=None):
+        """Get one keyset page of THOUGHT, QUOTE or PASSAGE rows for the Django mirror"""
+        return self._run(*self.mirror_query(label, limit=limit, after=after))
+
+    def get_item_by_id(self, item_id, node_type):
+        """Get a specific item by ID and type"""
+        result = self._run(*self.item_query(item_id, node_type))
+        return result[0] if result else None
+
+    def search_content(self, search_term, skip=0, limit=20, after=None):
+        """Search across all content types"""
+        return self._run(*self.search_query(search_term, skip, limit, after))
+
+    def fulltext_search(self, search_term, skip=0, limit=20):
+        """
+        Search all content types through the Neo4j full-text indexes
+
+        Returns:
+            Tuple of (results ordered by relevance score, total hit count)
+        """
+        rows = self._run(*self.fulltext_search_query(search_term, skip, limit))
+        return split_search_total(rows)
+
+    def create_fulltext_indexes(self):
+        """Create the full-text indexes used by fulltext_search if missing"""
+        for name, (labels, properties) in FULLTEXT_INDEXES.items():
+            label_expr = '|'.join(labels)
+            property_expr = ', '.join(f"n.{prop}" for prop in properties)
+            self.run_query(
+                f"CREATE FULLTEXT INDEX {name} IF NOT EXISTS "
+                f"FOR (n:{label_expr}) ON EACH [{property_expr}]"
+            )
+
+    def get_fulltext_index_status(self):
+        """Get the state of the full-text search indexes, keyed by name"""
+        rows = self.run_query(
+            "SHOW FULLTEXT INDEXES YIELD name, state, populationPercent "
+            "WHERE name IN $names RETURN name, state, populationPercent",
+            {"names": list(FULLTEXT_INDEXES)}
+        )
+        return {row['name']: row for row in rows}
+
+    def create_range_indexes(self):
+        """Create the range indexes on the content labels if missing"""
+        for name, (label, prop) in RANGE_INDEXES.items():
+            self.run_query(
+                f"CREATE RANGE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+            )
+
+    def get_range_index_status(self):
+        """Get the state of the content label range indexes, keyed by name"""
+        rows = self.run_query(
+            "SHOW RANGE INDEXES YIELD name, state, populationPercent "
+            "WHERE name IN $names RETURN name, state, populationPercent",
+            {"names": list(RANGE_INDEXES)}
+        )
+        return {row['name']: row for row in rows}
+
+    def get_content_documents(self):
+        """Get every TOPIC/THOUGHT/QUOTE/PASSAGE with its body text"""
+        return self._run(*self.content_documents_query())
+
+    def get_graph_data(self, node_id=None, node_type=None):
+        """Get graph data for visualization"""
+        if not (node_id and node_type):
+            from graph_app.snapshot import build_graph_snapshot
+            return [build_graph_snapshot(self, layout=True)]
+        return self._run(*self.graph_query(node_id, node_type))
+
+    def get_tags(self):
+        """Get all tags with usage count"""
+        return self._run(*self.tags_query())
+
+    def get_items_by_tag(self, tag_name, skip=0, limit=20, after=None, types=None):
+        """Get all items with a specific tag (using node properties)"""
+        return self._run(*self.items_by_tag_query(tag_name, skip, limit, after, types))
+
+    def get_tag_item_count(self, tag_name, types=None):
+        """Get the number of items with a specific tag"""
+        result = self._run(*self.tag_item_count_query(tag_name, types))
+        return result[0]['total'] if result else 0
 
 # Global service instance
-neo4j_service = Neo4jService()
\ No newline at end of file
+neo4j_service = Neo4jService()
@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination helpers for Neo4j list queries.
+
+A Keyset describes the ORDER BY of a query as a list of columns. It renders
+the ORDER BY clause and the matching "row comes after the cursor" predicate,
+so a page starts with an index-friendly range filter instead of SKIP.
+Cursors are opaque to clients: the sort values of the last row of a page,
+JSON encoded and base64url wrapped.
+"""
+
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client supplies a cursor we cannot decode"""
+
+
+def encode_cursor(values):
+    """Encode a list of sort values as an opaque cursor token"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token back into its list of sort values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+    if not isinstance(values, list):
+        raise InvalidCursor("Invalid cursor: expected a list of sort values")
+    return values
+
+
+def _cypher_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return repr(value)
+
+
+class Keyset:
+    """
+    Sort key of a paginated query.
+
+    Args:
+        columns: list of (cypher_expression, row_field, null_default) tuples,
+            most significant first. The expression is used in the cursor
+            predicate and row_field must be its alias in the RETURN clause.
+            The last column must be unique.
+        descending: Whether the query sorts in descending order
+    """
+
+    def __init__(self, columns, descending=False):
+        self.columns = columns
+        self.descending = descending
+
+    def _expr(self, column, projected=False):
+        expression, field, default = column
+        if projected:
+            expression = field
+        if default is None:
+            return expression
+        return f"coalesce({expression}, {_cypher_literal(default)})"
+
+    def order_by(self, projected=True):
+        """
+        Render the ORDER BY expressions for this keyset. By default they
+        refer to the projected row fields, which stays valid after
+        aggregating RETURNs; pass projected=False to sort on the source
+        expressions before the final projection.
+        """
+        direction = 'DESC' if self.descending else 'ASC'
+        return ', '.join(f"{self._expr(column, projected)} {direction}" for column in self.columns)
+
+    def predicate(self, param='after'):
+        """
+        Render the predicate selecting rows strictly after the cursor,
+        expanded as (a > $a0) OR (a = $a0 AND (b > $a1 OR ...)).
+        """
+        op = '<' if self.descending else '>'
+        clause = None
+        for i in reversed(range(len(self.columns))):
+            expr = self._expr(self.columns[i])
+            term = f"{expr} {op} ${param}_{i}"
+            if clause is not None:
+                term = f"({term} OR ({expr} = ${param}_{i} AND {clause}))"
+            clause = term
+        return clause
+
+    def parameters(self, after, param='after'):
+        """Map decoded cursor values to query parameters"""
+        if len(after) != len(self.columns):
+            raise InvalidCursor("Invalid cursor: wrong number of sort values")
+        return {f"{param}_{i}": value for i, value in enumerate(after)}
+
+    def row_key(self, row):
+        """Extract the sort values of a result row"""
+        key = []
+        for _, field, default in self.columns:
+            value = row.get(field)
+            key.append(default if value is None else value)
+        return key
+
+    def paginate(self, rows, page_size):
+        """
+        Trim a result fetched with limit=page_size + 1 to one page
+
+        Returns:
+            Tuple of (page_rows, next_cursor); next_cursor is None on the last page
+        """
+        if len(rows) <= page_size:
+            return rows, None
+        page = rows[:page_size]
+        return page, encode_cursor(self.row_key(page[-1]))
@@ -0,0 +1,156 @@
+"""
+Streaming Neo4j-to-SQLite sync pipeline.
+
+A producer thread pages a Neo4j list query on its keyset and hands each
+page to the writer through a bounded queue, so the next page is fetched
+while the previous one is being written and at most ``max_pages`` pages
+are ever held in memory. The writer runs in the calling thread, which
+owns the Django database connection (and any transaction around the
+sync). Each stage reports its own throughput, and the time it spent
+waiting on the other tells which side is the bottleneck.
+"""
+
+from dataclasses import dataclass
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rows per Neo4j page
+PAGE_SIZE = 1000
+# Pages buffered between the producer and the writer
+MAX_PAGES = 4
+# How often a blocked stage re-checks whether the other one gave up
+POLL_INTERVAL = 0.5
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Work done by one pipeline stage"""
+    name: str
+    records: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    @property
+    def records_per_second(self):
+        return self.records / self.busy_seconds if self.busy_seconds > 0 else None
+
+    def as_dict(self):
+        rate = self.records_per_second
+        return {
+            'records': self.records,
+            'batches': self.batches,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'wait_seconds': round(self.wait_seconds, 3),
+            'records_per_second': round(rate, 1) if rate is not None else None,
+        }
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+class SyncPipeline:
+    """
+    Producer/consumer pipeline from a keyset-paged query to a batch writer
+
+    Args:
+        fetch_page: Callable (after, limit) -> list of rows; after is None
+            for the first page
+        keyset: pagination.Keyset the query is ordered by
+        write_batch: Callable receiving each page of rows
+        page_size: Rows per page
+        max_pages: Capacity of the queue between the stages
+    """
+
+    def __init__(self, fetch_page, keyset, write_batch, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        self.fetch_page = fetch_page
+        self.keyset = keyset
+        self.write_batch = write_batch
+        self.page_size = page_size
+        self.queue = queue.Queue(maxsize=max_pages)
+        self.fetch = StageStats('fetch')
+        self.write = StageStats('write')
+        self._stopped = threading.Event()
+
+    def run(self):
+        """
+        Stream every row through write_batch
+
+        Returns:
+            Dict of per-stage throughput, keyed by stage name
+
+        Raises:
+            Whatever the producer or the writer raised; the other stage is
+            stopped first
+        """
+        producer = threading.Thread(target=self._produce, name='sync-pipeline-fetch', daemon=True)
+        started = time.monotonic()
+        producer.start()
+        try:
+            self._consume()
+        finally:
+            self._stopped.set()
+            producer.join()
+        report = self.report()
+        report['total_seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"Sync pipeline finished: {report}")
+        return report
+
+    def report(self):
+        return {stage.name: stage.as_dict() for stage in (self.fetch, self.write)}
+
+    def _produce(self):
+        after = None
+        try:
+            while not self._stopped.is_set():
+                started = time.monotonic()
+                page = self.fetch_page(after, self.page_size)
+                self.fetch.busy_seconds += time.monotonic() - started
+                if page:
+                    self.fetch.records += len(page)
+                    self.fetch.batches += 1
+                    if not self._put(page):
+                        return
+                if len(page) < self.page_size:
+                    break
+                after = self.keyset.row_key(page[-1])
+            self._put(_DONE)
+        except Exception as e:
+            self._put(_Failure(e))
+
+    def _put(self, item):
+        """Block until the writer takes item; False if the writer stopped"""
+        started = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    self.queue.put(item, timeout=POLL_INTERVAL)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.fetch.wait_seconds += time.monotonic() - started
+
+    def _consume(self):
+        while True:
+            started = time.monotonic()
+            item = self.queue.get()
+            self.write.wait_seconds += time.monotonic() - started
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            started = time.monotonic()
+            self.write_batch(item)
+            self.write.busy_seconds += time.monotonic() - started
+            self.write.records += len(item)
+            self.write.batches += 1
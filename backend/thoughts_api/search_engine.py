@@ -0,0 +1,232 @@
+"""
+In-process BM25 search engine over the content snapshot.
+
+For deployments that cannot add Neo4j full-text indexes, this answers
+/api/search/?mode=memory entirely from RAM. The inverted index is built
+from the content snapshot and patched incrementally when a sync reports
+changed items, so only those documents are re-tokenized.
+"""
+
+from collections import Counter, defaultdict
+import bisect
+import math
+import re
+import threading
+import logging
+
+from .snapshot import content_snapshot, item_key
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Each field's tokens count this many times towards a document's term
+# frequencies, so a hit in a title outranks one deep in a passage body.
+FIELD_WEIGHTS = {
+    'title': 3,
+    'id': 2,
+    'tags': 2,
+    'content': 1,
+}
+
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text):
+    """Lowercase word tokens of a string"""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def document_terms(doc):
+    """Weighted term frequencies of a snapshot document"""
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = doc.get(field)
+        if field == 'tags':
+            value = ' '.join(value or [])
+        for token in tokenize(value):
+            terms[token] += weight
+    return terms
+
+
+class InvertedIndex:
+    """
+    BM25-ranked inverted index keyed by snapshot item key
+
+    Not thread-safe on its own; SearchEngine serializes access.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {key: tf}
+        self.doc_lengths = {}
+        self.docs = {}
+        self.total_length = 0
+        self._vocabulary = None  # sorted terms, rebuilt lazily for prefix lookups
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, key, doc):
+        if key in self.docs:
+            self.remove(key)
+        terms = document_terms(doc)
+        for term, tf in terms.items():
+            if term not in self.postings:
+                self._vocabulary = None
+            self.postings[term][key] = tf
+        length = sum(terms.values())
+        self.doc_lengths[key] = length
+        self.total_length += length
+        self.docs[key] = doc
+
+    def remove(self, key):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return
+        for term in document_terms(doc):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+                self._vocabulary = None
+        self.total_length -= self.doc_lengths.pop(key, 0)
+
+    def expand(self, token):
+        """Terms matching a query token: itself, or its completions if unknown"""
+        if token in self.postings:
+            return [token]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def score(self, query):
+        """
+        Score every document matching at least one query term
+
+        Returns:
+            Dict of item key -> BM25 score
+        """
+        n_docs = len(self.docs)
+        if not n_docs:
+            return {}
+        avg_length = self.total_length / n_docs
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            for term in self.expand(token):
+                postings = self.postings[term]
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for key, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[key] / avg_length)
+                    scores[key] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+
+class SearchEngine:
+    """
+    Search facade keeping an InvertedIndex in step with the content snapshot
+    """
+
+    FACET_TAG_LIMIT = 20
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.index = InvertedIndex()
+        self._version = None
+        self._lock = threading.RLock()
+        snapshot.subscribe(self)
+
+    def rebuild(self):
+        """Rebuild the whole index from the snapshot"""
+        with self._lock:
+            items = self.snapshot.get_items()
+            index = InvertedIndex()
+            for key, doc in items.items():
+                index.add(key, doc)
+            self.index = index
+            self._version = self.snapshot.version
+            logger.info(f"Built search index v{self._version} over {len(index)} items")
+
+    def on_snapshot_changed(self, upserts, removed_keys, old_version, new_version):
+        with self._lock:
+            if self._version != old_version:
+                return  # stale or never built; the next search rebuilds
+            for key in removed_keys:
+                self.index.remove(key)
+            for doc in upserts:
+                self.index.add(item_key(doc['type'], doc['id']), doc)
+            self._version = new_version
+
+    def _ensure_current(self):
+        self.snapshot.get_items()
+        if self._version != self.snapshot.version:
+            self.rebuild()
+
+    def search(self, query, skip=0, limit=20, types=None):
+        """
+        BM25-ranked search across all content types
+
+        Args:
+            query: Free-text query
+            skip: Number of hits to skip
+            limit: Page size
+            types: Optional iterable of content types to keep
+
+        Returns:
+            Dict with 'results', 'total' and 'facets' (hit counts by type and tag)
+        """
+        with self._lock:
+            self._ensure_current()
+            scores = self.index.score(query)
+            docs = self.index.docs
+
+            hits = []
+            type_counts = Counter()
+            tag_counts = Counter()
+            for key, score in scores.items():
+                doc = docs[key]
+                type_counts[doc['type']] += 1
+                if types and doc['type'] not in types:
+                    continue
+                tag_counts.update(doc['tags'])
+                hits.append((score, key))
+
+            hits.sort(key=lambda hit: (-hit[0], docs[hit[1]]['level'] or 0, docs[hit[1]]['title']))
+            results = []
+            for score, key in hits[skip:skip + limit]:
+                doc = docs[key]
+                results.append({
+                    'id': doc['id'],
+                    'title': doc['title'],
+                    'content': doc['content'],
+                    'type': doc['type'],
+                    'level': doc['level'],
+                    'tags': doc['tags'],
+                    'score': round(score, 4),
+                })
+
+        return {
+            'results': results,
+            'total': len(hits),
+            'facets': {
+                'type': dict(type_counts),
+                'tags': tag_counts.most_common(self.FACET_TAG_LIMIT),
+            },
+        }
+
+
+# Global engine instance
+search_engine = SearchEngine(content_snapshot)
@@ -0,0 +1,151 @@
+"""
+In-process snapshot of all TOPIC/THOUGHT/QUOTE/PASSAGE items.
+
+The in-memory indexes (search, suggestions, tags) are built from this
+snapshot instead of querying Neo4j per request. Its version is a
+DataVersion row, so web and topics_worker processes share it: a sync that
+changes content bumps the version, the process that ran the sync applies
+the changes incrementally, and every other process reloads on next access.
+"""
+
+import threading
+import logging
+
+from .models import DataVersion
+from .neo4j_service import neo4j_service
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = ('TOPIC', 'THOUGHT', 'QUOTE', 'PASSAGE')
+CONTENT_VERSION_KEY = 'content:version'
+
+
+def item_key(node_type, item_id):
+    """Snapshot key of an item; names are only unique within a label"""
+    return f"{node_type}:{item_id}"
+
+
+def normalize_document(row):
+    """Normalize a Neo4j row into a snapshot document"""
+    tags = row.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return {
+        'id': row.get('id'),
+        'title': row.get('title') or '',
+        'content': row.get('content') or '',
+        'type': row.get('type'),
+        'level': row.get('level'),
+        'tags': list(tags),
+        'parent': row.get('parent'),
+    }
+
+
+def get_content_version():
+    """Current shared content version"""
+    return DataVersion.objects.current(CONTENT_VERSION_KEY)
+
+
+def bump_content_version():
+    """Advance the shared content version and return the new value"""
+    return DataVersion.objects.bump(CONTENT_VERSION_KEY)
+
+
+class ContentSnapshot:
+    """
+    Lazily loaded, versioned copy of all content items
+
+    Listeners are notified of incremental changes through
+    ``on_snapshot_changed(upserts, removed_keys, old_version, new_version)``
+    and should only patch themselves if they were built at ``old_version``;
+    otherwise they rebuild from ``get_items()`` when they next see that
+    ``version`` moved.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._items = None
+        self._version = None
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def subscribe(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def get_items(self):
+        """Get all items keyed by item_key(), reloading when stale"""
+        with self._lock:
+            shared_version = get_content_version()
+            if self._items is None or self._version != shared_version:
+                self._load(shared_version)
+            return self._items
+
+    def invalidate(self):
+        """Drop the snapshot in every process; it reloads on next access"""
+        with self._lock:
+            self._items = None
+            self._version = bump_content_version()
+
+    def apply_changes(self, upserts=(), removed_keys=()):
+        """
+        Apply documents changed by a sync
+
+        Args:
+            upserts: Normalized documents to add or replace
+            removed_keys: item_key() values of deleted items
+
+        Returns:
+            Number of items that actually changed
+        """
+        with self._lock:
+            if self._items is None or self._version != get_content_version():
+                # Nothing current loaded here, so there is nothing to patch;
+                # other processes still need to hear about the change.
+                self._items = None
+                self._version = bump_content_version()
+                return len(upserts) + len(removed_keys)
+
+            changed = []
+            for doc in upserts:
+                key = item_key(doc['type'], doc['id'])
+                if self._items.get(key) != doc:
+                    self._items[key] = doc
+                    changed.append(doc)
+            removed = [key for key in removed_keys if self._items.pop(key, None) is not None]
+
+            if not changed and not removed:
+                return 0
+
+            old_version = self._version
+            self._version = new_version = bump_content_version()
+            listeners = list(self._listeners)
+
+        # Listeners take their own locks and may read the snapshot, so they
+        # are told outside ours to keep lock ordering one-way.
+        for listener in listeners:
+            try:
+                listener.on_snapshot_changed(changed, removed, old_version, new_version)
+            except Exception as e:
+                logger.error(f"Snapshot listener {listener!r} failed: {e}")
+        return len(changed) + len(removed)
+
+    def _load(self, version):
+        rows = self._loader()
+        items = {}
+        for row in rows:
+            doc = normalize_document(row)
+            if doc['id'] is None or doc['type'] not in CONTENT_TYPES:
+                continue
+            items[item_key(doc['type'], doc['id'])] = doc
+        self._items = items
+        self._version = version
+        logger.info(f"Loaded content snapshot v{version} with {len(items)} items")
+
+
+# Global snapshot instance
+content_snapshot = ContentSnapshot(neo4j_service.get_content_documents)
@@ -0,0 +1,186 @@
+"""
+Maintained tag statistics over the content snapshot.
+
+Keeps tag -> per-type counts and tag -> item keys sorted by the same
+(level, name, type) order as the Neo4j tag listing, so the tags page and
+tag item listings cost O(distinct tags) and O(page) instead of a scan
+over every tagged node.
+"""
+
+from collections import Counter, defaultdict
+import bisect
+import threading
+import logging
+
+from .snapshot import content_snapshot, item_key
+
+logger = logging.getLogger(__name__)
+
+
+def _sort_key(doc):
+    # Matches CypherQueries.tag_items_keyset: coalesce(level, 0), name, type
+    level = doc['level']
+    return (0 if level is None else level, doc['id'], doc['type'])
+
+
+class TagIndex:
+    """
+    Tag counts and sorted item lists, patched incrementally on sync
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._version = None
+        self._lock = threading.RLock()
+        self._counts = defaultdict(Counter)  # tag -> {type: n}
+        self._items = defaultdict(list)      # tag -> sorted [(sort_key, item key)]
+        self._tagged = {}                    # item key -> (tags, sort_key, type)
+        self._docs = {}
+        snapshot.subscribe(self)
+
+    def _add(self, key, doc):
+        tags = tuple(dict.fromkeys(doc['tags']))
+        if not tags:
+            return
+        sort_key = _sort_key(doc)
+        self._tagged[key] = (tags, sort_key, doc['type'])
+        for tag in tags:
+            self._counts[tag][doc['type']] += 1
+            bisect.insort(self._items[tag], (sort_key, key))
+
+    def _remove(self, key):
+        entry = self._tagged.pop(key, None)
+        if entry is None:
+            return
+        tags, sort_key, node_type = entry
+        for tag in tags:
+            counts = self._counts[tag]
+            counts[node_type] -= 1
+            if counts[node_type] <= 0:
+                del counts[node_type]
+            items = self._items[tag]
+            pos = bisect.bisect_left(items, (sort_key, key))
+            if pos < len(items) and items[pos] == (sort_key, key):
+                del items[pos]
+            if not counts:
+                del self._counts[tag]
+                del self._items[tag]
+
+    def rebuild(self):
+        with self._lock:
+            items = self.snapshot.get_items()
+            self._counts = defaultdict(Counter)
+            self._items = defaultdict(list)
+            self._tagged = {}
+            for key, doc in items.items():
+                self._add(key, doc)
+            self._docs = items
+            self._version = self.snapshot.version
+            logger.info(f"Built tag index v{self._version} over {len(self._counts)} tags")
+
+    def on_snapshot_changed(self, upserts, removed_keys, old_version, new_version):
+        with self._lock:
+            if self._version != old_version:
+                return  # stale or never built; the next read rebuilds
+            for key in removed_keys:
+                self._remove(key)
+            for doc in upserts:
+                key = item_key(doc['type'], doc['id'])
+                self._remove(key)
+                self._add(key, doc)
+            # self._docs is the snapshot's own dict, already patched in place
+            self._version = new_version
+
+    def _ensure_current(self):
+        self.snapshot.get_items()
+        if self._version != self.snapshot.version:
+            self.rebuild()
+
+    def tag_stats(self, prefix=None, sort='count', content_type=None, skip=0, limit=50):
+        """
+        Distinct tags with usage counts
+
+        Args:
+            prefix: Only tags starting with this (case-insensitive)
+            sort: 'count' (most used first) or 'name'
+            content_type: Count only this content type
+            skip: Number of tags to skip
+            limit: Page size
+
+        Returns:
+            Tuple of (page of tag rows, number of matching tags)
+        """
+        with self._lock:
+            self._ensure_current()
+            prefix = (prefix or '').lower()
+            rows = []
+            for tag, counts in self._counts.items():
+                if prefix and not tag.lower().startswith(prefix):
+                    continue
+                usage = counts.get(content_type, 0) if content_type else sum(counts.values())
+                if not usage:
+                    continue
+                rows.append({'name': tag, 'usage_count': usage, 'counts': dict(counts)})
+
+        if sort == 'name':
+            rows.sort(key=lambda row: row['name'].lower())
+        else:
+            rows.sort(key=lambda row: (-row['usage_count'], row['name'].lower()))
+        return rows[skip:skip + limit], len(rows)
+
+    def top_tags(self, limit=10, content_type=None):
+        """Most used tags as (tag, count) pairs"""
+        rows, _ = self.tag_stats(content_type=content_type, limit=limit)
+        return [(row['name'], row['usage_count']) for row in rows]
+
+    def items_for_tag(self, tag, skip=0, limit=20, after=None, types=None):
+        """
+        Items carrying a tag, in (level, name, type) order
+
+        Args:
+            tag: Exact tag
+            skip: Number of items to skip when not paging by cursor
+            limit: Page size
+            after: Decoded cursor (level, name, type) of the previous page's last row
+            types: Optional iterable of content types to keep
+
+        Returns:
+            Tuple of (item rows, total items with the tag and type filter)
+        """
+        with self._lock:
+            self._ensure_current()
+            entries = self._items.get(tag, [])
+            counts = self._counts.get(tag, {})
+            if types:
+                total = sum(counts.get(node_type, 0) for node_type in types)
+            else:
+                total = sum(counts.values())
+
+            start = 0
+            skip_left = 0 if after else skip
+            if after:
+                # Sorts after every item key that shares the cursor's sort key
+                start = bisect.bisect_right(entries, (tuple(after), '\uffff'))
+            rows = []
+            for _, key in entries[start:]:
+                doc = self._docs[key]
+                if types and doc['type'] not in types:
+                    continue
+                if skip_left:
+                    skip_left -= 1
+                    continue
+                rows.append({
+                    'id': doc['id'],
+                    'title': doc['title'],
+                    'content': doc['content'],
+                    'type': doc['type'],
+                    'level': doc['level'],
+                    'tags': doc['tags'],
+                })
+                if len(rows) >= limit:
+                    break
+        return rows, total
+
+
+# Global tag index instance
+tag_index = TagIndex(content_snapshot)
@@ -1,9 +1,23 @@
-from django.test import TestCase
-from unittest.mock import Mock, patch, MagicMock
+import asyncio
+
+from django.test import TestCase, override_settings
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from django.conf import settings
-from neo4j.exceptions import ServiceUnavailable, AuthError
+from django.core.cache import cache
+from neo4j.exceptions import CypherSyntaxError, ServiceUnavailable, AuthError
 
-from .neo4j_service import Neo4jService
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .fts_index import fts_index, match_expression
+from .mirror import MirrorService
+from .models import ContentItem, ContentItemTag
+from .neo4j_service import Neo4jService, build_lucene_query
+from .async_neo4j_service import AsyncNeo4jService
+from .pagination import InvalidCursor, Keyset, decode_cursor, encode_cursor
+from .pipeline import SyncPipeline
+from .search_engine import SearchEngine
+from .snapshot import ContentSnapshot, bump_content_version, get_content_version, normalize_document
+from .tag_index import TagIndex
+from .trigram_index import SuggestionIndex, trigrams
 
 
 class TestNeo4jService(TestCase):
@@ -58,7 +72,10 @@ class TestNeo4jService(TestCase):
         service = Neo4jService()
         result = service.run_query("MATCH (n) RETURN n", {"param": "value"})
         
-        self.mock_session.run.assert_called_once_with("MATCH (n) RETURN n", {"param": "value"})
+        self.mock_session.run.assert_called_once()
+        query, params = self.mock_session.run.call_args[0]
+        self.assertEqual((query.text, query.timeout), ("MATCH (n) RETURN n", settings.NEO4J_QUERY_TIMEOUT))
+        self.assertEqual(params, {"param": "value"})
         self.assertEqual(result, [{'id': 1, 'name': 'test'}])
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
@@ -71,7 +88,8 @@ class TestNeo4jService(TestCase):
         service = Neo4jService()
         result = service.run_query("MATCH (n) RETURN count(n)")
         
-        self.mock_session.run.assert_called_once_with("MATCH (n) RETURN count(n)", {})
+        query, params = self.mock_session.run.call_args[0]
+        self.assertEqual((query.text, params), ("MATCH (n) RETURN count(n)", {}))
         self.assertEqual(result, [{'count': 5}])
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
@@ -100,132 +118,108 @@ class TestNeo4jService(TestCase):
             
             expected_query = """
         MATCH (t:THOUGHT)
-        OPTIONAL MATCH (t)-[:HAS_CONTENT]->(c:CONTENT)
-        RETURN t.id as ID, t.name as Name, t.parent as Parent, t.tags as Tags, 
+        
+        RETURN t.id as ID, t.name as Name, t.parent as Parent, t.tags as Tags,
                t.level as Level
-        ORDER BY t.name DESC
+        ORDER BY Name DESC
+        SKIP $skip LIMIT $limit
         """
             mock_run_query.assert_called_once_with(expected_query, {"skip": 10, "limit": 5})
             self.assertEqual(result, expected_result)
     
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_get_all_thoughts_with_cursor(self, mock_driver):
+        with patch.object(Neo4jService, 'run_query', return_value=[]) as mock_run_query:
+            service = Neo4jService()
+            service.get_all_thoughts(skip=10, limit=5, after=['Thought 9'])
+            
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("WHERE t.name < $after_0", query)
+            self.assertEqual(params, {"after_0": 'Thought 9', "skip": 0, "limit": 5})
+    
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_get_label_count_is_cached(self, mock_driver):
+        cache.clear()
+        with patch.object(Neo4jService, 'run_query', return_value=[{'total': 42}]) as mock_run_query:
+            service = Neo4jService()
+            
+            self.assertEqual(service.get_label_count('THOUGHT'), 42)
+            self.assertEqual(service.get_label_count('THOUGHT'), 42)
+            mock_run_query.assert_called_once()
+    
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_get_label_count_rejects_unknown_label(self, mock_driver):
+        service = Neo4jService()
+        
+        with self.assertRaises(ValueError):
+            service.get_label_count('CONTENT) DETACH DELETE (n')
+    
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_all_topics(self, mock_driver):
-        mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'id': 1, 'title': 'Test Topic', 'description': 'Test description',
-                'created_date': '2023-01-01', 'last_modified': '2023-01-02',
-                'thought_count': 5, 'tags': ['tag1', 'tag2']
-            }
-        ]
+        expected_result = [{'id': 'faith', 'title': 'Faith', 'level': 0, 'thought_count': 5, 'tags': ['tag1']}]
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
             result = service.get_all_topics(skip=0, limit=10)
+            service.get_all_topics(skip=10, limit=10, after=[1, 'faith'])
             
-            expected_query = """
-        MATCH (t:Topic)
-        OPTIONAL MATCH (t)<-[:BELONGS_TO]-(thought:Thought)
-        OPTIONAL MATCH (t)-[:HAS_TAG]->(tag:Tag)
-        RETURN t.id as id, t.title as title, t.description as description,
-               t.created_date as created_date, t.last_modified as last_modified,
-               count(DISTINCT thought) as thought_count,
-               collect(DISTINCT tag.name) as tags
-        ORDER BY t.title ASC
-        SKIP $skip LIMIT $limit
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"skip": 0, "limit": 10})
+            query, params = mock_run_query.call_args_list[0][0]
+            self.assertIn("MATCH (t:TOPIC)", query)
+            self.assertIn("ORDER BY coalesce(level, 0) ASC, id ASC", query)
+            self.assertEqual(params, {"skip": 0, "limit": 10})
+            query, params = mock_run_query.call_args_list[1][0]
+            self.assertIn("WHERE (coalesce(t.level, 0) > $after_0 OR", query)
+            self.assertEqual(params, {"after_0": 1, "after_1": 'faith', "skip": 0, "limit": 10})
             self.assertEqual(result, expected_result)
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_all_quotes(self, mock_driver):
-        mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'id': 1, 'title': 'Test Quote', 'content': 'Quote content',
-                'author': 'Test Author', 'source': 'Test Source',
-                'created_date': '2023-01-01', 'last_modified': '2023-01-02',
-                'tags': ['wisdom'], 'topics': ['philosophy']
-            }
-        ]
+        expected_result = [{'id': 'Q-1', 'title': 'Test Quote', 'content': 'Quote content', 'author': 'Test Author'}]
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
             result = service.get_all_quotes(skip=5, limit=15)
+            service.get_all_quotes(skip=5, limit=15, after=['Q-1'])
             
-            expected_query = """
-        MATCH (q:Quote)
-        OPTIONAL MATCH (q)-[:HAS_TAG]->(tag:Tag)
-        OPTIONAL MATCH (q)-[:BELONGS_TO]->(topic:Topic)
-        RETURN q.id as id, q.title as title, q.content as content,
-               q.author as author, q.source as source,
-               q.created_date as created_date, q.last_modified as last_modified,
-               collect(DISTINCT tag.name) as tags,
-               collect(DISTINCT topic.title) as topics
-        ORDER BY q.last_modified DESC
-        SKIP $skip LIMIT $limit
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"skip": 5, "limit": 15})
+            query, params = mock_run_query.call_args_list[0][0]
+            self.assertIn("MATCH (q:QUOTE)", query)
+            self.assertIn("ORDER BY id ASC", query)
+            self.assertEqual(params, {"skip": 5, "limit": 15})
+            query, params = mock_run_query.call_args_list[1][0]
+            self.assertIn("WHERE q.name > $after_0", query)
+            self.assertEqual(params, {"after_0": 'Q-1', "skip": 0, "limit": 15})
             self.assertEqual(result, expected_result)
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_all_passages(self, mock_driver):
-        mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'id': 1, 'title': 'John 3:16', 'content': 'For God so loved the world...',
-                'book': 'John', 'chapter': 3, 'verse': 16,
-                'created_date': '2023-01-01', 'last_modified': '2023-01-02',
-                'tags': ['love'], 'topics': ['salvation']
-            }
-        ]
+        expected_result = [{'id': 'P-1', 'title': 'John 3:16', 'book': 'John', 'chapter': 3, 'verse': 16}]
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
             result = service.get_all_passages()
+            service.get_all_passages(after=['John', 3, 16, 'P-1'])
             
-            expected_query = """
-        MATCH (p:Passage)
-        OPTIONAL MATCH (p)-[:HAS_TAG]->(tag:Tag)
-        OPTIONAL MATCH (p)-[:BELONGS_TO]->(topic:Topic)
-        RETURN p.id as id, p.title as title, p.content as content,
-               p.book as book, p.chapter as chapter, p.verse as verse,
-               p.created_date as created_date, p.last_modified as last_modified,
-               collect(DISTINCT tag.name) as tags,
-               collect(DISTINCT topic.title) as topics
-        ORDER BY p.book, p.chapter, p.verse
-        SKIP $skip LIMIT $limit
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"skip": 0, "limit": 20})
+            query, params = mock_run_query.call_args_list[0][0]
+            self.assertIn("MATCH (p:PASSAGE)", query)
+            self.assertIn("ORDER BY coalesce(book, '') ASC, coalesce(chapter, 0) ASC, coalesce(verse, 0) ASC, id ASC", query)
+            self.assertEqual(params, {"skip": 0, "limit": 20})
+            query, params = mock_run_query.call_args_list[1][0]
+            self.assertIn("WHERE (coalesce(p.book, '') > $after_0 OR", query)
+            self.assertEqual(params, {"after_0": 'John', "after_1": 3, "after_2": 16, "after_3": 'P-1',
+                                      "skip": 0, "limit": 20})
             self.assertEqual(result, expected_result)
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_item_by_id_found(self, mock_driver):
-        mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'n': {'id': 123, 'title': 'Test Item'},
-                'tags': ['tag1', 'tag2'],
-                'topics': ['topic1'],
-                'children': [{'id': 456, 'title': 'Child Item', 'type': 'Topic'}]
-            }
-        ]
+        expected_result = [{'n': {'name': 'faith', 'alias': 'Faith'}, 'tags': ['tag1'], 'children': []}]
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
-            result = service.get_item_by_id(123, "Topic")
+            result = service.get_item_by_id('faith', "TOPIC")
             
-            expected_query = """
-        MATCH (n:Topic {id: $item_id})
-        OPTIONAL MATCH (n)-[:HAS_TAG]->(tag:Tag)
-        OPTIONAL MATCH (n)-[:BELONGS_TO]->(topic:Topic)
-        OPTIONAL MATCH (n)<-[:BELONGS_TO]-(child)
-        RETURN n, 
-               collect(DISTINCT tag.name) as tags,
-               collect(DISTINCT topic.title) as topics,
-               collect(DISTINCT {id: child.id, title: child.title, type: labels(child)[0]}) as children
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"item_id": 123})
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("MATCH (n:TOPIC {name: $item_id})", query)
+            self.assertEqual(params, {"item_id": 'faith'})
             self.assertEqual(result, expected_result[0])
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
@@ -240,51 +234,21 @@ class TestNeo4jService(TestCase):
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_search_content(self, mock_driver):
-        mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'id': 1, 'title': 'Test Result', 'content': 'Search term found here',
-                'type': 'Thought', 'last_modified': '2023-01-01'
-            }
-        ]
+        expected_result = [{'id': 'T-1', 'title': 'Test Result', 'content': 'Search term found here', 'type': 'THOUGHT'}]
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
             result = service.search_content("test search", skip=0, limit=10)
+            service.search_content("test search", skip=40, limit=10, after=[1, 'Grace', 'TOPIC', 'grace'])
             
-            expected_query = """
-        CALL {
-            MATCH (t:Thought)
-            WHERE toLower(t.title) CONTAINS toLower($term) 
-               OR toLower(t.content) CONTAINS toLower($term)
-            RETURN t.id as id, t.title as title, t.content as content,
-                   'Thought' as type, t.last_modified as last_modified
-            UNION
-            MATCH (t:Topic)
-            WHERE toLower(t.title) CONTAINS toLower($term) 
-               OR toLower(t.description) CONTAINS toLower($term)
-            RETURN t.id as id, t.title as title, t.description as content,
-                   'Topic' as type, t.last_modified as last_modified
-            UNION
-            MATCH (q:Quote)
-            WHERE toLower(q.title) CONTAINS toLower($term) 
-               OR toLower(q.content) CONTAINS toLower($term)
-               OR toLower(q.author) CONTAINS toLower($term)
-            RETURN q.id as id, q.title as title, q.content as content,
-                   'Quote' as type, q.last_modified as last_modified
-            UNION
-            MATCH (p:Passage)
-            WHERE toLower(p.title) CONTAINS toLower($term) 
-               OR toLower(p.content) CONTAINS toLower($term)
-               OR toLower(p.book) CONTAINS toLower($term)
-            RETURN p.id as id, p.title as title, p.content as content,
-                   'Passage' as type, p.last_modified as last_modified
-        }
-        RETURN id, title, content, type, last_modified
-        ORDER BY last_modified DESC
-        SKIP $skip LIMIT $limit
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"term": "test search", "skip": 0, "limit": 10})
+            query, params = mock_run_query.call_args_list[0][0]
+            self.assertEqual(query.count("LIMIT $skip + $limit"), 4)
+            self.assertEqual(params, {"term": "test search", "skip": 0, "limit": 10})
+            # Every label branch applies the cursor before the merge
+            query, params = mock_run_query.call_args_list[1][0]
+            self.assertEqual(query.count("WHERE (coalesce(level, 0) > $after_0 OR"), 4)
+            self.assertEqual(params["skip"], 0)
+            self.assertEqual(params["after_3"], 'grace')
             self.assertEqual(result, expected_result)
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
@@ -303,82 +267,37 @@ class TestNeo4jService(TestCase):
         
         with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
             service = Neo4jService()
-            result = service.get_graph_data(node_id=123, node_type="Topic")
+            result = service.get_graph_data(node_id=123, node_type="TOPIC")
             
-            expected_query = """
-            MATCH (center:Topic {id: $node_id})
-            OPTIONAL MATCH (center)-[r1]-(connected)
-            OPTIONAL MATCH (connected)-[r2]-(secondLevel)
-            WHERE distance(center, secondLevel) <= 2
-            WITH collect(DISTINCT center) + collect(DISTINCT connected) + collect(DISTINCT secondLevel) as nodes,
-                 collect(DISTINCT r1) + collect(DISTINCT r2) as relationships
-            UNWIND nodes as n
-            UNWIND relationships as r
-            RETURN collect(DISTINCT {
-                id: n.id, 
-                title: n.title, 
-                type: labels(n)[0],
-                group: CASE labels(n)[0]
-                    WHEN 'Topic' THEN 1
-                    WHEN 'Thought' THEN 2
-                    WHEN 'Quote' THEN 3
-                    WHEN 'Passage' THEN 4
-                    ELSE 5
-                END
-            }) as nodes,
-            collect(DISTINCT {
-                source: startNode(r).id,
-                target: endNode(r).id,
-                type: type(r)
-            }) as links
-            """
-            mock_run_query.assert_called_once_with(expected_query, {"node_id": 123})
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("MATCH (center:TOPIC {name: $node_id})", query)
+            self.assertIn("[*1..2]", query)
+            self.assertNotIn("distance(", query)
+            self.assertEqual(params, {"node_id": 123})
             self.assertEqual(result, expected_result)
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_graph_data_overall(self, mock_driver):
         mock_driver.return_value = self.mock_driver
-        expected_result = [
-            {
-                'nodes': [
-                    {'id': 1, 'title': 'Test Node', 'type': 'Topic', 'group': 1}
-                ],
-                'links': [
-                    {'source': 1, 'target': 2, 'type': 'RELATED_TO'}
-                ]
-            }
-        ]
         
-        with patch.object(Neo4jService, 'run_query', return_value=expected_result) as mock_run_query:
+        def stream(query, params):
+            if 'MATCH (n:TOPIC)' in query:
+                return iter([{'id': 'Grace', 'title': 'Grace', 'type': 'TOPIC', 'level': 0, 'tags': []}])
+            if 'MATCH (n:THOUGHT)' in query:
+                return iter([{'id': 'T-1', 'title': 'On mercy', 'type': 'THOUGHT', 'level': 1, 'tags': []}])
+            if 'MATCH (a:TOPIC)' in query:
+                return iter([{'source': 'Grace', 'target': 'T-1', 'type': 'HAS_THOUGHT'}])
+            return iter([])
+        
+        with patch.object(Neo4jService, 'stream_query', side_effect=stream) as mock_stream:
             service = Neo4jService()
             result = service.get_graph_data()
             
-            expected_query = """
-            MATCH (n)
-            WHERE n:Topic OR n:Thought OR n:Quote OR n:Passage
-            OPTIONAL MATCH (n)-[r]-(m)
-            WHERE m:Topic OR m:Thought OR m:Quote OR m:Passage
-            RETURN collect(DISTINCT {
-                id: n.id, 
-                title: n.title, 
-                type: labels(n)[0],
-                group: CASE labels(n)[0]
-                    WHEN 'Topic' THEN 1
-                    WHEN 'Thought' THEN 2
-                    WHEN 'Quote' THEN 3
-                    WHEN 'Passage' THEN 4
-                    ELSE 5
-                END
-            }) as nodes,
-            collect(DISTINCT {
-                source: startNode(r).id,
-                target: endNode(r).id,
-                type: type(r)
-            }) as links
-            LIMIT 500
-            """
-            mock_run_query.assert_called_once_with(expected_query)
-            self.assertEqual(result, expected_result)
+            self.assertEqual([n['id'] for n in result[0]['nodes']], ['Grace', 'T-1'])
+            self.assertEqual(result[0]['links'], [{'source': 'Grace', 'target': 'T-1', 'type': 'HAS_THOUGHT'}])
+            # One streamed query per label for nodes and per label for links
+            self.assertEqual(mock_stream.call_count, 12)
+            self.assertNotIn('UNWIND', mock_stream.call_args_list[0][0][0])
     
     @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
     def test_get_tags(self, mock_driver):
@@ -411,18 +330,624 @@ class TestNeo4jService(TestCase):
             service = Neo4jService()
             result = service.get_items_by_tag("important", skip=5, limit=25)
             
-            expected_query = """
-        MATCH (tag:Tag {name: $tag_name})<-[:HAS_TAG]-(item)
-        RETURN item.id as id, item.title as title, 
-               CASE 
-                   WHEN item.content IS NOT NULL THEN item.content
-                   WHEN item.description IS NOT NULL THEN item.description
-                   ELSE ''
-               END as content,
-               labels(item)[0] as type,
-               item.last_modified as last_modified
-        ORDER BY item.last_modified DESC
-        SKIP $skip LIMIT $limit
-        """
-            mock_run_query.assert_called_once_with(expected_query, {"tag_name": "important", "skip": 5, "limit": 25})
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("MATCH (item:TOPIC)", query)
+            self.assertIn("MATCH (item:PASSAGE)", query)
+            self.assertNotIn("MATCH (item)\n", query)
+            self.assertEqual(params, {"tag_name": "important", "skip": 5, "limit": 25})
             self.assertEqual(result, expected_result)
+
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_get_items_by_tag_filters_types_and_follows_cursor(self, mock_driver):
+        mock_driver.return_value = self.mock_driver
+        
+        with patch.object(Neo4jService, 'run_query', return_value=[]) as mock_run_query:
+            service = Neo4jService()
+            service.get_items_by_tag("important", limit=21, after=[1, 'Grace', 'TOPIC'], types=['QUOTE'])
+            
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("MATCH (item:QUOTE)", query)
+            self.assertNotIn("MATCH (item:TOPIC)", query)
+            self.assertEqual(params['skip'], 0)
+            self.assertEqual(params['after_1'], 'Grace')
+            with self.assertRaises(ValueError):
+                service.get_items_by_tag("important", types=['CONTENT'])
+
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_get_tag_item_count(self, mock_driver):
+        mock_driver.return_value = self.mock_driver
+        
+        with patch.object(Neo4jService, 'run_query', return_value=[{'total': 7}]) as mock_run_query:
+            service = Neo4jService()
+            
+            self.assertEqual(service.get_tag_item_count("important", types=['THOUGHT']), 7)
+            query, params = mock_run_query.call_args[0]
+            self.assertIn("COUNT { MATCH (item:THOUGHT)", query)
+            self.assertEqual(params, {"tag_name": "important"})
+
+
+class TestAsyncNeo4jService(TestCase):
+
+    def _run(self, coro):
+        return asyncio.run(coro)
+
+    @patch('thoughts_api.async_neo4j_service.AsyncGraphDatabase.driver')
+    def test_driver_created_lazily(self, mock_driver):
+        service = AsyncNeo4jService()
+
+        mock_driver.assert_not_called()
+        service._get_driver()
+        mock_driver.assert_called_once_with(
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
+        )
+
+    @patch('thoughts_api.async_neo4j_service.AsyncGraphDatabase.driver')
+    def test_run_query_collects_records(self, mock_driver):
+        mock_record = Mock()
+        mock_record.data.return_value = {'id': 1}
+
+        async def records():
+            yield mock_record
+
+        mock_session = MagicMock()
+        mock_session.run = AsyncMock(return_value=records())
+        mock_session_context = MagicMock()
+        mock_session_context.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session_context.__aexit__ = AsyncMock(return_value=None)
+        mock_driver.return_value.session.return_value = mock_session_context
+
+        service = AsyncNeo4jService()
+        result = self._run(service.run_query("MATCH (n) RETURN n", {"param": "value"}))
+
+        mock_session.run.assert_awaited_once_with("MATCH (n) RETURN n", {"param": "value"})
+        self.assertEqual(result, [{'id': 1}])
+
+    def test_search_content_shares_sync_query(self):
+        service = AsyncNeo4jService()
+        expected_query, expected_params = service.search_query("grace", 0, 10)
+
+        with patch.object(AsyncNeo4jService, 'run_query', new=AsyncMock(return_value=[])) as mock_run_query:
+            result = self._run(service.search_content("grace", skip=0, limit=10))
+
+        mock_run_query.assert_awaited_once_with(expected_query, expected_params)
+        self.assertEqual(result, [])
+
+    def test_get_item_by_id_not_found(self):
+        service = AsyncNeo4jService()
+
+        with patch.object(AsyncNeo4jService, 'run_query', new=AsyncMock(return_value=[])):
+            self.assertIsNone(self._run(service.get_item_by_id("missing", "TOPIC")))
+
+
+class TestKeysetPagination(TestCase):
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor([1, 'Grace'])
+
+        self.assertEqual(decode_cursor(token), [1, 'Grace'])
+
+    def test_decode_rejects_garbage(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor!')
+
+    def test_predicate_expands_tuple_comparison(self):
+        keyset = Keyset([('t.level', 'level', 0), ('t.name', 'id', None)])
+
+        self.assertEqual(
+            keyset.predicate(),
+            "(coalesce(t.level, 0) > $after_0 OR "
+            "(coalesce(t.level, 0) = $after_0 AND t.name > $after_1))"
+        )
+        self.assertEqual(keyset.order_by(), "coalesce(level, 0) ASC, id ASC")
+
+    def test_paginate_emits_cursor_only_when_more_rows(self):
+        keyset = Keyset([('q.name', 'id', None)])
+        rows = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+
+        page, next_cursor = keyset.paginate(rows, 2)
+        self.assertEqual(page, rows[:2])
+        self.assertEqual(decode_cursor(next_cursor), ['b'])
+
+        page, next_cursor = keyset.paginate(rows, 3)
+        self.assertEqual(page, rows)
+        self.assertIsNone(next_cursor)
+
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_cursor_replaces_skip(self, mock_driver):
+        service = Neo4jService()
+
+        query, params = service.quotes_query(skip=40, limit=21, after=['Q-10'])
+
+        self.assertIn("WHERE q.name > $after_0", query)
+        self.assertEqual(params, {"after_0": 'Q-10', "skip": 0, "limit": 21})
+
+
+class TestCursorViews(TestCase):
+
+    @patch('thoughts_api.views.neo4j_service')
+    def test_quotes_view_returns_next_cursor(self, mock_service):
+        mock_service.quotes_keyset = Keyset([('q.name', 'id', None)])
+        mock_service.get_label_count.return_value = 3
+        mock_service.get_all_quotes.return_value = [{'id': 'a'}, {'id': 'b'}, {'id': 'c'}]
+
+        response = self.client.get('/api/quotes/', {'page_size': 2, 'cursor': encode_cursor(['0'])})
+
+        self.assertEqual(response.status_code, 200)
+        mock_service.get_all_quotes.assert_called_once_with(skip=0, limit=3, after=['0'])
+        self.assertEqual(decode_cursor(response.json()['next']), ['b'])
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/quotes/', {'cursor': '%%%'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TestFulltextSearch(TestCase):
+
+    def test_build_lucene_query_escapes_and_prefixes(self):
+        self.assertEqual(
+            build_lucene_query('grace (free)'),
+            r"(grace^2 OR grace*) AND (\(free\)^2 OR \(free\)*)"
+        )
+        self.assertEqual(build_lucene_query('   '), '""')
+
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_fulltext_search_splits_total(self, mock_driver):
+        rows = [
+            {'id': 'a', 'title': 'A', 'score': 2.0, 'total': 7},
+            {'id': 'b', 'title': 'B', 'score': 1.0, 'total': 7},
+        ]
+        with patch.object(Neo4jService, 'run_query', return_value=rows) as mock_run_query:
+            service = Neo4jService()
+            results, total = service.fulltext_search('grace', skip=0, limit=2)
+
+        query, params = mock_run_query.call_args[0]
+        self.assertIn("db.index.fulltext.queryNodes", query)
+        self.assertEqual(params['query'], '(grace^2 OR grace*)')
+        self.assertEqual(total, 7)
+        self.assertEqual(results[0], {'id': 'a', 'title': 'A', 'score': 2.0})
+
+    @patch('thoughts_api.views.neo4j_service')
+    def test_search_view_fulltext_mode(self, mock_service):
+        mock_service.fulltext_search.return_value = ([{'id': 'a', 'score': 1.5}], 1)
+
+        response = self.client.get('/api/search/', {'q': 'grace', 'mode': 'fulltext'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        mock_service.fulltext_search.assert_called_once_with('grace', skip=0, limit=20)
+
+    def test_search_view_rejects_unknown_mode(self):
+        response = self.client.get('/api/search/', {'q': 'grace', 'mode': 'nope'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+SNAPSHOT_ROWS = [
+    {'id': 'Grace', 'title': 'Grace', 'content': 'Unmerited favour', 'type': 'TOPIC',
+     'level': 0, 'tags': ['grace', 'gospel']},
+    {'id': 'T-1', 'title': 'On mercy', 'content': 'Grace and mercy meet', 'type': 'THOUGHT',
+     'level': 1, 'tags': ['mercy']},
+    {'id': 'Q-1', 'title': 'Spurgeon on prayer', 'content': 'Prayer moves the arm', 'type': 'QUOTE',
+     'level': 2, 'tags': ['prayer']},
+]
+
+
+class TestSearchEngine(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.snapshot = ContentSnapshot(lambda: [dict(row) for row in SNAPSHOT_ROWS])
+        self.engine = SearchEngine(self.snapshot)
+
+    def test_title_hits_rank_first(self):
+        found = self.engine.search('grace')
+
+        self.assertEqual(found['total'], 2)
+        self.assertEqual(found['results'][0]['id'], 'Grace')
+        self.assertEqual(found['facets']['type'], {'TOPIC': 1, 'THOUGHT': 1})
+
+    def test_prefix_expansion_and_type_filter(self):
+        found = self.engine.search('pray', types=['QUOTE'])
+
+        self.assertEqual([r['id'] for r in found['results']], ['Q-1'])
+
+    def test_sync_changes_patch_index_incrementally(self):
+        self.engine.search('grace')
+        built_index = self.engine.index
+
+        self.snapshot.apply_changes(
+            upserts=[normalize_document({'id': 'T-2', 'title': 'Covenant', 'type': 'THOUGHT', 'tags': []})],
+            removed_keys=['QUOTE:Q-1'],
+        )
+
+        self.assertIs(self.engine.index, built_index)
+        self.assertEqual(self.engine.search('covenant')['total'], 1)
+        self.assertEqual(self.engine.search('prayer')['total'], 0)
+
+    def test_foreign_version_bump_forces_rebuild(self):
+        self.engine.search('grace')
+        built_index = self.engine.index
+
+        bump_content_version()
+        self.engine.search('grace')
+
+        self.assertIsNot(self.engine.index, built_index)
+
+    def test_content_version_survives_cache_loss(self):
+        version = bump_content_version()
+
+        # A culled or per-process cache must not roll the version back
+        cache.clear()
+
+        self.assertEqual(get_content_version(), version)
+        self.assertGreater(version, 1)
+
+    @patch('thoughts_api.views.search_engine')
+    def test_search_view_memory_mode(self, mock_engine):
+        mock_engine.search.return_value = {'results': [], 'total': 0, 'facets': {'type': {}, 'tags': []}}
+
+        response = self.client.get('/api/search/', {'q': 'grace', 'mode': 'memory', 'type': 'TOPIC'})
+
+        self.assertEqual(response.status_code, 200)
+        mock_engine.search.assert_called_once_with('grace', skip=0, limit=20, types=['TOPIC'])
+
+    @patch('thoughts_api.async_views.async_neo4j_service')
+    @patch('thoughts_api.async_views.search_engine')
+    def test_async_search_view_memory_mode(self, mock_engine, mock_async_service):
+        facets = {'type': {'TOPIC': 1}, 'tags': []}
+        mock_engine.search.return_value = {'results': [{'id': 'Grace'}], 'total': 1, 'facets': facets}
+
+        response = self.client.get('/api/async/search/', {'q': 'grace', 'mode': 'memory', 'type': 'TOPIC'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['count'], response.json()['facets']), (1, facets))
+        mock_engine.search.assert_called_once_with('grace', skip=0, limit=20, types=['TOPIC'])
+        self.assertFalse(mock_async_service.method_calls)
+
+
+class TestSuggestionIndex(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.index = SuggestionIndex(ContentSnapshot(lambda: [dict(row) for row in SNAPSHOT_ROWS]))
+
+    def test_trigrams_are_padded(self):
+        self.assertEqual(trigrams('Ab'), {'  a', ' ab', 'ab '})
+
+    def test_misspelled_title_still_matches(self):
+        found = self.index.suggest('spurgon prayr')
+
+        self.assertEqual(found['matches'][0]['id'], 'Q-1')
+
+    def test_tag_completion_prefers_prefix_matches(self):
+        found = self.index.suggest('gr')
+
+        self.assertEqual(found['tags'][0], {'tag': 'grace', 'count': 1, 'score': 1.0})
+
+    @patch('thoughts_api.views.suggestion_index')
+    def test_suggest_view(self, mock_index):
+        mock_index.suggest.return_value = {'matches': [], 'tags': []}
+
+        response = self.client.get('/api/search/suggest/', {'q': 'gra', 'limit': 500})
+
+        self.assertEqual(response.status_code, 200)
+        mock_index.suggest.assert_called_once_with('gra', limit=50, types=None)
+
+
+class TestTagIndex(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        rows = SNAPSHOT_ROWS + [
+            {'id': 'T-0', 'title': 'Amazing grace', 'type': 'THOUGHT', 'level': 1, 'tags': ['grace']},
+        ]
+        self.snapshot = ContentSnapshot(lambda: [dict(row) for row in rows])
+        self.index = TagIndex(self.snapshot)
+
+    def test_tag_stats_counts_per_type(self):
+        tags, total = self.index.tag_stats()
+
+        self.assertEqual(total, 4)
+        self.assertEqual(tags[0], {'name': 'grace', 'usage_count': 2, 'counts': {'TOPIC': 1, 'THOUGHT': 1}})
+        self.assertEqual(self.index.top_tags(1, content_type='TOPIC'), [('gospel', 1)])
+
+    def test_tag_stats_prefix_and_name_sort(self):
+        tags, total = self.index.tag_stats(prefix='G', sort='name')
+
+        self.assertEqual(total, 2)
+        self.assertEqual([tag['name'] for tag in tags], ['gospel', 'grace'])
+
+    def test_items_for_tag_follows_cursor(self):
+        first, total = self.index.items_for_tag('grace', limit=1)
+        rest, _ = self.index.items_for_tag('grace', after=[0, 'Grace', 'TOPIC'])
+
+        self.assertEqual(total, 2)
+        self.assertEqual([row['id'] for row in first + rest], ['Grace', 'T-0'])
+
+    def test_sync_changes_patch_counts(self):
+        self.index.tag_stats()
+
+        self.snapshot.apply_changes(
+            upserts=[normalize_document({'id': 'T-1', 'title': 'On mercy', 'type': 'THOUGHT',
+                                         'level': 1, 'tags': ['grace']})],
+            removed_keys=['QUOTE:Q-1'],
+        )
+
+        tags, total = self.index.tag_stats()
+        self.assertEqual(total, 2)
+        self.assertEqual(tags[0]['usage_count'], 3)
+
+    @patch('thoughts_api.views.tag_index')
+    def test_tags_view_pages_and_sorts(self, mock_index):
+        mock_index.tag_stats.return_value = ([{'name': 'grace', 'usage_count': 2, 'counts': {}}], 1)
+
+        response = self.client.get('/api/tags/', {'sort': 'name', 'prefix': 'gr', 'page': 2, 'page_size': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        mock_index.tag_stats.assert_called_once_with(
+            prefix='gr', sort='name', content_type=None, skip=10, limit=10
+        )
+        self.assertEqual(self.client.get('/api/tags/', {'type': 'SERMON'}).status_code, 400)
+
+    @patch('thoughts_api.views.neo4j_service')
+    @patch('thoughts_api.views.tag_index')
+    def test_tag_items_view_falls_back_to_neo4j(self, mock_index, mock_service):
+        mock_index.items_for_tag.side_effect = RuntimeError('snapshot unavailable')
+        mock_service.COUNTABLE_LABELS = Neo4jService.COUNTABLE_LABELS
+        mock_service.tag_items_keyset = Neo4jService.tag_items_keyset
+        mock_service.get_items_by_tag.return_value = [{'id': 'Grace', 'level': 0, 'type': 'TOPIC'}]
+        mock_service.get_tag_item_count.return_value = 1
+
+        response = self.client.get('/api/tags/grace/', {'type': 'TOPIC'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        mock_service.get_items_by_tag.assert_called_once_with(
+            'grace', skip=0, limit=21, after=None, types=['TOPIC']
+        )
+
+    def test_tag_items_view_rejects_unknown_type(self):
+        response = self.client.get('/api/tags/grace/', {'type': 'CONTENT'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TestSyncPipeline(TestCase):
+
+    KEYSET = Keyset([('n.name', 'id', None)])
+
+    def _fetch(self, rows):
+        def fetch(after, limit):
+            start = 0 if after is None else next(i for i, row in enumerate(rows) if row['id'] == after[0]) + 1
+            return rows[start:start + limit]
+        return fetch
+
+    def test_streams_every_page_in_order(self):
+        rows = [{'id': f"n{i:02d}"} for i in range(25)]
+        written = []
+
+        report = SyncPipeline(self._fetch(rows), self.KEYSET, written.append, page_size=10, max_pages=1).run()
+
+        self.assertEqual([len(page) for page in written], [10, 10, 5])
+        self.assertEqual([row for page in written for row in page], rows)
+        self.assertEqual((report['fetch']['records'], report['write']['batches']), (25, 3))
+
+    def test_writer_error_stops_producer(self):
+        rows = [{'id': f"n{i:02d}"} for i in range(100)]
+        fetch = Mock(side_effect=self._fetch(rows))
+        pipeline = SyncPipeline(fetch, self.KEYSET, Mock(side_effect=ValueError('disk full')),
+                                page_size=10, max_pages=1)
+
+        with self.assertRaises(ValueError):
+            pipeline.run()
+        # The bounded queue keeps the producer at most a couple of pages ahead
+        self.assertLessEqual(fetch.call_count, 3)
+
+    def test_producer_error_reaches_caller(self):
+        written = []
+        fetch = Mock(side_effect=[[{'id': 'a'}], ServiceUnavailable('down')])
+        pipeline = SyncPipeline(fetch, self.KEYSET, written.append, page_size=1)
+
+        with self.assertRaises(ServiceUnavailable):
+            pipeline.run()
+        self.assertEqual(written, [[{'id': 'a'}]])
+
+
+class TestMirrorService(TestCase):
+
+    def setUp(self):
+        from topics.models import Topic, TopicTag
+
+        faith = Topic.objects.create(neo4j_id='faith', title='Faith', slug='faith', level=1)
+        TopicTag.objects.create(topic=faith, tag='grace')
+        for name, level in [('t1', 2), ('t2', 1), ('t3', None)]:
+            item = ContentItem.objects.create(node_type='THOUGHT', neo4j_id=name, uid=f"id-{name}", level=level,
+                                              parent_topic='faith', tags=['grace'])
+            ContentItemTag.objects.create(item=item, tag='grace')
+        ContentItem.objects.create(node_type='THOUGHT', neo4j_id='t4', is_active=False)
+        for name, book, chapter, verse in [('p1', 'John', 3, 16), ('p2', None, None, None), ('p3', 'John', 1, 1)]:
+            ContentItem.objects.create(node_type='PASSAGE', neo4j_id=name, book=book, chapter=chapter, verse=verse)
+        self.service = MirrorService()
+
+    def test_lists_follow_neo4j_keysets(self):
+        thoughts = self.service.get_all_thoughts(limit=2)
+        after = self.service.thoughts_keyset.row_key(thoughts[-1])
+
+        self.assertEqual([row['Name'] for row in thoughts], ['t3', 't2'])
+        self.assertEqual(thoughts[0]['ID'], 'id-t3')
+        self.assertEqual([row['Name'] for row in self.service.get_all_thoughts(limit=2, after=after)], ['t1'])
+        self.assertEqual(self.service.get_label_count('THOUGHT'), 3)
+
+        passages = self.service.get_all_passages(limit=2)
+        after = self.service.passages_keyset.row_key(passages[-1])
+        self.assertEqual([row['id'] for row in passages], ['p2', 'p3'])
+        self.assertEqual([row['id'] for row in self.service.get_all_passages(after=after)], ['p1'])
+
+    def test_tag_items_merge_topics_and_items(self):
+        rows = self.service.get_items_by_tag('grace', limit=3)
+
+        self.assertEqual([(row['type'], row['id']) for row in rows],
+                         [('THOUGHT', 't3'), ('TOPIC', 'faith'), ('THOUGHT', 't2')])
+        self.assertEqual(rows[1]['tags'], ['grace'])
+        after = self.service.tag_items_keyset.row_key(rows[1])
+        self.assertEqual([row['id'] for row in self.service.get_items_by_tag('grace', after=after)], ['t2', 't1'])
+        self.assertEqual(self.service.get_tag_item_count('grace', ['TOPIC']), 1)
+
+    def test_topic_detail_lists_children(self):
+        item = self.service.get_item_by_id('faith', 'Topic')
+
+        self.assertEqual(item['tags'], ['grace'])
+        self.assertEqual({child['name'] for child in item['children']}, {'t1', 't2', 't3'})
+        self.assertEqual(self.service.get_item_by_id('t1', 'Thought')['parent_alias'], 'Faith')
+        self.assertIsNone(self.service.get_item_by_id('t4', 'Thought'))
+
+    @override_settings(CONTENT_BACKEND='mirror')
+    @patch('thoughts_api.views.neo4j_service')
+    def test_views_read_the_mirror(self, mock_service):
+        response = self.client.get('/api/thoughts/', {'page_size': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['count'], len(response.data['results'])), (3, 2))
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual(self.client.get('/api/tags/grace/').data['count'], 4)
+        self.assertFalse(mock_service.method_calls)
+
+
+class TestSQLiteFullTextSearch(TestCase):
+
+    def setUp(self):
+        from topics.sync import bulk_sync_items, bulk_sync_topics
+
+        bulk_sync_topics([{'id': 'grace', 'title': 'Grace', 'description': 'Unmerited favor', 'tags': ['gift']}])
+        bulk_sync_items('QUOTE', [
+            {'id': 'q1', 'title': 'Amazing', 'content': 'Amazing grace, how sweet the sound', 'tags': []},
+            {'id': 'q2', 'title': 'Gifts', 'content': 'Every good gift is from above', 'tags': ['grace notes']},
+        ])
+
+    def test_match_expression_quotes_words(self):
+        self.assertEqual(match_expression('grace AND "free"*'), '"grace"* "AND"* "free"*')
+        self.assertEqual(match_expression('  -- '), '')
+
+    def test_search_ranks_and_highlights(self):
+        results, total = fts_index.search('grace')
+
+        self.assertEqual(total, 3)
+        self.assertEqual(results[0]['id'], 'grace')  # title hits outrank body hits
+        self.assertEqual(results[0]['title_highlight'], '<mark>Grace</mark>')
+        quote = next(row for row in results if row['id'] == 'q1')
+        self.assertIn('<mark>grace</mark>', quote['snippet'])
+        self.assertEqual(next(row for row in results if row['id'] == 'q2')['tags'], ['grace notes'])
+        self.assertEqual(fts_index.search('grace', types=['QUOTE'])[1], 2)
+
+    def test_highlights_escape_stored_html(self):
+        from topics.sync import bulk_sync_items
+
+        bulk_sync_items('THOUGHT', [
+            {'id': 't1', 'title': '<img src=x onerror=alert(1)> mercy', 'content': '<script>mercy</script>', 'tags': []},
+        ])
+
+        row = fts_index.search('mercy')[0][0]
+        self.assertEqual(row['title_highlight'], '&lt;img src=x onerror=alert(1)&gt; <mark>mercy</mark>')
+        self.assertEqual(row['snippet'], '&lt;script&gt;<mark>mercy</mark>&lt;/script&gt;')
+
+    def test_sync_keeps_index_current(self):
+        from topics.sync import bulk_sync_items, deactivate_missing
+
+        bulk_sync_items('QUOTE', [{'id': 'q1', 'title': 'Amazing', 'content': 'How sweet the sound', 'tags': []}])
+        deactivate_missing(ContentItem.objects.filter(node_type='QUOTE'), {'q1'}, 'QUOTE')
+
+        self.assertEqual(fts_index.search('grace')[1], 1)
+        self.assertEqual(fts_index.search('sweet')[0][0]['id'], 'q1')
+        self.assertEqual(self._rowids(), self._model_rowids())
+        self.assertEqual(fts_index.rebuild(), 2)
+        self.assertEqual(self._rowids(), self._model_rowids())
+
+    def _rowids(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT key, rowid FROM content_search")
+            return dict(cursor.fetchall())
+
+    def _model_rowids(self):
+        from topics.models import Topic
+
+        rowids = {f"TOPIC:{neo4j_id}": -pk for neo4j_id, pk in Topic.objects.active().values_list('neo4j_id', 'pk')}
+        rowids.update(
+            (f"{node_type}:{neo4j_id}", pk)
+            for node_type, neo4j_id, pk in ContentItem.objects.filter(is_active=True).values_list('node_type', 'neo4j_id', 'pk')
+        )
+        return rowids
+
+    @override_settings(SEARCH_BACKEND='sqlite')
+    def test_search_view_and_topic_search_use_index(self):
+        from topics.services import TopicsService
+
+        response = self.client.get('/api/search/', {'q': 'gift', 'page_size': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['mode'], response.data['count']), ('sqlite', 2))
+        self.assertEqual(len(response.data['results']), 1)
+        topics = TopicsService().search_topics('favor', use_cache=False)
+        self.assertEqual([(t['id'], t['short_description']) for t in topics], [('grace', 'Unmerited favor')])
+
+
+class TestCircuitBreaker(TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30,
+                                      is_failure=lambda e: isinstance(e, ServiceUnavailable),
+                                      clock=lambda: self.now)
+
+    def _fail(self, error=None):
+        with self.assertRaises(type(error or ServiceUnavailable('down'))):
+            self.breaker.call(Mock(side_effect=error or ServiceUnavailable('down')))
+
+    def test_opens_after_threshold_and_rejects_calls(self):
+        self._fail()
+        self._fail(CypherSyntaxError('bad query'))  # Neo4j answered; resets the count
+        self._fail()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self._fail()
+
+        backend = Mock()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(backend)
+        backend.assert_not_called()
+        self.assertTrue(self.breaker.is_open)
+
+    def test_half_open_lets_one_probe_through(self):
+        self._fail()
+        self._fail()
+        self.now = 31
+        self.assertFalse(self.breaker.is_open)
+
+        with self.breaker.guard():
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.before_call()  # a second caller while probing
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self._fail()
+        self._fail()
+        self.now = 62
+        self._fail()  # failed probe reopens at once
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(self.breaker.is_open)
+
+    @patch('thoughts_api.neo4j_service.GraphDatabase.driver')
+    def test_open_breaker_skips_the_driver(self, mock_driver):
+        service = Neo4jService()
+        service.breaker = self.breaker
+        mock_driver.return_value.session.side_effect = ServiceUnavailable('down')
+
+        for _ in range(2):
+            with self.assertRaises(ServiceUnavailable):
+                service.run_query("RETURN 1")
+        with self.assertRaises(CircuitOpenError):
+            list(service.stream_query("RETURN 1"))
+        self.assertEqual(mock_driver.return_value.session.call_count, 2)
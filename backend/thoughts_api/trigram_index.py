@@ -0,0 +1,171 @@
+"""
+Character-trigram index for typo-tolerant suggestions.
+
+Backs /api/search/suggest/: fuzzy matches over item titles and names, plus
+tag completions. Built from the same content snapshot as the search
+engine, so one cheap in-memory lookup replaces a CONTAINS scan per keystroke.
+"""
+
+from collections import Counter, defaultdict
+import bisect
+import threading
+import logging
+
+from .snapshot import content_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def trigrams(text):
+    """Padded character trigrams of a normalized string"""
+    text = normalize(text)
+    if not text:
+        return set()
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Trigram -> entry postings with Dice-coefficient ranking
+
+    Entries are arbitrary hashable ids; each has the trigram set of the
+    string it was indexed under.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.grams = {}
+
+    def add(self, entry, text):
+        grams = trigrams(text)
+        if not grams:
+            return
+        self.grams[entry] = grams
+        for gram in grams:
+            self.postings[gram].add(entry)
+
+    def search(self, query, limit=10, threshold=0.3):
+        """
+        Entries most similar to a query
+
+        Returns:
+            List of (entry, similarity) pairs, best first
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        shared = Counter()
+        for gram in query_grams:
+            for entry in self.postings.get(gram, ()):
+                shared[entry] += 1
+        scored = []
+        for entry, count in shared.items():
+            similarity = 2 * count / (len(query_grams) + len(self.grams[entry]))
+            if similarity >= threshold:
+                scored.append((entry, similarity))
+        scored.sort(key=lambda pair: -pair[1])
+        return scored[:limit]
+
+
+class SuggestionIndex:
+    """
+    Fuzzy title/name matches and tag completions over the content snapshot
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._version = None
+        self._lock = threading.Lock()
+        self._items = TrigramIndex()
+        self._tags = TrigramIndex()
+        self._docs = {}
+        self._tag_counts = {}
+        self._sorted_tags = []
+
+    def rebuild(self):
+        items = self.snapshot.get_items()
+        item_index = TrigramIndex()
+        tag_index = TrigramIndex()
+        tag_counts = Counter()
+        for key, doc in items.items():
+            item_index.add((key, 'title'), doc['title'])
+            if doc['id'] != doc['title']:
+                item_index.add((key, 'name'), doc['id'])
+            tag_counts.update(doc['tags'])
+        for tag in tag_counts:
+            tag_index.add(tag, tag)
+
+        self._items = item_index
+        self._tags = tag_index
+        self._docs = items
+        self._tag_counts = dict(tag_counts)
+        self._sorted_tags = sorted((normalize(tag), tag) for tag in tag_counts)
+        self._version = self.snapshot.version
+        logger.info(f"Built suggestion index v{self._version} over {len(items)} items")
+
+    def _ensure_current(self):
+        self.snapshot.get_items()
+        if self._version != self.snapshot.version:
+            self.rebuild()
+
+    def complete_tags(self, prefix, limit=10):
+        """Tags starting with a prefix, most used first"""
+        prefix = normalize(prefix)
+        start = bisect.bisect_left(self._sorted_tags, (prefix,))
+        matches = []
+        for normalized, tag in self._sorted_tags[start:]:
+            if not normalized.startswith(prefix):
+                break
+            matches.append(tag)
+        matches.sort(key=lambda tag: (-self._tag_counts[tag], tag))
+        return matches[:limit]
+
+    def suggest(self, query, limit=10, types=None):
+        """
+        Ranked fuzzy matches and tag completions for a partial query
+
+        Returns:
+            Dict with 'matches' (items) and 'tags', each with a score
+        """
+        with self._lock:
+            self._ensure_current()
+
+            best = {}
+            for (key, field), score in self._items.search(query, limit=limit * 4):
+                doc = self._docs.get(key)
+                if doc is None or (types and doc['type'] not in types):
+                    continue
+                if score > best.get(key, (0, None))[0]:
+                    best[key] = (score, field)
+            ranked = sorted(best.items(), key=lambda pair: -pair[1][0])[:limit]
+            matches = []
+            for key, (score, field) in ranked:
+                doc = self._docs[key]
+                matches.append({
+                    'id': doc['id'],
+                    'title': doc['title'],
+                    'type': doc['type'],
+                    'matched': field,
+                    'score': round(score, 3),
+                })
+
+            # Exact prefix completions first, then fuzzy tag matches
+            tags = [{'tag': tag, 'count': self._tag_counts[tag], 'score': 1.0}
+                    for tag in self.complete_tags(query, limit)]
+            seen = {entry['tag'] for entry in tags}
+            for tag, score in self._tags.search(query, limit=limit):
+                if len(tags) >= limit:
+                    break
+                if tag not in seen:
+                    tags.append({'tag': tag, 'count': self._tag_counts[tag], 'score': round(score, 3)})
+
+        return {'matches': matches, 'tags': tags}
+
+
+# Global suggestion index instance
+suggestion_index = SuggestionIndex(content_snapshot)
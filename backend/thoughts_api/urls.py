@@ -2,16 +2,22 @@
 from django.urls import path
 from .views import (
     ThoughtsListView, QuotesListView, PassagesListView,
-    ItemDetailView, SearchView, GraphDataView, TagsView, TagItemsView, topics_table_view
+    ItemDetailView, SearchView, SearchSuggestView, GraphDataView, TagsView, TagItemsView, topics_table_view
 )
+from .async_views import AsyncThoughtsListView, AsyncSearchView, AsyncGraphDataView
 
 urlpatterns = [
     path('thoughts/', ThoughtsListView.as_view(), name='thoughts-list'),
     path('quotes/', QuotesListView.as_view(), name='quotes-list'),
     path('passages/', PassagesListView.as_view(), name='passages-list'),
     path('search/', SearchView.as_view(), name='search'),
+    path('search/suggest/', SearchSuggestView.as_view(), name='search-suggest'),
     path('graph/', GraphDataView.as_view(), name='graph-data'),
     path('tags/', TagsView.as_view(), name='tags-list'),
     path('tags/<str:tag_name>/', TagItemsView.as_view(), name='tag-items'),
+    # Async variants, for deployments served by an ASGI server
+    path('async/thoughts/', AsyncThoughtsListView.as_view(), name='async-thoughts-list'),
+    path('async/search/', AsyncSearchView.as_view(), name='async-search'),
+    path('async/graph/', AsyncGraphDataView.as_view(), name='async-graph-data'),
     path('<str:item_type>/<str:item_id>/', ItemDetailView.as_view(), name='item-detail'),
-]
\ No newline at end of file
+]
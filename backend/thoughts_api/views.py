@@ -1,29 +1,71 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.http import Http404
 from django.shortcuts import render
-from .neo4j_service import neo4j_service
+from graph_app.formats import get_graph_format, graph_response
+from .fts_index import fts_index
+from .mirror import mirror_service
+from .neo4j_service import CypherQueries, neo4j_service
+from .pagination import InvalidCursor, decode_cursor
+from .search_engine import search_engine
+from .tag_index import tag_index
+from .trigram_index import suggestion_index
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _get_page_params(request):
+    """
+    Read page-number and cursor pagination parameters from a request
+
+    Returns:
+        Tuple of (page, page_size, skip, after); after is the decoded
+        cursor, or None when the client pages by number
+    """
+    page = int(request.GET.get('page', 1))
+    page_size = int(request.GET.get('page_size', 20))
+    cursor = request.GET.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    skip = 0 if after else (page - 1) * page_size
+    return page, page_size, skip, after
+
+
+def _content_backend():
+    """Service the content views read from, per settings.CONTENT_BACKEND"""
+    if settings.CONTENT_BACKEND == 'mirror':
+        return mirror_service
+    return neo4j_service
+
+
+def _invalid_cursor_response():
+    return Response(
+        {'error': 'Invalid cursor'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
 class ThoughtsListView(APIView):
     """API view for listing thoughts"""
     
     def get(self, request):
         try:
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            skip = (page - 1) * page_size
+            page, page_size, skip, after = _get_page_params(request)
+            backend = _content_backend()
             
-            thoughts = neo4j_service.get_all_thoughts(skip=skip, limit=page_size)
+            rows = backend.get_all_thoughts(skip=skip, limit=page_size + 1, after=after)
+            thoughts, next_cursor = backend.thoughts_keyset.paginate(rows, page_size)
             
             return Response({
                 'results': thoughts,
+                'count': backend.get_label_count('THOUGHT'),
                 'page': page,
-                'page_size': page_size
+                'page_size': page_size,
+                'next': next_cursor
             })
+        except InvalidCursor:
+            return _invalid_cursor_response()
         except Exception as e:
             logger.error(f"Error fetching thoughts: {e}")
             return Response(
@@ -37,17 +79,21 @@ class QuotesListView(APIView):
     
     def get(self, request):
         try:
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            skip = (page - 1) * page_size
+            page, page_size, skip, after = _get_page_params(request)
+            backend = _content_backend()
             
-            quotes = neo4j_service.get_all_quotes(skip=skip, limit=page_size)
+            rows = backend.get_all_quotes(skip=skip, limit=page_size + 1, after=after)
+            quotes, next_cursor = backend.quotes_keyset.paginate(rows, page_size)
             
             return Response({
                 'results': quotes,
+                'count': backend.get_label_count('QUOTE'),
                 'page': page,
-                'page_size': page_size
+                'page_size': page_size,
+                'next': next_cursor
             })
+        except InvalidCursor:
+            return _invalid_cursor_response()
         except Exception as e:
             logger.error(f"Error fetching quotes: {e}")
             return Response(
@@ -60,17 +106,21 @@ class PassagesListView(APIView):
     
     def get(self, request):
         try:
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            skip = (page - 1) * page_size
+            page, page_size, skip, after = _get_page_params(request)
+            backend = _content_backend()
             
-            passages = neo4j_service.get_all_passages(skip=skip, limit=page_size)
+            rows = backend.get_all_passages(skip=skip, limit=page_size + 1, after=after)
+            passages, next_cursor = backend.passages_keyset.paginate(rows, page_size)
             
             return Response({
                 'results': passages,
+                'count': backend.get_label_count('PASSAGE'),
                 'page': page,
-                'page_size': page_size
+                'page_size': page_size,
+                'next': next_cursor
             })
+        except InvalidCursor:
+            return _invalid_cursor_response()
         except Exception as e:
             logger.error(f"Error fetching passages: {e}")
             return Response(
@@ -91,7 +141,7 @@ class ItemDetailView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            item = neo4j_service.get_item_by_id(item_id, item_type)
+            item = _content_backend().get_item_by_id(item_id, item_type)
             
             if not item:
                 raise Http404("Item not found")
@@ -112,6 +162,8 @@ class ItemDetailView(APIView):
 class SearchView(APIView):
     """API view for searching content"""
     
+    SEARCH_MODES = ('cypher', 'fulltext', 'memory', 'sqlite')
+    
     def get(self, request):
         try:
             search_term = request.GET.get('q', '').strip()
@@ -121,22 +173,85 @@ class SearchView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            skip = (page - 1) * page_size
+            mode = request.GET.get('mode', settings.SEARCH_BACKEND)
+            if mode not in self.SEARCH_MODES:
+                return Response(
+                    {'error': f"Unknown search mode: {mode}"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            results = neo4j_service.search_content(
+            page, page_size, skip, after = _get_page_params(request)
+            
+            if mode == 'memory':
+                skip = (page - 1) * page_size
+                types = request.GET.getlist('type') or None
+                found = search_engine.search(search_term, skip=skip, limit=page_size, types=types)
+                return Response({
+                    'results': found['results'],
+                    'count': found['total'],
+                    'facets': found['facets'],
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size,
+                    'next': None
+                })
+            
+            if mode == 'sqlite':
+                # FTS5 over the Django mirror, relevance-ordered and paged by number
+                skip = (page - 1) * page_size
+                results, total = fts_index.search(
+                    search_term,
+                    skip=skip,
+                    limit=page_size,
+                    types=request.GET.getlist('type') or None
+                )
+                return Response({
+                    'results': results,
+                    'count': total,
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size,
+                    'next': None
+                })
+            
+            if mode == 'fulltext':
+                # Relevance-ordered, so it pages by number rather than cursor
+                skip = (page - 1) * page_size
+                results, total = neo4j_service.fulltext_search(
+                    search_term,
+                    skip=skip,
+                    limit=page_size
+                )
+                return Response({
+                    'results': results,
+                    'count': total,
+                    'search_term': search_term,
+                    'mode': mode,
+                    'page': page,
+                    'page_size': page_size,
+                    'next': None
+                })
+            
+            rows = neo4j_service.search_content(
                 search_term, 
                 skip=skip, 
-                limit=page_size
+                limit=page_size + 1,
+                after=after
             )
+            results, next_cursor = neo4j_service.search_keyset.paginate(rows, page_size)
             
             return Response({
                 'results': results,
                 'search_term': search_term,
+                'mode': mode,
                 'page': page,
-                'page_size': page_size
+                'page_size': page_size,
+                'next': next_cursor
             })
+        except InvalidCursor:
+            return _invalid_cursor_response()
         except Exception as e:
             logger.error(f"Error searching content: {e}")
             return Response(
@@ -144,20 +259,57 @@ class SearchView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class SearchSuggestView(APIView):
+    """API view for typo-tolerant title matches and tag completions"""
+    
+    MAX_LIMIT = 50
+    
+    def get(self, request):
+        try:
+            query = request.GET.get('q', '').strip()
+            if not query:
+                return Response(
+                    {'error': 'Search term is required'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            limit = min(int(request.GET.get('limit', 10)), self.MAX_LIMIT)
+            types = request.GET.getlist('type') or None
+            suggestions = suggestion_index.suggest(query, limit=limit, types=types)
+            
+            return Response({
+                'query': query,
+                'matches': suggestions['matches'],
+                'tags': suggestions['tags']
+            })
+        except Exception as e:
+            logger.error(f"Error building suggestions: {e}")
+            return Response(
+                {'error': 'Suggestions failed'}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class GraphDataView(APIView):
     """API view for getting graph visualization data"""
     
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= picks a graph encoding here, not a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+    
     def get(self, request):
         try:
             node_id = request.GET.get('node_id')
             node_type = request.GET.get('node_type')
-            
+            fmt = get_graph_format(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
             graph_data = neo4j_service.get_graph_data(node_id, node_type)
             
             if graph_data:
-                return Response(graph_data[0])
+                return graph_response(graph_data[0], fmt)
             else:
-                return Response({'nodes': [], 'links': []})
+                return graph_response({'nodes': [], 'links': []}, fmt)
         except Exception as e:
             logger.error(f"Error fetching graph data: {e}")
             return Response(
@@ -166,12 +318,41 @@ class GraphDataView(APIView):
             )
 
 class TagsView(APIView):
-    """API view for listing tags"""
+    """API view for listing tags with usage counts"""
+    
+    TAG_SORTS = ('count', 'name')
     
     def get(self, request):
         try:
-            tags = neo4j_service.get_tags()
-            return Response({'results': tags})
+            sort = request.GET.get('sort', 'count')
+            if sort not in self.TAG_SORTS:
+                return Response(
+                    {'error': f"Unknown sort: {sort}"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            content_type = request.GET.get('type')
+            if content_type and content_type not in CypherQueries.COUNTABLE_LABELS:
+                return Response(
+                    {'error': f"Unknown type: {content_type}"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            page = int(request.GET.get('page', 1))
+            page_size = int(request.GET.get('page_size', 50))
+            
+            tags, total = tag_index.tag_stats(
+                prefix=request.GET.get('prefix'),
+                sort=sort,
+                content_type=content_type,
+                skip=(page - 1) * page_size,
+                limit=page_size
+            )
+            
+            return Response({
+                'results': tags,
+                'count': total,
+                'page': page,
+                'page_size': page_size
+            })
         except Exception as e:
             logger.error(f"Error fetching tags: {e}")
             return Response(
@@ -184,22 +365,59 @@ class TagItemsView(APIView):
     
     def get(self, request, tag_name):
         try:
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
-            skip = (page - 1) * page_size
+            page, page_size, skip, after = _get_page_params(request)
+            types = request.GET.getlist('type') or None
+            backend = _content_backend()
+            unknown = set(types or ()) - set(backend.COUNTABLE_LABELS)
+            if unknown:
+                return Response(
+                    {'error': f"Unknown type: {', '.join(sorted(unknown))}"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if after:
+                backend.tag_items_keyset.parameters(after)  # validates the cursor shape
             
-            items = neo4j_service.get_items_by_tag(
-                tag_name, 
-                skip=skip, 
-                limit=page_size
-            )
+            try:
+                if backend is mirror_service:
+                    rows = mirror_service.get_items_by_tag(
+                        tag_name, 
+                        skip=skip, 
+                        limit=page_size + 1,
+                        after=after,
+                        types=types
+                    )
+                    total = mirror_service.get_tag_item_count(tag_name, types)
+                else:
+                    rows, total = tag_index.items_for_tag(
+                        tag_name, 
+                        skip=skip, 
+                        limit=page_size + 1,
+                        after=after,
+                        types=types
+                    )
+            except Exception as e:
+                # The index or mirror could not be read; page the label-scoped query instead
+                logger.warning(f"Tag index unavailable, querying Neo4j: {e}")
+                rows = neo4j_service.get_items_by_tag(
+                    tag_name, 
+                    skip=skip, 
+                    limit=page_size + 1,
+                    after=after,
+                    types=types
+                )
+                total = neo4j_service.get_tag_item_count(tag_name, types)
+            items, next_cursor = backend.tag_items_keyset.paginate(rows, page_size)
             
             return Response({
                 'results': items,
+                'count': total,
                 'tag': tag_name,
                 'page': page,
-                'page_size': page_size
+                'page_size': page_size,
+                'next': next_cursor
             })
+        except InvalidCursor:
+            return _invalid_cursor_response()
         except Exception as e:
             logger.error(f"Error fetching items by tag: {e}")
             return Response(
@@ -22,7 +22,7 @@ class TopicAdmin(admin.ModelAdmin):
     list_filter = ['level', 'is_active', 'last_synced', 'created_at']
     search_fields = ['title', 'description', 'neo4j_id', 'slug']
     prepopulated_fields = {'slug': ('title',)}
-    readonly_fields = ['neo4j_id', 'last_synced', 'created_at', 'updated_at']
+    readonly_fields = ['neo4j_id', 'content_hash', 'last_synced', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Basic Information', {
@@ -32,7 +32,7 @@ class TopicAdmin(admin.ModelAdmin):
             'fields': ('level', 'parent_id')
         }),
         ('Neo4j Integration', {
-            'fields': ('neo4j_id', 'last_synced'),
+            'fields': ('neo4j_id', 'content_hash', 'last_synced'),
             'classes': ('collapse',)
         }),
         ('Status', {
@@ -68,25 +68,16 @@ class TopicAdmin(admin.ModelAdmin):
     get_neo4j_link.short_description = 'Neo4j'
     
     def sync_from_neo4j(self, request, queryset):
-        """Admin action to sync selected topics from Neo4j"""
-        from .services import topics_service
+        """Admin action to queue a sync of the selected topics from Neo4j"""
+        from .jobs import enqueue_sync
         
-        success_count = 0
-        for topic in queryset:
-            try:
-                neo4j_data = topics_service.get_topic_by_id(topic.neo4j_id)
-                if neo4j_data:
-                    # Update topic with fresh data
-                    topic.title = neo4j_data.get('title', topic.title)
-                    topic.description = neo4j_data.get('description', topic.description)
-                    topic.level = neo4j_data.get('level', topic.level)
-                    topic.parent_id = neo4j_data.get('parent', topic.parent_id)
-                    topic.save()
-                    success_count += 1
-            except Exception as e:
-                self.message_user(request, f"Error syncing {topic.title}: {e}", level='ERROR')
-        
-        self.message_user(request, f"Successfully synced {success_count} topics from Neo4j")
+        topic_ids = list(queryset.values_list('neo4j_id', flat=True))
+        job = enqueue_sync('single', topic_ids=topic_ids)
+        self.message_user(
+            request,
+            f"Queued sync job {job.pk} for {len(topic_ids)} topics; "
+            f"run 'manage.py topics_worker' if no worker is running"
+        )
     sync_from_neo4j.short_description = "Sync selected topics from Neo4j"
     
     def mark_active(self, request, queryset):
@@ -117,13 +108,15 @@ class TopicSyncLogAdmin(admin.ModelAdmin):
     """Admin for sync logs"""
     
     list_display = [
-        'sync_type', 'started_at', 'completed_at', 'success', 
-        'records_processed', 'get_duration'
+        'sync_type', 'status', 'queued_at', 'started_at', 'completed_at',
+        'records_processed', 'records_per_second', 'get_duration'
     ]
-    list_filter = ['sync_type', 'success', 'started_at']
+    list_filter = ['sync_type', 'status', 'success', 'queued_at']
     readonly_fields = [
-        'sync_type', 'started_at', 'completed_at', 'success',
-        'records_processed', 'error_message', 'get_duration'
+        'sync_type', 'status', 'params', 'worker', 'queued_at', 'started_at',
+        'completed_at', 'success', 'records_processed', 'records_created', 'records_updated',
+        'records_deleted', 'tags_written', 'duration_seconds', 'records_per_second', 'stage_stats',
+        'error_message', 'get_duration'
     ]
     search_fields = ['error_message']
     
@@ -137,6 +130,8 @@ class TopicSyncLogAdmin(admin.ModelAdmin):
             else:
                 minutes = seconds / 60
                 return f"{minutes:.1f} minutes"
+        if obj.status == TopicSyncLog.STATUS_QUEUED:
+            return "Queued"
         return "In progress" if not obj.completed_at else "Unknown"
     get_duration.short_description = 'Duration'
     
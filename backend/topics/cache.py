@@ -0,0 +1,120 @@
+"""
+Topic cache layer with single-flight recomputation and
+stale-while-revalidate.
+
+Entries are stored in the Django cache as (value, refresh_at). Once
+``refresh_at`` passes (REFRESH_AHEAD of the timeout), readers keep getting
+the cached value while one of them recomputes it in a background thread;
+the entry itself lives STALE_GRACE seconds past its timeout so a slow
+refresh never turns into a miss. On a real miss only one caller per key
+recomputes: threads of a process queue on a lock, and with a shared
+cache backend (settings.CACHE_LOCATION) other processes wait for the
+leader's result via a cache.add() lock key.
+"""
+
+import threading
+import time
+import logging
+
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the timeout after which an entry is refreshed in the background
+REFRESH_AHEAD = 0.8
+# Seconds a stale entry may still be served while it is being refreshed
+STALE_GRACE = 300
+# Lifetime of the recompute lock, bounding how long a crashed leader blocks others
+LOCK_TIMEOUT = 30
+# How long a follower waits for another process's result before computing itself
+WAIT_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+LOCK_STRIPES = 64
+
+
+class CoalescingCache:
+    """
+    get_or_set() in front of the Django cache that recomputes each key once
+    """
+
+    def __init__(self):
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def get_or_set(self, key, compute, timeout):
+        """
+        Cached value of ``compute()``
+
+        Args:
+            key: Cache key
+            compute: Callable producing the value; None results are not cached
+            timeout: Seconds the value counts as fresh
+
+        Returns:
+            The cached or computed value; exceptions from a foreground
+            compute propagate
+        """
+        entry = cache.get(key)
+        if entry is not None:
+            value, refresh_at = entry
+            if time.time() >= refresh_at:
+                self._refresh(key, compute, timeout)
+            return value
+
+        with self._locks[hash(key) % LOCK_STRIPES]:
+            # Another thread may have filled the key while this one waited
+            entry = cache.get(key)
+            if entry is not None:
+                return entry[0]
+
+            lock_key = f"{key}:lock"
+            if cache.add(lock_key, 1, LOCK_TIMEOUT):
+                try:
+                    return self.set(key, compute(), timeout)
+                finally:
+                    cache.delete(lock_key)
+
+            # Another process is computing the key; wait for its result
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry[0]
+            logger.warning(f"Timed out waiting for {key}; computing it here")
+            return self.set(key, compute(), timeout)
+
+    def set(self, key, value, timeout):
+        if value is not None:
+            entry = (value, time.time() + timeout * REFRESH_AHEAD)
+            cache.set(key, entry, timeout + STALE_GRACE)
+        return value
+
+    def _refresh(self, key, compute, timeout):
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            return  # already being refreshed
+
+        def run():
+            try:
+                self.set(key, compute(), timeout)
+            except Exception as e:
+                logger.error(f"Background refresh of {key} failed: {e}")
+            finally:
+                cache.delete(lock_key)
+
+        self._spawn(run)
+
+    def _spawn(self, target):
+        def run():
+            try:
+                target()
+            finally:
+                # The thread's own database connection, if compute opened one
+                connection.close()
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+# Global topic cache instance
+topic_cache = CoalescingCache()
@@ -0,0 +1,153 @@
+"""
+Local job queue for mirroring Neo4j topics into the Django models.
+
+Jobs are TopicSyncLog rows, so the queue needs no broker: enqueueing
+inserts a queued row, and ``manage.py topics_worker`` processes claim the
+oldest one with a conditional UPDATE (only one worker can move a row out
+of queued) and record the outcome on the same row. Request handlers
+never sync inline. Cache misses go through request_sync(), which
+throttles itself through the cache and inserts the job from a
+background thread, so reads never wait on a SQLite write.
+"""
+
+import os
+import socket
+import threading
+import time
+import logging
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import TopicSyncLog
+
+logger = logging.getLogger(__name__)
+
+# At most one cache-miss sync request per this many seconds
+SYNC_REQUEST_INTERVAL = 300
+SYNC_REQUEST_KEY = 'topics:sync-requested:'
+# Running jobs not finished after this long are assumed dead and requeued
+STALE_JOB_TIMEOUT = 60 * 15
+POLL_INTERVAL = 2.0
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_sync(sync_type='full', **params):
+    """
+    Queue a sync job, or return the equivalent job already waiting
+
+    Args:
+        sync_type: One of TopicSyncLog.SYNC_TYPES
+        **params: Job arguments (force, topic_ids, labels)
+
+    Returns:
+        The queued TopicSyncLog
+    """
+    with transaction.atomic():
+        job = TopicSyncLog.objects.filter(
+            sync_type=sync_type, status=TopicSyncLog.STATUS_QUEUED, params=params
+        ).first()
+        if job is None:
+            job = TopicSyncLog.objects.create(sync_type=sync_type, params=params)
+            logger.info(f"Queued {sync_type} topic sync job {job.pk}")
+    return job
+
+
+def request_sync(sync_type='incremental'):
+    """
+    Ask for a sync from a read path without touching the database in the
+    caller's thread; repeated requests within SYNC_REQUEST_INTERVAL are dropped
+    """
+    if not cache.add(f"{SYNC_REQUEST_KEY}{sync_type}", 1, SYNC_REQUEST_INTERVAL):
+        return False
+
+    def run():
+        try:
+            enqueue_sync(sync_type)
+        except Exception as e:
+            logger.error(f"Could not queue {sync_type} topic sync: {e}")
+        finally:
+            connection.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+
+def claim_next_job(worker=None):
+    """Atomically move the oldest queued job to running; None if the queue is empty"""
+    worker = worker or worker_name()
+    while True:
+        job = TopicSyncLog.objects.filter(
+            status=TopicSyncLog.STATUS_QUEUED
+        ).order_by('queued_at', 'pk').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = TopicSyncLog.objects.filter(
+            pk=job.pk, status=TopicSyncLog.STATUS_QUEUED
+        ).update(status=TopicSyncLog.STATUS_RUNNING, started_at=now, worker=worker)
+        if claimed:
+            job.status, job.started_at, job.worker = TopicSyncLog.STATUS_RUNNING, now, worker
+            return job
+        # Another worker took it first; try the next one
+
+
+def requeue_stale_jobs(timeout=STALE_JOB_TIMEOUT):
+    """Put running jobs whose worker seems to have died back in the queue"""
+    cutoff = timezone.now() - timezone.timedelta(seconds=timeout)
+    count = TopicSyncLog.objects.filter(
+        status=TopicSyncLog.STATUS_RUNNING, started_at__lt=cutoff
+    ).update(status=TopicSyncLog.STATUS_QUEUED, started_at=None, worker='')
+    if count:
+        logger.warning(f"Requeued {count} stale topic sync jobs")
+    return count
+
+
+def run_job(job):
+    """Execute a claimed job; the sync records its outcome on the job row"""
+    from .services import topics_service
+
+    params = job.params or {}
+    try:
+        if job.sync_type == 'single':
+            return topics_service.sync_topics_by_id(params.get('topic_ids', []), sync_log=job)
+        if job.sync_type == 'incremental':
+            return topics_service.sync_topics_incremental(sync_log=job)
+        if job.sync_type == 'content':
+            return topics_service.sync_content_from_neo4j(params.get('labels'), sync_log=job)
+        return topics_service.sync_topics_from_neo4j(force=params.get('force', False), sync_log=job)
+    except Exception as e:
+        logger.error(f"Topic sync job {job.pk} failed: {e}")
+        job.mark_completed(False, 0, f"Sync failed: {e}")
+        return False, str(e), 0
+
+
+def run_worker(once=False, poll_interval=POLL_INTERVAL, worker=None):
+    """
+    Process jobs until stopped
+
+    Args:
+        once: Return when the queue is empty instead of polling
+        poll_interval: Seconds to sleep when the queue is empty
+        worker: Name recorded on claimed jobs
+
+    Returns:
+        Number of jobs processed
+    """
+    worker = worker or worker_name()
+    processed = 0
+    while True:
+        requeue_stale_jobs()
+        job = claim_next_job(worker)
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        _, message, _ = run_job(job)
+        processed += 1
+        logger.info(f"Job {job.pk} ({job.sync_type}) finished: {message}")
@@ -0,0 +1,57 @@
+"""
+Run workers for the local topic sync job queue.
+
+    python manage.py topics_worker                  # one worker, polls forever
+    python manage.py topics_worker --processes 4    # four worker processes
+    python manage.py topics_worker --once           # drain the queue and exit
+"""
+
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from topics.jobs import POLL_INTERVAL, run_worker
+
+
+class Command(BaseCommand):
+    help = "Process queued topic sync jobs (TopicSyncLog rows with status 'queued')"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help="Number of worker processes to run",
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Exit when the queue is empty instead of polling for new jobs",
+        )
+        parser.add_argument(
+            '--poll', type=float, default=POLL_INTERVAL, metavar='SECONDS',
+            help="Seconds to wait between polls of an empty queue",
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError("--processes must be at least 1")
+
+        if processes == 1:
+            processed = run_worker(once=options['once'], poll_interval=options['poll'])
+            self.stdout.write(f"Processed {processed} sync jobs")
+            return
+
+        # Each worker is its own manage.py process with its own connection
+        args = [sys.executable, sys.argv[0], 'topics_worker', '--poll', str(options['poll'])]
+        if options['once']:
+            args.append('--once')
+        workers = [subprocess.Popen(args) for _ in range(processes)]
+        self.stdout.write(f"Started {processes} topic sync workers")
+        try:
+            codes = [worker.wait() for worker in workers]
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
+            raise
+        if any(codes):
+            raise CommandError("A topic sync worker exited with an error")
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_job_status(apps, schema_editor):
+    # Logs written before the queue existed ran inline; mark them finished
+    TopicSyncLog = apps.get_model('topics', 'TopicSyncLog')
+    for log in TopicSyncLog.objects.all():
+        log.queued_at = log.started_at or log.queued_at
+        log.status = 'succeeded' if log.success else 'failed'
+        log.save(update_fields=['queued_at', 'status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='topicsynclog',
+            options={'ordering': ['-queued_at']},
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='params',
+            field=models.JSONField(blank=True, default=dict, help_text='Job arguments, e.g. force or topic_ids'),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='queued_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='worker',
+            field=models.CharField(blank=True, help_text='Worker that claimed the job', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='topicsynclog',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='topicsynclog',
+            index=models.Index(fields=['status', 'queued_at'], name='topics_topi_status_d91721_idx'),
+        ),
+        migrations.RunPython(backfill_job_status, migrations.RunPython.noop),
+    ]
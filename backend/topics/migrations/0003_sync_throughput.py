@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0002_sync_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='duration_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='records_created',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='records_per_second',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='records_updated',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='tags_written',
+            field=models.IntegerField(default=0, help_text='Topic tags added plus removed'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0003_sync_throughput'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topic',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Fingerprint of the mirrored Neo4j fields and tags', max_length=40),
+        ),
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='records_deleted',
+            field=models.IntegerField(default=0, help_text='Topics deactivated because they left Neo4j'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('topics', '0004_topic_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicsynclog',
+            name='stage_stats',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-label throughput of the fetch and write stages'),
+        ),
+        migrations.AlterField(
+            model_name='topicsynclog',
+            name='records_deleted',
+            field=models.IntegerField(default=0, help_text='Records deactivated because they left Neo4j'),
+        ),
+        migrations.AlterField(
+            model_name='topicsynclog',
+            name='sync_type',
+            field=models.CharField(choices=[('full', 'Full Sync'), ('incremental', 'Incremental Sync'), ('single', 'Single Topic Sync'), ('content', 'Content Sync')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='topicsynclog',
+            name='tags_written',
+            field=models.IntegerField(default=0, help_text='Tags added plus removed'),
+        ),
+    ]
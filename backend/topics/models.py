@@ -40,6 +40,8 @@ class Topic(models.Model):
     description = models.TextField(blank=True)
     level = models.IntegerField(default=0, db_index=True)
     parent_id = models.CharField(max_length=255, blank=True, null=True)
+    content_hash = models.CharField(max_length=40, blank=True,
+                                    help_text="Fingerprint of the mirrored Neo4j fields and tags")
     
     # Additional Django-specific fields
     is_active = models.BooleanField(default=True)
@@ -103,32 +105,90 @@ class TopicTag(models.Model):
 
 
 class TopicSyncLog(models.Model):
-    """Log for tracking Neo4j sync operations"""
+    """
+    Log for tracking Neo4j sync operations
+    
+    Each row is also a job in the local sync queue (see topics.jobs): it is
+    created as queued, claimed by a worker as running and finished as
+    succeeded or failed.
+    """
     
     SYNC_TYPES = [
         ('full', 'Full Sync'),
         ('incremental', 'Incremental Sync'),
         ('single', 'Single Topic Sync'),
+        ('content', 'Content Sync'),
+    ]
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUSES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
     ]
     
     sync_type = models.CharField(max_length=20, choices=SYNC_TYPES)
-    started_at = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default=STATUS_QUEUED, db_index=True)
+    params = models.JSONField(default=dict, blank=True,
+                              help_text="Job arguments, e.g. force or topic_ids")
+    worker = models.CharField(max_length=100, blank=True,
+                              help_text="Worker that claimed the job")
+    queued_at = models.DateTimeField(default=timezone.now, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     success = models.BooleanField(default=False)
     records_processed = models.IntegerField(default=0)
     error_message = models.TextField(blank=True)
     
+    # Throughput of bulk syncs
+    records_created = models.IntegerField(default=0)
+    records_updated = models.IntegerField(default=0)
+    records_deleted = models.IntegerField(default=0,
+                                          help_text="Records deactivated because they left Neo4j")
+    tags_written = models.IntegerField(default=0,
+                                       help_text="Tags added plus removed")
+    duration_seconds = models.FloatField(null=True, blank=True)
+    records_per_second = models.FloatField(null=True, blank=True)
+    stage_stats = models.JSONField(default=dict, blank=True,
+                                   help_text="Per-label throughput of the fetch and write stages")
+    
     class Meta:
-        ordering = ['-started_at']
+        ordering = ['-queued_at']
+        indexes = [
+            models.Index(fields=['status', 'queued_at']),
+        ]
     
     def __str__(self):
-        status = "Success" if self.success else "Failed"
-        return f"{self.sync_type} sync - {status} - {self.started_at}"
-    
-    def mark_completed(self, success=True, records_processed=0, error_message=""):
-        """Mark the sync as completed"""
+        return f"{self.sync_type} sync - {self.get_status_display()} - {self.queued_at}"
+    
+    def mark_completed(self, success=True, records_processed=0, error_message="", stats=None,
+                       stages=None):
+        """
+        Mark the sync as completed
+        
+        Args:
+            stats: Optional topics.sync.SyncStats of the writes performed
+            stages: Optional per-label thoughts_api.pipeline reports
+        """
         self.completed_at = timezone.now()
+        if self.started_at is None:
+            self.started_at = self.completed_at
+        self.duration_seconds = (self.completed_at - self.started_at).total_seconds()
+        if self.duration_seconds > 0:
+            self.records_per_second = records_processed / self.duration_seconds
+        if stats is not None:
+            self.records_created = stats.created
+            self.records_updated = stats.updated
+            self.records_deleted = stats.deactivated
+            self.tags_written = stats.tags_added + stats.tags_removed
+        if stages is not None:
+            self.stage_stats = stages
         self.success = success
+        self.status = self.STATUS_SUCCEEDED if success else self.STATUS_FAILED
         self.records_processed = records_processed
         self.error_message = error_message
         self.save()
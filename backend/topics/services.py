@@ -4,15 +4,60 @@ Optimized for M1 MacBook performance
 """
 
 from typing import List, Dict, Optional, Tuple
+import json
 from django.conf import settings
 from django.utils import timezone
 from django.core.cache import cache
+from thoughts_api.fts_index import fts_index
+from thoughts_api.models import ContentItem, DataVersion
 from thoughts_api.neo4j_service import neo4j_service
-from .models import Topic, TopicTag, TopicSyncLog
+from thoughts_api.pipeline import SyncPipeline
+from thoughts_api.snapshot import content_snapshot, get_content_version, item_key, normalize_document
+from .models import Topic, TopicSyncLog
+from .cache import topic_cache
+from .jobs import request_sync
+from .store import TopicStore
+from .sync import SyncStats, bulk_sync_items, bulk_sync_topics, deactivate_missing
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Changed documents a sync keeps for patching the content snapshot; past
+# this many the snapshot is invalidated instead, so memory stays bounded
+SNAPSHOT_PATCH_LIMIT = 5000
+
+
+class _SnapshotChanges:
+    """Snapshot documents changed by a streaming sync, applied once at the end"""
+    
+    def __init__(self, limit=SNAPSHOT_PATCH_LIMIT):
+        self.limit = limit
+        self.upserts = []
+        self.removed_keys = []
+        self.overflowed = False
+    
+    def __bool__(self):
+        return self.overflowed or bool(self.upserts or self.removed_keys)
+    
+    def upsert(self, documents):
+        self._add(self.upserts, documents)
+    
+    def remove(self, keys):
+        self._add(self.removed_keys, keys)
+    
+    def _add(self, target, values):
+        if not self.overflowed:
+            target.extend(values)
+            if len(self.upserts) + len(self.removed_keys) > self.limit:
+                self.overflowed = True
+                self.upserts, self.removed_keys = [], []
+    
+    def apply(self):
+        if self.overflowed:
+            content_snapshot.invalidate()
+        elif self:
+            content_snapshot.apply_changes(upserts=self.upserts, removed_keys=self.removed_keys)
+
 
 class TopicsService:
     """
@@ -22,9 +67,38 @@ class TopicsService:
     
     CACHE_TIMEOUT = 300  # 5 minutes
     CACHE_PREFIX = 'topics:'
+    # Generation counter (a DataVersion row, so topics_worker bumps reach
+    # every process) embedded in every topics cache key; bumping it
+    # invalidates the whole namespace at once
+    VERSION_KEY = 'topics:version'
+    # Topics per Neo4j query when reading every topic
+    SYNC_PAGE_SIZE = 1000
     
     def __init__(self):
         self.neo4j = neo4j_service
+        # While it is open, topic reads skip Neo4j and use the Django mirror
+        self.breaker = neo4j_service.breaker
+        # Indexed topic tree, rebuilt from get_all_topics whenever content
+        # or the topics cache version changes
+        self.store = TopicStore(self.get_all_topics, version=self.get_store_version)
+    
+    def get_cache_version(self) -> int:
+        """Current topics cache generation"""
+        return DataVersion.objects.current(self.VERSION_KEY)
+    
+    def bump_cache_version(self) -> int:
+        """Advance the topics cache generation and return the new value"""
+        return DataVersion.objects.bump(self.VERSION_KEY)
+    
+    def get_store_version(self) -> str:
+        """Version of the data the topic store is built from"""
+        version = f"{get_content_version()}.{self.get_cache_version()}"
+        # Rebuild from the mirror when Neo4j goes down, and again once it is back
+        return f"{version}.mirror" if self.breaker.is_open else version
+    
+    def _cache_key(self, name: str) -> str:
+        """Cache key in the current topics generation"""
+        return f"{self.CACHE_PREFIX}v{self.get_cache_version()}:{name}"
     
     def get_all_topics(self, use_cache: bool = True, sync_if_missing: bool = True) -> List[Dict]:
         """
@@ -37,34 +111,17 @@ class TopicsService:
         Returns:
             List of topic dictionaries
         """
-        cache_key = f"{self.CACHE_PREFIX}all"
-        
-        if use_cache:
-            cached_topics = cache.get(cache_key)
-            if cached_topics:
-                logger.debug("Returning cached topics")
-                return cached_topics
+        if self.breaker.is_open:
+            return self._get_topics_from_django()
         
         try:
-            # Get from Neo4j
-            topics = self.neo4j.get_all_topics()
-            
-            # Enhanced topic data with additional processing
-            enhanced_topics = []
-            for topic in topics:
-                enhanced_topic = self._enhance_topic_data(topic)
-                enhanced_topics.append(enhanced_topic)
-            
-            # Cache the results
-            if use_cache:
-                cache.set(cache_key, enhanced_topics, self.CACHE_TIMEOUT)
-                logger.debug(f"Cached {len(enhanced_topics)} topics")
-            
-            # Optionally sync to Django models for additional features
-            if sync_if_missing:
-                self._sync_topics_to_django(enhanced_topics, sync_type='incremental')
-            
-            return enhanced_topics
+            if not use_cache:
+                return self._fetch_all_topics(sync_if_missing)
+            return topic_cache.get_or_set(
+                self._cache_key('all'),
+                lambda: self._fetch_all_topics(sync_if_missing),
+                self.CACHE_TIMEOUT,
+            )
             
         except Exception as e:
             logger.error(f"Error fetching topics: {e}")
@@ -82,53 +139,34 @@ class TopicsService:
         Returns:
             Topic dictionary or None
         """
-        cache_key = f"{self.CACHE_PREFIX}detail:{topic_id}"
-        
-        if use_cache:
-            cached_topic = cache.get(cache_key)
-            if cached_topic:
-                return cached_topic
+        if self.breaker.is_open:
+            return self._get_topic_from_django(topic_id)
         
         try:
-            topic = self.neo4j.get_item_by_id(topic_id, 'TOPIC')
-            if topic:
-                enhanced_topic = self._enhance_topic_data(topic)
-                
-                if use_cache:
-                    cache.set(cache_key, enhanced_topic, self.CACHE_TIMEOUT)
-                
-                return enhanced_topic
+            if not use_cache:
+                return self._fetch_topic(topic_id)
+            return topic_cache.get_or_set(
+                self._cache_key(f"detail:{topic_id}"),
+                lambda: self._fetch_topic(topic_id),
+                self.CACHE_TIMEOUT,
+            )
             
         except Exception as e:
             logger.error(f"Error fetching topic {topic_id}: {e}")
-            
-        return None
+            # Fallback to Django models if Neo4j fails
+            return self._get_topic_from_django(topic_id)
     
-    def get_topics_by_level(self, level: int, use_cache: bool = True) -> List[Dict]:
+    def get_topics_by_level(self, level: int) -> List[Dict]:
         """
         Get topics filtered by hierarchical level
         
         Args:
             level: Topic level (0 = root, 1 = first level, etc.)
-            use_cache: Whether to use caching
             
         Returns:
             List of topic dictionaries
         """
-        cache_key = f"{self.CACHE_PREFIX}level:{level}"
-        
-        if use_cache:
-            cached_topics = cache.get(cache_key)
-            if cached_topics:
-                return cached_topics
-        
-        all_topics = self.get_all_topics(use_cache=use_cache)
-        level_topics = [t for t in all_topics if t.get('level') == level]
-        
-        if use_cache:
-            cache.set(cache_key, level_topics, self.CACHE_TIMEOUT)
-        
-        return level_topics
+        return self.store.by_level(level)
     
     def search_topics(self, query: str, use_cache: bool = True) -> List[Dict]:
         """
@@ -141,66 +179,73 @@ class TopicsService:
         Returns:
             List of matching topic dictionaries
         """
-        cache_key = f"{self.CACHE_PREFIX}search:{query.lower()}"
-        
-        if use_cache:
-            cached_results = cache.get(cache_key)
-            if cached_results:
-                return cached_results
-        
         try:
-            # Use Neo4j search functionality
-            results = self.neo4j.search_content(query)
-            topic_results = [r for r in results if r.get('type') == 'TOPIC']
-            
-            enhanced_results = []
-            for topic in topic_results:
-                enhanced_topic = self._enhance_topic_data(topic)
-                enhanced_results.append(enhanced_topic)
-            
-            if use_cache:
-                cache.set(cache_key, enhanced_results, self.CACHE_TIMEOUT // 2)  # Shorter cache for search
-            
-            return enhanced_results
+            if self.breaker.is_open:
+                return self._search_mirror(query)
+            if not use_cache:
+                return self._fetch_search(query)
+            return topic_cache.get_or_set(
+                self._cache_key(f"search:{query.lower()}"),
+                lambda: self._fetch_search(query),
+                self.CACHE_TIMEOUT // 2,  # Shorter cache for search
+            )
             
         except Exception as e:
             logger.error(f"Error searching topics: {e}")
             return []
     
-    def get_topic_hierarchy(self, root_id: Optional[str] = None) -> Dict:
+    def get_topic_hierarchy(self, root_id: Optional[str] = None, depth: Optional[int] = None) -> Dict:
         """
         Get hierarchical topic structure
         
         Args:
             root_id: Starting point (None for full hierarchy)
+            depth: Levels of children below the start (None for all)
             
         Returns:
             Nested dictionary representing topic hierarchy
         """
-        all_topics = self.get_all_topics()
-        
-        if root_id:
-            # Filter to specific subtree
-            root_topic = next((t for t in all_topics if t['id'] == root_id), None)
-            if not root_topic:
-                return {}
-            topics = [t for t in all_topics if t['id'] == root_id or t.get('parent') == root_id]
-        else:
-            topics = all_topics
+        data = self.get_topic_hierarchy_json(root_id, depth)
+        return json.loads(data) if data else {}
+    
+    def get_topic_hierarchy_json(self, root_id: Optional[str] = None, depth: Optional[int] = None) -> Optional[str]:
+        """
+        Get the hierarchy as JSON text, prebuilt and cached per data version
+        
+        Returns:
+            JSON string, or None if root_id is unknown
+        """
+        return self.store.hierarchy_json(root_id, depth)
+    
+    def get_topic_children(self, topic_id: str) -> Optional[List[Dict]]:
+        """
+        Get the direct children of a topic for lazy hierarchy expansion
         
-        return self._build_hierarchy(topics)
+        Returns:
+            List of topic dictionaries with has_children and child_count,
+            or None if the topic is unknown
+        """
+        return self.store.expand(topic_id)
     
-    def sync_topics_from_neo4j(self, force: bool = False) -> Tuple[bool, str, int]:
+    def sync_topics_from_neo4j(self, force: bool = False,
+                               sync_log: Optional[TopicSyncLog] = None) -> Tuple[bool, str, int]:
         """
         Sync topics from Neo4j to Django models
         
+        Runs in a topics_worker process; request handlers queue it with
+        topics.jobs.enqueue_sync instead of calling it.
+        
         Args:
             force: Force full sync even if recent sync exists
+            sync_log: Claimed job to record the outcome on (a new log if None)
             
         Returns:
             Tuple of (success, message, records_processed)
         """
-        sync_log = TopicSyncLog.objects.create(sync_type='full')
+        if sync_log is None:
+            sync_log = TopicSyncLog.objects.create(
+                sync_type='full', status=TopicSyncLog.STATUS_RUNNING, started_at=timezone.now()
+            )
         
         try:
             # Check if recent sync exists
@@ -214,23 +259,69 @@ class TopicsService:
                 if recent_sync:
                     sync_log.mark_completed(False, 0, "Recent sync exists, use force=True to override")
                     return False, "Recent sync exists", 0
+        except Exception as e:
+            error_msg = f"Sync failed: {str(e)}"
+            sync_log.mark_completed(False, 0, error_msg)
+            logger.error(error_msg)
+            return False, error_msg, 0
+        
+        return self._sync_all_topics(sync_log, incremental=False)
+    
+    def sync_topics_incremental(self, sync_log: Optional[TopicSyncLog] = None) -> Tuple[bool, str, int]:
+        """
+        Sync only the topics whose content hash changed since the last sync
+        
+        Unchanged topics cost no database reads beyond their hashes and no
+        writes; topics gone from Neo4j are deactivated.
+        
+        Args:
+            sync_log: Claimed job to record the outcome on (a new log if None)
+            
+        Returns:
+            Tuple of (success, message, records_processed)
+        """
+        if sync_log is None:
+            sync_log = TopicSyncLog.objects.create(
+                sync_type='incremental', status=TopicSyncLog.STATUS_RUNNING, started_at=timezone.now()
+            )
+        return self._sync_all_topics(sync_log, incremental=True)
+    
+    def _sync_all_topics(self, sync_log: TopicSyncLog, incremental: bool) -> Tuple[bool, str, int]:
+        """Mirror every Neo4j topic through the streaming pipeline and record the outcome on sync_log"""
+        try:
+            totals = SyncStats()
+            seen = set()
+            changes = _SnapshotChanges()
             
-            # Get all topics from Neo4j
-            neo4j_topics = self.neo4j.get_all_topics()
-            records_processed = 0
+            def write(rows):
+                # Write only what differs, one page per transaction
+                stats = bulk_sync_topics(rows, incremental=incremental)
+                totals.add(stats)
+                seen.update(row['id'] for row in rows if row.get('id'))
+                changed = set(stats.changed_ids)
+                changes.upsert(self._topic_document(row) for row in rows if row.get('id') in changed)
             
-            for topic_data in neo4j_topics:
-                try:
-                    self._sync_single_topic(topic_data)
-                    records_processed += 1
-                except Exception as e:
-                    logger.error(f"Error syncing topic {topic_data.get('id')}: {e}")
+            pipeline = SyncPipeline(
+                lambda after, limit: self.neo4j.get_all_topics(limit=limit, after=after),
+                self.neo4j.topics_keyset, write, page_size=self.SYNC_PAGE_SIZE,
+            )
+            report = pipeline.run()
+            gone = deactivate_missing(Topic.objects.all(), seen, 'TOPIC')
+            totals.deactivated = len(gone)
+            changes.remove(item_key('TOPIC', topic_id) for topic_id in gone)
+            records_processed = totals.processed
             
-            # Clear cache after sync
-            self.clear_cache()
+            if changes:
+                # Clear cache after sync
+                self.clear_cache()
+                
+                # Patch the in-memory search indexes with the synced topics
+                changes.apply()
             
-            sync_log.mark_completed(True, records_processed)
-            return True, f"Successfully synced {records_processed} topics", records_processed
+            sync_log.mark_completed(True, records_processed, stats=totals, stages={'TOPIC': report})
+            message = (f"Successfully synced {records_processed} topics "
+                       f"({totals.created} created, {totals.updated} updated, {totals.deactivated} removed)")
+            return True, message, records_processed
             
         except Exception as e:
             error_msg = f"Sync failed: {str(e)}"
@@ -238,40 +329,178 @@ class TopicsService:
             logger.error(error_msg)
             return False, error_msg, 0
     
-    def clear_cache(self):
-        """Clear all topics-related cache"""
-        cache_keys = [
-            f"{self.CACHE_PREFIX}all",
-            f"{self.CACHE_PREFIX}hierarchy",
-        ]
+    def sync_content_from_neo4j(self, labels: Optional[List[str]] = None,
+                                sync_log: Optional[TopicSyncLog] = None) -> Tuple[bool, str, int]:
+        """
+        Mirror THOUGHT, QUOTE and PASSAGE nodes into thoughts_api.models.ContentItem
         
-        # Clear specific level caches (0-10 levels should be enough)
-        for level in range(11):
-            cache_keys.append(f"{self.CACHE_PREFIX}level:{level}")
+        Each label is streamed page by page through the sync pipeline, so
+        memory stays flat however large the catalog is.
         
-        cache.delete_many(cache_keys)
-        logger.info("Cleared topics cache")
+        Args:
+            labels: Labels to mirror (all of Neo4jService.MIRROR_LABELS if None)
+            sync_log: Claimed job to record the outcome on (a new log if None)
+            
+        Returns:
+            Tuple of (success, message, records_processed)
+        """
+        if sync_log is None:
+            sync_log = TopicSyncLog.objects.create(
+                sync_type='content', status=TopicSyncLog.STATUS_RUNNING, started_at=timezone.now()
+            )
+        labels = labels or list(self.neo4j.MIRROR_LABELS)
+        
+        try:
+            unknown = set(labels) - set(self.neo4j.MIRROR_LABELS)
+            if unknown:
+                raise ValueError(f"Unsupported labels: {', '.join(sorted(unknown))}")
+            
+            totals = SyncStats()
+            changes = _SnapshotChanges()
+            stages = {}
+            for label in labels:
+                seen = set()
+                
+                def write(rows, label=label, seen=seen):
+                    stats = bulk_sync_items(label, rows)
+                    totals.add(stats)
+                    seen.update(row['id'] for row in rows if row.get('id'))
+                    changed = set(stats.changed_ids)
+                    changes.upsert(
+                        normalize_document({**row, 'type': label}) for row in rows if row.get('id') in changed
+                    )
+                
+                pipeline = SyncPipeline(
+                    lambda after, limit, label=label: self.neo4j.get_mirror_rows(label, limit=limit, after=after),
+                    self.neo4j.mirror_keyset, write, page_size=self.SYNC_PAGE_SIZE,
+                )
+                stages[label] = pipeline.run()
+                gone = deactivate_missing(ContentItem.objects.filter(node_type=label), seen, label)
+                totals.deactivated += len(gone)
+                changes.remove(item_key(label, item_id) for item_id in gone)
+            
+            changes.apply()
+            records_processed = totals.processed
+            sync_log.mark_completed(True, records_processed, stats=totals, stages=stages)
+            message = (f"Successfully synced {records_processed} items "
+                       f"({totals.created} created, {totals.updated} updated, {totals.deactivated} removed)")
+            return True, message, records_processed
+            
+        except Exception as e:
+            error_msg = f"Sync failed: {str(e)}"
+            sync_log.mark_completed(False, 0, error_msg)
+            logger.error(error_msg)
+            return False, error_msg, 0
+    
+    def sync_topics_by_id(self, topic_ids: List[str],
+                          sync_log: Optional[TopicSyncLog] = None) -> Tuple[bool, str, int]:
+        """
+        Sync selected topics from Neo4j to Django models
+        
+        Args:
+            topic_ids: Neo4j ids of the topics to refresh
+            sync_log: Claimed job to record the outcome on (a new log if None)
+            
+        Returns:
+            Tuple of (success, message, records_processed)
+        """
+        if sync_log is None:
+            sync_log = TopicSyncLog.objects.create(
+                sync_type='single', status=TopicSyncLog.STATUS_RUNNING, started_at=timezone.now()
+            )
+        
+        try:
+            # Same row shape as the full sync reads
+            synced = self.neo4j.get_topics_by_id(topic_ids)
+        except Exception as e:
+            error_msg = f"Error fetching topics: {e}"
+            sync_log.mark_completed(False, 0, error_msg)
+            logger.error(error_msg)
+            return False, error_msg, 0
+        
+        found = {topic['id'] for topic in synced}
+        errors = [f"{topic_id}: not found in Neo4j" for topic_id in topic_ids if topic_id not in found]
+        
+        try:
+            stats = bulk_sync_topics(synced)
+        except Exception as e:
+            error_msg = f"Sync failed: {str(e)}"
+            sync_log.mark_completed(False, 0, error_msg)
+            logger.error(error_msg)
+            return False, error_msg, 0
+        
+        if synced:
+            self.clear_cache()
+            content_snapshot.apply_changes(upserts=[self._topic_document(topic) for topic in synced])
+        
+        records_processed = stats.processed
+        message = f"Synced {records_processed} of {len(topic_ids)} topics"
+        sync_log.mark_completed(not errors, records_processed, '\n'.join(errors), stats=stats)
+        return not errors, message, records_processed
+    
+    def clear_cache(self):
+        """
+        Invalidate all topics-related cache entries
+        
+        Moves every topics key to a new generation; the old entries are
+        never read again and expire with their timeout.
+        """
+        version = self.bump_cache_version()
+        logger.info(f"Cleared topics cache, now at v{version}")
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics for monitoring"""
         stats = {
             'cache_timeout': self.CACHE_TIMEOUT,
             'cache_prefix': self.CACHE_PREFIX,
+            'cache_version': self.get_cache_version(),
+            'content_version': get_content_version(),
+            'store_version': self.store.version,
+            'neo4j_circuit': self.breaker.state,
         }
         
-        # Check if main cache keys exist
-        main_keys = [
-            f"{self.CACHE_PREFIX}all",
-            f"{self.CACHE_PREFIX}hierarchy",
-        ]
-        
-        for key in main_keys:
-            stats[key.replace(self.CACHE_PREFIX, '')] = cache.get(key) is not None
+        # Check if the main cache key exists
+        stats['all'] = cache.get(self._cache_key('all')) is not None
         
         return stats
     
     # Private methods
     
+    def _fetch_all_topics(self, sync_if_missing: bool = True) -> List[Dict]:
+        """Load and enhance every topic from Neo4j; raises on Neo4j errors"""
+        topics = [self._topic_row(topic) for topic in self._fetch_topic_rows()]
+        logger.debug(f"Fetched {len(topics)} topics")
+        
+        # Optionally mirror to Django models; queued for a worker, never inline
+        if sync_if_missing:
+            request_sync('incremental')
+        
+        return topics
+    
+    def _fetch_topic_rows(self) -> List[Dict]:
+        """Every topic row from Neo4j, paged on the topics keyset"""
+        keyset = self.neo4j.topics_keyset
+        rows = []
+        after = None
+        while True:
+            page = self.neo4j.get_all_topics(limit=self.SYNC_PAGE_SIZE, after=after)
+            rows.extend(page)
+            if len(page) < self.SYNC_PAGE_SIZE:
+                return rows
+            after = keyset.row_key(page[-1])
+    
+    def _fetch_topic(self, topic_id: str) -> Optional[Dict]:
+        """Load one topic row from Neo4j; raises on Neo4j errors"""
+        rows = self.neo4j.get_topics_by_id([topic_id])
+        return self._topic_row(rows[0]) if rows else None
+    
+    def _fetch_search(self, query: str) -> List[Dict]:
+        """Search topics in Neo4j, or the FTS5 index with SEARCH_BACKEND='sqlite'; raises on errors"""
+        if settings.SEARCH_BACKEND == 'sqlite':
+            return self._search_mirror(query)
+        results = self.neo4j.search_content(query)
+        return [self._enhance_topic_data(r) for r in results if r.get('type') == 'TOPIC']
+    
     def _enhance_topic_data(self, topic: Dict) -> Dict:
         """
         Enhance topic data with additional computed fields
@@ -307,108 +536,78 @@ class TopicsService:
         return enhanced
     
     def _get_topics_from_django(self) -> List[Dict]:
-        """Fallback method to get topics from Django models"""
+        """
+        Every active topic from the Django mirror, shaped like the Neo4j rows
+        
+        Tags are prefetched in one query, so this costs two queries in total.
+        """
         try:
-            topics = Topic.objects.active().values(
-                'neo4j_id', 'title', 'description', 'level', 'parent_id',
-                'slug', 'created_at', 'updated_at'
-            )
-            
-            result = []
-            for topic in topics:
-                # Convert to format similar to Neo4j
-                result.append({
-                    'id': topic['neo4j_id'],
-                    'title': topic['title'],
-                    'description': topic['description'],
-                    'level': topic['level'],
-                    'parent': topic['parent_id'],
-                    'slug': topic['slug'],
-                    'tags': [],  # Would need to fetch separately
-                })
-            
-            return result
+            topics = Topic.objects.active().prefetch_related('topic_tags')
+            return [self._topic_from_model(topic) for topic in topics]
             
         except Exception as e:
             logger.error(f"Error fetching from Django models: {e}")
             return []
     
-    def _sync_single_topic(self, topic_data: Dict):
-        """Sync a single topic to Django model"""
-        neo4j_id = topic_data.get('id')
-        if not neo4j_id:
-            return
-        
-        topic, created = Topic.objects.update_or_create(
-            neo4j_id=neo4j_id,
-            defaults={
-                'title': topic_data.get('title', ''),
-                'description': topic_data.get('description', '') or topic_data.get('en_description', ''),
-                'level': topic_data.get('level', 0),
-                'parent_id': topic_data.get('parent'),
-                'last_synced': timezone.now(),
-            }
-        )
-        
-        # Sync tags
-        tags = topic_data.get('tags', [])
-        if isinstance(tags, str):
-            tags = [tags] if tags else []
-        
-        # Clear existing tags and add new ones
-        TopicTag.objects.filter(topic=topic).delete()
-        for tag in tags:
-            TopicTag.objects.create(topic=topic, tag=tag)
-        
-        return topic
-    
-    def _build_hierarchy(self, topics: List[Dict]) -> Dict:
-        """Build hierarchical structure from flat topic list"""
-        # Create lookup tables
-        topics_by_id = {t['id']: t.copy() for t in topics}
-        children_by_parent = {}
-        
-        # Group children by parent
-        for topic in topics:
-            parent_id = topic.get('parent')
-            if parent_id and parent_id in topics_by_id:
-                if parent_id not in children_by_parent:
-                    children_by_parent[parent_id] = []
-                children_by_parent[parent_id].append(topic['id'])
-        
-        # Add children to topics and mark parents
-        for topic_id, topic in topics_by_id.items():
-            children_ids = children_by_parent.get(topic_id, [])
-            topic['children'] = [topics_by_id[child_id] for child_id in children_ids if child_id in topics_by_id]
-            topic['has_children'] = len(topic['children']) > 0
+    def _get_topic_from_django(self, topic_id: str) -> Optional[Dict]:
+        """One active topic from the Django mirror, or None"""
+        try:
+            topic = Topic.objects.active().prefetch_related('topic_tags').filter(neo4j_id=topic_id).first()
+            return self._topic_from_model(topic) if topic else None
             
-            # Recursively build children
-            if topic['children']:
-                for child in topic['children']:
-                    child['children'] = self._get_topic_children(child['id'], topics_by_id, children_by_parent)
-        
-        # Return root topics
-        root_topics = [t for t in topics_by_id.values() if not t.get('parent') or t.get('parent') not in topics_by_id]
-        
-        return {
-            'topics': root_topics,
-            'total_count': len(topics),
-            'root_count': len(root_topics),
-        }
+        except Exception as e:
+            logger.error(f"Error fetching topic {topic_id} from Django models: {e}")
+            return None
     
-    def _get_topic_children(self, topic_id: str, topics_by_id: Dict, children_by_parent: Dict) -> List[Dict]:
-        """Recursively get children for a topic"""
-        children_ids = children_by_parent.get(topic_id, [])
-        children = []
-        
-        for child_id in children_ids:
-            if child_id in topics_by_id:
-                child = topics_by_id[child_id].copy()
-                child['children'] = self._get_topic_children(child_id, topics_by_id, children_by_parent)
-                children.append(child)
+    def _search_mirror(self, query: str) -> List[Dict]:
+        """Search mirrored topics through the FTS5 index; raises on database errors"""
+        results, _ = fts_index.search(query, types=['TOPIC'])
+        return [self._enhance_topic_data({**r, 'description': r['content']}) for r in results]
+    
+    def _topic_from_model(self, topic: Topic) -> Dict:
+        """Convert a mirrored Topic with prefetched tags to a topic row"""
+        return self._topic_row({
+            'id': topic.neo4j_id,
+            'title': topic.title,
+            'description': topic.description,
+            'level': topic.level,
+            'parent': topic.parent_id,
+            'tags': [tag.tag for tag in topic.topic_tags.all()],
+        })
+    
+    def _topic_row(self, topic: Dict) -> Dict:
+        """
+        Flat, enhanced topic row served by the list and detail reads
         
-        return children
-
+        Neo4j topics_query rows and mirrored topics both go through here,
+        so a read returns the same fields whether or not the Neo4j
+        circuit is open. The description falls back to the DESCRIPTION
+        node like topics.sync.topic_fields.
+        """
+        tags = topic.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tags]
+        return self._enhance_topic_data({
+            'id': topic.get('id'),
+            'title': topic.get('title'),
+            'description': topic.get('description') or topic.get('en_description') or '',
+            'level': topic.get('level'),
+            'parent': topic.get('parent'),
+            'tags': sorted(tags),
+        })
+    
+    def _topic_document(self, topic_data: Dict) -> Dict:
+        """Convert Neo4j topic data into a content snapshot document"""
+        return normalize_document({
+            'id': topic_data.get('id'),
+            'title': topic_data.get('title'),
+            'content': topic_data.get('en_description') or topic_data.get('description'),
+            'type': 'TOPIC',
+            'level': topic_data.get('level'),
+            'tags': topic_data.get('tags'),
+            'parent': topic_data.get('parent'),
+        })
+    
 
 # Global service instance
 topics_service = TopicsService()
\ No newline at end of file
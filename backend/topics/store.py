@@ -0,0 +1,232 @@
+"""
+Indexed in-memory copy of the topic tree.
+
+Topic views used to scan the full topic list for children, siblings,
+the parent and every breadcrumb step. The store loads the topics once
+per content version and keeps id -> topic, parent -> children and
+level -> topics maps plus each topic's ancestor path, so a detail page
+costs O(children + depth) however many topics there are.
+
+The nested hierarchy is serialized straight from these maps: each
+topic's own fields are encoded once per version and a depth or root cut
+only changes which of them are joined, so no subtree is copied. The
+resulting JSON is cached per version, root and depth.
+"""
+
+import json
+import threading
+import logging
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+from thoughts_api.snapshot import get_content_version
+
+logger = logging.getLogger(__name__)
+
+HIERARCHY_CACHE_PREFIX = 'topics:hierarchy:'
+HIERARCHY_CACHE_TIMEOUT = 60 * 60
+
+
+class TopicIndex:
+    """
+    Lookup maps over one list of topic dicts
+    """
+
+    def __init__(self, topics, version=None):
+        self.version = version
+        self.by_id = {}
+        for topic in topics:
+            if topic.get('id'):
+                self.by_id.setdefault(topic['id'], topic)
+
+        self.children = {}
+        self.by_level = {}
+        self.roots = []
+        for topic_id, topic in self.by_id.items():
+            parent_id = topic.get('parent')
+            if parent_id and parent_id in self.by_id and parent_id != topic_id:
+                self.children.setdefault(parent_id, []).append(topic)
+            else:
+                self.roots.append(topic)
+            self.by_level.setdefault(topic.get('level', 0), []).append(topic)
+
+        self.paths = {}
+        for topic_id in self.by_id:
+            self._path(topic_id)
+
+        self._encoded = {}
+
+    def _path(self, topic_id):
+        """Ancestor ids from the root down to topic_id, computed once per topic"""
+        walk = []
+        seen = set()
+        node = topic_id
+        while node not in self.paths:
+            walk.append(node)
+            seen.add(node)
+            parent_id = self.by_id[node].get('parent')
+            # Parents outside the store and parent cycles both end the path
+            if not parent_id or parent_id not in self.by_id or parent_id in seen:
+                prefix = ()
+                break
+            node = parent_id
+        else:
+            prefix = self.paths[node]
+        for node in reversed(walk):
+            prefix = prefix + (node,)
+            self.paths[node] = prefix
+        return self.paths[topic_id]
+
+    def encoded(self, topic_id):
+        """JSON object of a topic's own fields, without its closing brace"""
+        fields = self._encoded.get(topic_id)
+        if fields is None:
+            topic = self.by_id[topic_id]
+            data = {k: v for k, v in topic.items() if k not in ('children', 'has_children')}
+            fields = self._encoded[topic_id] = json.dumps(data, cls=DjangoJSONEncoder)[:-1]
+        return fields
+
+    def hierarchy_json(self, root_id=None, depth=None):
+        """
+        Serialize the nested topic tree
+
+        Args:
+            root_id: Topic to start from; all roots by default
+            depth: Levels of children to include below the start; all by default
+
+        Returns:
+            JSON text of {'topics', 'total_count', 'root_count'}, or None if
+            root_id is unknown
+        """
+        if root_id:
+            if root_id not in self.by_id:
+                return None
+            starts = [self.by_id[root_id]]
+        else:
+            starts = self.roots
+
+        parts = []
+        seen = set()
+
+        def write(topic, remaining):
+            seen.add(topic['id'])
+            # Skipping seen topics keeps parent cycles from recursing forever
+            kids = [kid for kid in self.children.get(topic['id'], ()) if kid['id'] not in seen]
+            fields = self.encoded(topic['id'])  # topics always have an id
+            parts.append(fields + ', ')
+            parts.append(f'"has_children": {"true" if kids else "false"}, "children": [')
+            if remaining != 0:
+                next_remaining = None if remaining is None else remaining - 1
+                for i, kid in enumerate(kids):
+                    if i:
+                        parts.append(', ')
+                    write(kid, next_remaining)
+            parts.append(']}')
+
+        parts.append('{"topics": [')
+        for i, topic in enumerate(starts):
+            if i:
+                parts.append(', ')
+            write(topic, depth)
+        parts.append(f'], "total_count": {len(seen)}, "root_count": {len(starts)}}}')
+        return ''.join(parts)
+
+
+class TopicStore:
+    """
+    TopicIndex over the topics returned by ``loader``, rebuilt whenever
+    ``version()`` changes (the shared content version by default)
+    """
+
+    def __init__(self, loader, version=get_content_version):
+        self.loader = loader
+        self.get_version = version
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def get_index(self):
+        version = self.get_version()
+        index = self._index
+        if index is None or self._version != version:
+            with self._lock:
+                if self._index is None or self._version != version:
+                    topics = self.loader()
+                    index = TopicIndex(topics, version)
+                    # An empty load is usually a failed one; retry next time
+                    if index.by_id:
+                        self._index, self._version = index, version
+                        logger.info(f"Built topic store v{version} with {len(index.by_id)} topics")
+                    return index
+                index = self._index
+        return index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._version = None
+
+    def all(self):
+        return list(self.get_index().by_id.values())
+
+    def get(self, topic_id):
+        return self.get_index().by_id.get(topic_id)
+
+    def children(self, topic_id):
+        return list(self.get_index().children.get(topic_id, ()))
+
+    def parent(self, topic):
+        parent_id = topic.get('parent')
+        return self.get(parent_id) if parent_id else None
+
+    def siblings(self, topic):
+        """Topics with the same parent, excluding topic itself"""
+        parent_id = topic.get('parent')
+        if not parent_id:
+            return []
+        return [t for t in self.children(parent_id) if t['id'] != topic['id']]
+
+    def expand(self, topic_id):
+        """
+        Direct children of a topic for lazy tree expansion, each with
+        has_children and child_count; None if topic_id is unknown
+        """
+        index = self.get_index()
+        if topic_id not in index.by_id:
+            return None
+        results = []
+        for child in index.children.get(topic_id, ()):
+            count = len(index.children.get(child['id'], ()))
+            results.append(dict(child, has_children=count > 0, child_count=count))
+        return results
+
+    def by_level(self, level):
+        return list(self.get_index().by_level.get(level, ()))
+
+    def breadcrumbs(self, topic):
+        """Topics from the root down to topic, ending with topic itself"""
+        index = self.get_index()
+        path = index.paths.get(topic.get('parent'), ())
+        if topic['id'] in path:
+            path = path[:path.index(topic['id'])]
+        return [index.by_id[topic_id] for topic_id in path] + [topic]
+
+    def hierarchy_json(self, root_id=None, depth=None):
+        """
+        Serialized topic tree (see TopicIndex.hierarchy_json), cached in the
+        Django cache per content version, root and depth
+        """
+        index = self.get_index()
+        key = f"{HIERARCHY_CACHE_PREFIX}v{index.version}:{root_id or ''}:{'' if depth is None else depth}"
+        data = cache.get(key)
+        if data is None:
+            data = index.hierarchy_json(root_id, depth)
+            # Failed (unstored) loads are not cached
+            if data is not None and index is self._index:
+                cache.set(key, data, HIERARCHY_CACHE_TIMEOUT)
+        return data
@@ -0,0 +1,388 @@
+"""
+Bulk mirroring of Neo4j topics into the Topic and TopicTag models.
+
+Instead of an update_or_create, a tag delete and one insert per tag for
+every topic, a sync reads the existing rows in one pass, diffs them in
+memory and writes only the differences with bulk_create, bulk_update
+and batched deletes inside a single transaction. Tags are synced as set
+differences, so an unchanged topic costs no writes at all.
+
+Each row also stores a content_hash of its mirrored fields and tags. An
+incremental sync compares only those hashes, so it reads full rows and
+tags and writes only for topics whose hash changed; a full sync compares
+the actual field values and tags, repairing edits made on the Django side.
+Given every topic, both deactivate rows whose topic is gone from Neo4j.
+
+bulk_sync_items does the same for the THOUGHT, QUOTE and PASSAGE mirror
+(ContentItem and ContentItemTag), always diffing by hash. Streaming syncs
+(see thoughts_api.pipeline) call the writers once per page and then
+deactivate_missing() with the ids they saw. Every writer also updates the
+FTS5 search index (thoughts_api.fts_index) for the rows it changed.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from thoughts_api.fts_index import fts_index, search_rowid
+from thoughts_api.models import ContentItem, ContentItemTag
+from .models import Topic, TopicTag
+
+logger = logging.getLogger(__name__)
+
+# Rows per bulk statement and ids per IN (...) lookup; stays below
+# SQLite's bound-variable limit
+BATCH_SIZE = 500
+
+TOPIC_FIELDS = ('title', 'description', 'level', 'parent_id')
+ITEM_FIELDS = (
+    'uid', 'title', 'content', 'level', 'parent_id', 'parent_topic',
+    'author', 'source', 'book', 'chapter', 'verse',
+)
+
+
+@dataclass
+class SyncStats:
+    """What a bulk sync wrote"""
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    tags_added: int = 0
+    tags_removed: int = 0
+    deactivated: int = 0
+    deactivated_ids: tuple = ()
+    changed_ids: tuple = ()
+
+    @property
+    def processed(self):
+        return self.created + self.updated + self.unchanged
+
+    def add(self, other):
+        """Add the counts of another batch's stats to these"""
+        self.created += other.created
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.tags_added += other.tags_added
+        self.tags_removed += other.tags_removed
+        self.deactivated += other.deactivated
+
+
+def _batches(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _tag_set(row):
+    tags = row.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return {str(tag)[:100] for tag in tags if tag}
+
+
+def topic_fields(topic_data):
+    """Model field values and tag set of a Neo4j topic row"""
+    fields = {
+        'title': (topic_data.get('title') or '')[:255],
+        'description': topic_data.get('description') or topic_data.get('en_description') or '',
+        'level': topic_data.get('level') or 0,
+        'parent_id': topic_data.get('parent'),
+    }
+    return fields, _tag_set(topic_data)
+
+
+def item_fields(row):
+    """Model field values and tag set of a Neo4j THOUGHT, QUOTE or PASSAGE row"""
+    fields = {
+        'uid': row.get('uid'),
+        'title': (row.get('title') or '')[:255],
+        'content': row.get('content') or '',
+        'level': row.get('level'),
+        'parent_id': row.get('parent'),
+        'parent_topic': row.get('parent_topic'),
+        'author': row.get('author'),
+        'source': row.get('source'),
+        'book': row.get('book'),
+        'chapter': row.get('chapter'),
+        'verse': row.get('verse'),
+    }
+    return fields, _tag_set(row)
+
+
+def content_hash(fields, tags, names=TOPIC_FIELDS):
+    """Fingerprint of the mirrored fields and tags of a row"""
+    data = [fields[name] for name in names] + [sorted(tags)]
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _unique_slug(base, taken):
+    slug = base[:240] or 'topic'
+    candidate, n = slug, 2
+    while candidate in taken:
+        candidate = f"{slug}-{n}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def _existing_topics(neo4j_ids, full):
+    if full:
+        return {topic.neo4j_id: topic for topic in Topic.objects.order_by()}
+    existing = {}
+    for batch in _batches(neo4j_ids):
+        existing.update(Topic.objects.in_bulk(batch, field_name='neo4j_id'))
+    return existing
+
+
+def _known_hashes(neo4j_ids, full):
+    """neo4j_id -> (pk, content_hash, is_active) without loading whole rows"""
+    columns = ('neo4j_id', 'pk', 'content_hash', 'is_active')
+    if full:
+        return {row[0]: row[1:] for row in Topic.objects.order_by().values_list(*columns)}
+    known = {}
+    for batch in _batches(neo4j_ids):
+        known.update((row[0], row[1:]) for row in Topic.objects.filter(neo4j_id__in=batch).values_list(*columns))
+    return known
+
+
+def _existing_tags(owner_pks, model=TopicTag, owner='topic_id'):
+    """owner pk -> {tag: tag row pk}"""
+    tags = {}
+    for batch in _batches(owner_pks):
+        rows = model.objects.filter(**{f"{owner}__in": batch}).values_list('pk', owner, 'tag')
+        for pk, owner_pk, tag in rows:
+            tags.setdefault(owner_pk, {})[tag] = pk
+    return tags
+
+
+def deactivate_missing(queryset, seen_ids, node_type):
+    """
+    Deactivate the active rows of queryset whose neo4j_id was not seen
+
+    Args:
+        queryset: Topic or ContentItem rows covered by the sync
+        seen_ids: Every neo4j_id the sync received
+        node_type: Label of the rows
+
+    Returns:
+        List of the deactivated neo4j_ids
+    """
+    active = queryset.filter(is_active=True).order_by().values_list('neo4j_id', 'pk')
+    gone = {neo4j_id: pk for neo4j_id, pk in active.iterator() if neo4j_id not in seen_ids}
+    now = timezone.now()
+    for batch in _batches(list(gone)):
+        queryset.filter(neo4j_id__in=batch).update(is_active=False, last_synced=now)
+    fts_index.remove(search_rowid(node_type, pk) for pk in gone.values())
+    return list(gone)
+
+
+def _search_row(node_type, pk, neo4j_id, fields, tags, content_field):
+    return {
+        'pk': pk,
+        'type': node_type,
+        'id': neo4j_id,
+        'level': fields['level'],
+        'parent': fields['parent_id'],
+        'title': fields['title'],
+        'content': fields[content_field],
+        'tags': tags,
+    }
+
+
+def bulk_sync_topics(rows, full=False, incremental=False):
+    """
+    Mirror Neo4j topic rows into Topic and TopicTag
+
+    Args:
+        rows: Topic dicts as returned by the Neo4j topic queries
+        full: Whether rows are every topic; existing rows are then read in
+            one query and rows missing from Neo4j are deactivated
+        incremental: Detect changes by content_hash alone instead of
+            comparing field values and tags
+
+    Returns:
+        SyncStats
+    """
+    incoming = {}
+    for row in rows:
+        if row.get('id'):
+            fields, tags = topic_fields(row)
+            incoming[row['id']] = (fields, tags, content_hash(fields, tags))
+
+    stats = SyncStats()
+    now = timezone.now()
+    with transaction.atomic():
+        if incremental:
+            known = _known_hashes(list(incoming), full)
+            candidates = [
+                n for n, (_, _, digest) in incoming.items()
+                if n not in known or known[n][1] != digest or not known[n][2]
+            ]
+            existing = {}
+            for batch in _batches([known[n][0] for n in candidates if n in known]):
+                existing.update((topic.neo4j_id, topic) for topic in Topic.objects.filter(pk__in=batch))
+            stats.unchanged = len(incoming) - len(candidates)
+            present = {n: (pk, active) for n, (pk, _, active) in known.items()}
+        else:
+            existing = _existing_topics(list(incoming), full)
+            candidates = list(incoming)
+            present = {n: (topic.pk, topic.is_active) for n, topic in existing.items()}
+
+        to_create = []
+        to_update = []
+        unchanged_ids = []
+        taken_slugs = None
+        for neo4j_id in candidates:
+            fields, _, digest = incoming[neo4j_id]
+            topic = existing.get(neo4j_id)
+            if topic is None:
+                if taken_slugs is None:
+                    taken_slugs = set(Topic.objects.values_list('slug', flat=True))
+                slug = _unique_slug(slugify(fields['title']) or slugify(neo4j_id), taken_slugs)
+                to_create.append(Topic(neo4j_id=neo4j_id, slug=slug, last_synced=now,
+                                       content_hash=digest, **fields))
+            elif (topic.content_hash != digest or not topic.is_active
+                  or any(getattr(topic, name) != value for name, value in fields.items())):
+                for name, value in fields.items():
+                    setattr(topic, name, value)
+                topic.content_hash = digest
+                topic.is_active = True
+                topic.last_synced = now
+                to_update.append(topic)
+            else:
+                unchanged_ids.append(neo4j_id)
+
+        Topic.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        Topic.objects.bulk_update(
+            to_update, TOPIC_FIELDS + ('content_hash', 'is_active', 'last_synced'), batch_size=BATCH_SIZE
+        )
+        stats.created, stats.updated = len(to_create), len(to_update)
+        stats.unchanged += len(unchanged_ids)
+        for batch in _batches(unchanged_ids):
+            Topic.objects.filter(neo4j_id__in=batch).update(last_synced=now)
+
+        # bulk_create does not return primary keys on every backend
+        pks = {topic.neo4j_id: topic.pk for topic in existing.values()}
+        for batch in _batches([topic.neo4j_id for topic in to_create]):
+            pks.update(Topic.objects.filter(neo4j_id__in=batch).values_list('neo4j_id', 'pk'))
+
+        current_tags = _existing_tags([pks[n] for n in candidates if n in existing])
+        new_tags = []
+        stale_tags = []
+        for neo4j_id in candidates:
+            tags = incoming[neo4j_id][1]
+            topic_pk = pks[neo4j_id]
+            current = current_tags.get(topic_pk, {})
+            new_tags.extend(TopicTag(topic_id=topic_pk, tag=tag) for tag in tags - current.keys())
+            stale_tags.extend(pk for tag, pk in current.items() if tag not in tags)
+
+        TopicTag.objects.bulk_create(new_tags, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for batch in _batches(stale_tags):
+            TopicTag.objects.filter(pk__in=batch).delete()
+        stats.tags_added, stats.tags_removed = len(new_tags), len(stale_tags)
+
+        if full:
+            gone = [n for n, (_, active) in present.items() if active and n not in incoming]
+            for batch in _batches(gone):
+                Topic.objects.filter(neo4j_id__in=batch).update(is_active=False, last_synced=now)
+            fts_index.remove(search_rowid('TOPIC', present[neo4j_id][0]) for neo4j_id in gone)
+            stats.deactivated, stats.deactivated_ids = len(gone), tuple(gone)
+
+        stats.changed_ids = tuple(topic.neo4j_id for topic in to_create + to_update)
+        fts_index.index(
+            _search_row('TOPIC', pks[n], n, incoming[n][0], incoming[n][1], 'description')
+            for n in stats.changed_ids
+        )
+
+    logger.info(
+        f"Bulk topic sync: {stats.created} created, {stats.updated} updated, "
+        f"{stats.unchanged} unchanged, {stats.deactivated} deactivated"
+    )
+    return stats
+
+
+def bulk_sync_items(node_type, rows):
+    """
+    Mirror Neo4j THOUGHT, QUOTE or PASSAGE rows into ContentItem and ContentItemTag
+
+    Only rows whose content_hash changed are written. Items missing from
+    rows are left alone; see deactivate_missing().
+
+    Args:
+        node_type: Label of every row
+        rows: Item dicts as returned by Neo4jService.get_mirror_rows
+
+    Returns:
+        SyncStats
+    """
+    incoming = {}
+    for row in rows:
+        if row.get('id'):
+            fields, tags = item_fields(row)
+            incoming[row['id']] = (fields, tags, content_hash(fields, tags, ITEM_FIELDS))
+
+    stats = SyncStats()
+    now = timezone.now()
+    with transaction.atomic():
+        items = ContentItem.objects.filter(node_type=node_type).order_by()
+        known = {}
+        for batch in _batches(list(incoming)):
+            known.update(
+                (row[0], row[1:])
+                for row in items.filter(neo4j_id__in=batch).values_list('neo4j_id', 'pk', 'content_hash', 'is_active')
+            )
+
+        to_create = []
+        to_update = []
+        for neo4j_id, (fields, tags, digest) in incoming.items():
+            item = ContentItem(node_type=node_type, neo4j_id=neo4j_id, tags=sorted(tags),
+                               content_hash=digest, is_active=True, last_synced=now, **fields)
+            if neo4j_id not in known:
+                to_create.append(item)
+            elif known[neo4j_id][1] != digest or not known[neo4j_id][2]:
+                item.pk = known[neo4j_id][0]
+                to_update.append(item)
+
+        ContentItem.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        ContentItem.objects.bulk_update(
+            to_update, ITEM_FIELDS + ('tags', 'content_hash', 'is_active', 'last_synced'), batch_size=BATCH_SIZE
+        )
+        stats.created, stats.updated = len(to_create), len(to_update)
+        stats.unchanged = len(incoming) - stats.created - stats.updated
+
+        pks = {item.neo4j_id: item.pk for item in to_update}
+        for batch in _batches([item.neo4j_id for item in to_create]):
+            pks.update(items.filter(neo4j_id__in=batch).values_list('neo4j_id', 'pk'))
+
+        current_tags = _existing_tags(
+            [item.pk for item in to_update], model=ContentItemTag, owner='item_id'
+        )
+        new_tags = []
+        stale_tags = []
+        for item in to_create + to_update:
+            tags = incoming[item.neo4j_id][1]
+            item_pk = pks[item.neo4j_id]
+            current = current_tags.get(item_pk, {})
+            new_tags.extend(ContentItemTag(item_id=item_pk, tag=tag) for tag in tags - current.keys())
+            stale_tags.extend(pk for tag, pk in current.items() if tag not in tags)
+
+        ContentItemTag.objects.bulk_create(new_tags, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for batch in _batches(stale_tags):
+            ContentItemTag.objects.filter(pk__in=batch).delete()
+        stats.tags_added, stats.tags_removed = len(new_tags), len(stale_tags)
+        stats.changed_ids = tuple(item.neo4j_id for item in to_create + to_update)
+        fts_index.index(
+            _search_row(node_type, pks[n], n, incoming[n][0], incoming[n][1], 'content')
+            for n in stats.changed_ids
+        )
+
+    logger.debug(
+        f"Bulk {node_type} sync: {stats.created} created, {stats.updated} updated, "
+        f"{stats.unchanged} unchanged"
+    )
+    return stats
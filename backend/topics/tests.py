@@ -1,3 +1,441 @@
+from datetime import timedelta
+import json
+import threading
+import time
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import Mock, patch
+
+from thoughts_api.models import ContentItem, ContentItemTag
+from thoughts_api.neo4j_service import Neo4jService
+from thoughts_api.snapshot import bump_content_version
+
+from .cache import CoalescingCache
+from .jobs import claim_next_job, enqueue_sync, request_sync, requeue_stale_jobs, run_job, run_worker
+from .models import Topic, TopicSyncLog, TopicTag
+from .services import TopicsService
+from .store import TopicStore
+from .sync import bulk_sync_items, bulk_sync_topics
+
+
+def _topic(topic_id, parent=None, level=0):
+    return {'id': topic_id, 'title': topic_id.title(), 'parent': parent, 'level': level}
+
+
+TOPICS = [
+    _topic('root'),
+    _topic('faith', 'root', 1),
+    _topic('hope', 'root', 1),
+    _topic('grace', 'faith', 2),
+    _topic('orphan', 'missing', 3),
+]
+
+
+class TestTopicStore(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.loader = Mock(side_effect=lambda: [dict(t) for t in TOPICS])
+        self.store = TopicStore(self.loader)
+
+    def test_relations_and_breadcrumbs(self):
+        grace = self.store.get('grace')
+
+        self.assertEqual([t['id'] for t in self.store.children('root')], ['faith', 'hope'])
+        self.assertEqual([t['id'] for t in self.store.siblings(self.store.get('faith'))], ['hope'])
+        self.assertEqual(self.store.parent(grace)['id'], 'faith')
+        self.assertEqual([t['id'] for t in self.store.breadcrumbs(grace)], ['root', 'faith', 'grace'])
+        self.assertEqual([t['id'] for t in self.store.by_level(1)], ['faith', 'hope'])
+
+    def test_hierarchy_depth_and_unknown_parents(self):
+        full = json.loads(self.store.hierarchy_json())
+        subtree = json.loads(self.store.hierarchy_json('root', depth=1))
+
+        self.assertEqual([t['id'] for t in full['topics']], ['root', 'orphan'])
+        self.assertEqual(full['total_count'], 5)
+        self.assertEqual(full['topics'][0]['children'][0]['children'][0]['title'], 'Grace')
+        faith = subtree['topics'][0]['children'][0]
+        self.assertEqual((faith['id'], faith['has_children'], faith['children']), ('faith', True, []))
+        self.assertEqual(subtree['total_count'], 3)
+        self.assertIsNone(self.store.hierarchy_json('missing'))
+
+    def test_hierarchy_is_cached_per_version(self):
+        first = self.store.hierarchy_json(depth=2)
+        self.store.get_index()._encoded.clear()
+        self.store.get_index().by_id['root']['title'] = 'Changed'
+
+        self.assertEqual(self.store.hierarchy_json(depth=2), first)
+
+    def test_expand_lists_children_with_counts(self):
+        children = self.store.expand('root')
+
+        self.assertEqual([(c['id'], c['child_count']) for c in children], [('faith', 1), ('hope', 0)])
+        self.assertIsNone(self.store.expand('missing'))
+
+    def test_parent_cycles_end_paths(self):
+        store = TopicStore(lambda: [_topic('a', 'b'), _topic('b', 'a')])
+
+        self.assertEqual([t['id'] for t in store.breadcrumbs(store.get('a'))], ['b', 'a'])
+        self.assertEqual(json.loads(store.hierarchy_json('a'))['total_count'], 2)
+
+    @patch('topics.views.topics_service')
+    def test_detail_page_shows_relations(self, mock_service):
+        mock_service.store = self.store
+
+        response = self.client.get('/topics/topic/faith/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['id'] for t in response.context['children']], ['grace'])
+        self.assertEqual([t['id'] for t in response.context['siblings']], ['hope'])
+        self.assertEqual([t['id'] for t in response.context['breadcrumbs']], ['root', 'faith'])
+        self.assertContains(response, 'href="/topics/topic/grace/"')
+        self.assertEqual(self.client.get('/topics/topic/missing/').status_code, 404)
+
+    def test_rebuilt_per_content_version(self):
+        self.store.get('root')
+        self.store.get('hope')
+        bump_content_version()
+        self.store.get('root')
+
+        self.assertEqual(self.loader.call_count, 2)
+
+
+class TestTopicHierarchyAPI(TestCase):
+
+    @patch('topics.views.topics_service')
+    def test_hierarchy_params(self, mock_service):
+        mock_service.get_topic_hierarchy_json.return_value = '{"topics": []}'
+
+        response = self.client.get('/topics/api/hierarchy/data/', {'root': 'root', 'depth': 2})
+
+        self.assertEqual(response.json(), {'topics': []})
+        mock_service.get_topic_hierarchy_json.assert_called_once_with('root', 2)
+        self.assertEqual(self.client.get('/topics/api/hierarchy/data/', {'depth': -1}).status_code, 400)
+
+    @patch('topics.views.topics_service')
+    def test_children_endpoint(self, mock_service):
+        mock_service.get_topic_children.return_value = [{'id': 'faith', 'child_count': 1}]
+
+        response = self.client.get('/topics/api/root/children/')
+
+        self.assertEqual(response.json()['count'], 1)
+        mock_service.get_topic_children.return_value = None
+        self.assertEqual(self.client.get('/topics/api/missing/children/').status_code, 404)
+
+
+class TestTopicsCacheVersion(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.service = TopicsService()
+        self.service.neo4j = Mock()
+        self.service.neo4j.get_topics_by_id.return_value = [{'id': 'faith', 'title': 'Faith'}]
+
+    def test_clear_cache_invalidates_every_key(self):
+        self.service.get_topic_by_id('faith')
+        self.service.get_topic_by_id('faith')
+        self.assertEqual(self.service.neo4j.get_topics_by_id.call_count, 1)
+
+        self.service.clear_cache()
+        self.service.get_topic_by_id('faith')
+
+        self.assertEqual(self.service.neo4j.get_topics_by_id.call_count, 2)
+        self.assertEqual(self.service.get_cache_stats()['cache_version'], 2)
+
+    def test_clear_cache_rebuilds_store(self):
+        self.service.store.loader = Mock(side_effect=lambda: [dict(t) for t in TOPICS])
+        self.service.store.get('root')
+        self.service.clear_cache()
+        self.service.store.get('root')
+
+        self.assertEqual(self.service.store.loader.call_count, 2)
+
+
+class TestCoalescingCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cache = CoalescingCache()
+        self.cache._spawn = lambda target: target()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get_or_set('k', compute, 60)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 8)
+
+    def test_stale_value_served_while_refreshing(self):
+        cache.set('k', ('old', time.time() - 1), 60)
+
+        self.assertEqual(self.cache.get_or_set('k', lambda: 'new', 60), 'old')
+        self.assertEqual(self.cache.get_or_set('k', lambda: 'newer', 60), 'new')
+
+    def test_waits_for_other_process_and_skips_none(self):
+        cache.add('k:lock', 1)
+        threading.Timer(0.05, lambda: self.cache.set('k', 'theirs', 60)).start()
+
+        self.assertEqual(self.cache.get_or_set('k', lambda: 'mine', 60), 'theirs')
+        self.assertIsNone(self.cache.get_or_set('missing', lambda: None, 60))
+        self.assertIsNone(cache.get('missing'))
+
+
+class TestSyncJobQueue(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_enqueue_reuses_waiting_job(self):
+        first = enqueue_sync('full', force=True)
+
+        self.assertEqual(enqueue_sync('full', force=True).pk, first.pk)
+        self.assertNotEqual(enqueue_sync('full', force=False).pk, first.pk)
+        self.assertEqual(first.status, TopicSyncLog.STATUS_QUEUED)
+
+    def test_claim_is_exclusive_and_stale_jobs_requeue(self):
+        job = enqueue_sync('full')
+
+        self.assertEqual(claim_next_job('w1').pk, job.pk)
+        self.assertIsNone(claim_next_job('w2'))
+        self.assertEqual(requeue_stale_jobs(timeout=-1), 1)
+        self.assertEqual(claim_next_job('w2').worker, 'w2')
+
+    @patch('topics.services.content_snapshot')
+    @patch('topics.services.topics_service.neo4j')
+    def test_worker_runs_single_sync_job(self, mock_neo4j, mock_snapshot):
+        # A topics_query row, as returned by Neo4jService.get_topics_by_id
+        mock_neo4j.get_topics_by_id.return_value = [{
+            'id': 'faith', 'title': 'Faith', 'description': 'notes', 'level': 1, 'parent': 'root',
+            'thought_count': 2, 'tags': ['hope'], 'en_description': 'Trust in God',
+        }]
+        job = enqueue_sync('single', topic_ids=['faith'])
+
+        self.assertEqual(run_worker(once=True, worker='test'), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.records_processed, job.worker), (TopicSyncLog.STATUS_SUCCEEDED, 1, 'test'))
+        topic = Topic.objects.get(neo4j_id='faith')
+        self.assertEqual((topic.title, topic.parent_id), ('Faith', 'root'))
+        mock_neo4j.get_topics_by_id.assert_called_once_with(['faith'])
+        upserts = mock_snapshot.apply_changes.call_args.kwargs['upserts']
+        self.assertEqual([(doc['id'], doc['content']) for doc in upserts], [('faith', 'Trust in God')])
+
+    @patch('topics.services.content_snapshot')
+    @patch('topics.services.topics_service.neo4j')
+    def test_single_sync_reports_missing_topics(self, mock_neo4j, mock_snapshot):
+        mock_neo4j.get_topics_by_id.return_value = []
+        job = enqueue_sync('single', topic_ids=['gone'])
+
+        run_worker(once=True, worker='test')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, TopicSyncLog.STATUS_FAILED)
+        self.assertIn('gone: not found', job.error_message)
+        mock_snapshot.apply_changes.assert_not_called()
+
+    @patch('topics.jobs.threading.Thread')
+    def test_read_path_requests_are_throttled(self, mock_thread):
+        self.assertTrue(request_sync('incremental'))
+        self.assertFalse(request_sync('incremental'))
+        self.assertEqual(mock_thread.call_count, 1)
+
+    def test_sync_endpoint_queues_job(self):
+        response = self.client.post('/topics/api/sync/', {'force': True}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+        self.assertEqual(TopicSyncLog.objects.get(pk=job_id).params, {'force': True})
+        self.assertEqual(self.client.get(f'/topics/api/sync/{job_id}/').json()['status'], 'queued')
+
+
+class TestBulkSync(TestCase):
+
+    ROWS = [
+        {'id': 'faith', 'title': 'Faith', 'level': 1, 'parent': 'root', 'tags': ['trust', 'hope']},
+        {'id': 'hope', 'title': 'Hope', 'level': 1, 'parent': 'root', 'tags': []},
+        {'id': 'faith-2', 'title': 'Faith', 'level': 2, 'parent': 'faith', 'tags': 'trust'},
+    ]
+
+    def _tags(self, neo4j_id):
+        return set(TopicTag.objects.filter(topic__neo4j_id=neo4j_id).values_list('tag', flat=True))
+
+    def test_creates_rows_with_unique_slugs(self):
+        stats = bulk_sync_topics(self.ROWS, full=True)
+
+        self.assertEqual((stats.created, stats.tags_added), (3, 3))
+        self.assertEqual(sorted(Topic.objects.values_list('slug', flat=True)), ['faith', 'faith-2', 'hope'])
+        self.assertEqual(self._tags('faith-2'), {'trust'})
+
+    def test_resync_writes_only_differences(self):
+        bulk_sync_topics(self.ROWS, full=True)
+        rows = [dict(row) for row in self.ROWS]
+        rows[0].update(title='Faith!', tags=['trust', 'love'])
+
+        stats = bulk_sync_topics(rows, full=True)
+
+        self.assertEqual((stats.created, stats.updated, stats.unchanged), (0, 1, 2))
+        self.assertEqual((stats.tags_added, stats.tags_removed), (1, 1))
+        self.assertEqual(self._tags('faith'), {'trust', 'love'})
+        self.assertEqual(Topic.objects.get(neo4j_id='faith').title, 'Faith!')
+
+    def test_unchanged_sync_is_a_few_queries(self):
+        bulk_sync_topics(self.ROWS, full=True)
+
+        # savepoint, topics, last_synced, tags, release
+        with self.assertNumQueries(5):
+            stats = bulk_sync_topics(self.ROWS, full=True)
+        self.assertEqual(stats.unchanged, 3)
+
+    def test_incremental_sync_touches_only_changed_topics(self):
+        bulk_sync_topics(self.ROWS, full=True)
+        rows = [dict(row) for row in self.ROWS[:2]]
+        rows[1]['tags'] = ['joy']
+
+        # savepoint, hashes, changed row, its update, its tags, tag insert,
+        # deactivate, search index removal, delete and insert, release
+        with self.assertNumQueries(11):
+            stats = bulk_sync_topics(rows, full=True, incremental=True)
+
+        self.assertEqual((stats.updated, stats.unchanged, stats.deactivated), (1, 1, 1))
+        self.assertEqual(stats.changed_ids, ('hope',))
+        self.assertFalse(Topic.objects.get(neo4j_id='faith-2').is_active)
+        self.assertEqual(self._tags('hope'), {'joy'})
+
+        stats = bulk_sync_topics(self.ROWS, full=True, incremental=True)
+        self.assertEqual(set(stats.changed_ids), {'hope', 'faith-2'})
+        self.assertTrue(Topic.objects.get(neo4j_id='faith-2').is_active)
+
+    @patch('topics.services.content_snapshot')
+    @patch('topics.services.topics_service.neo4j')
+    def test_incremental_job_is_logged(self, mock_neo4j, mock_snapshot):
+        mock_neo4j.get_all_topics.return_value = self.ROWS
+        bulk_sync_topics(self.ROWS[:2], full=True)
+
+        run_job(enqueue_sync('incremental'))
+
+        log = TopicSyncLog.objects.get(sync_type='incremental')
+        self.assertEqual((log.status, log.records_created, log.records_updated), ('succeeded', 1, 0))
+        upserts = mock_snapshot.apply_changes.call_args.kwargs['upserts']
+        self.assertEqual([doc['id'] for doc in upserts], ['faith-2'])
+
+    def test_sync_log_records_throughput(self):
+        log = TopicSyncLog.objects.create(sync_type='full', started_at=timezone.now() - timedelta(seconds=2))
+        log.mark_completed(True, 100, stats=bulk_sync_topics(self.ROWS))
+
+        self.assertEqual((log.records_created, log.tags_written), (3, 3))
+        self.assertAlmostEqual(log.records_per_second, 50, delta=5)
+
+
+class TestStreamingSync(TestCase):
+
+    ITEMS = [
+        {'id': 'q1', 'title': 'Quote 1', 'content': 'Be still', 'level': 2, 'parent': 'faith',
+         'author': 'Anon', 'tags': ['peace']},
+        {'id': 'q2', 'title': 'Quote 2', 'content': 'Rejoice', 'level': 2, 'parent': 'hope', 'tags': []},
+    ]
+
+    def _pages(self, rows):
+        def fetch(label, limit, after=None):
+            start = 0 if after is None else [row['id'] for row in rows].index(after[0]) + 1
+            return [dict(row) for row in rows[start:start + limit]]
+        return fetch
+
+    def test_item_sync_writes_only_changed_items(self):
+        bulk_sync_items('QUOTE', self.ITEMS)
+        rows = [dict(row) for row in self.ITEMS]
+        rows[1].update(content='Rejoice always', tags=['joy'])
+
+        stats = bulk_sync_items('QUOTE', rows)
+
+        self.assertEqual((stats.updated, stats.unchanged, stats.tags_added), (1, 1, 1))
+        item = ContentItem.objects.get(node_type='QUOTE', neo4j_id='q2')
+        self.assertEqual((item.content, item.tags), ('Rejoice always', ['joy']))
+        self.assertEqual(ContentItemTag.objects.get(item=item).tag, 'joy')
+
+    @patch('topics.services.content_snapshot')
+    @patch('topics.services.topics_service.neo4j')
+    @patch('topics.services.TopicsService.SYNC_PAGE_SIZE', 1)
+    def test_content_job_streams_pages_and_deactivates_missing(self, mock_neo4j, mock_snapshot):
+        mock_neo4j.MIRROR_LABELS = ('QUOTE',)
+        mock_neo4j.mirror_keyset = Neo4jService.mirror_keyset
+        mock_neo4j.get_mirror_rows.side_effect = self._pages(self.ITEMS)
+        ContentItem.objects.create(node_type='QUOTE', neo4j_id='gone')
+
+        run_job(enqueue_sync('content'))
+
+        log = TopicSyncLog.objects.get(sync_type='content')
+        self.assertEqual((log.status, log.records_created, log.records_deleted), ('succeeded', 2, 1))
+        self.assertEqual(log.stage_stats['QUOTE']['write']['batches'], 2)
+        self.assertFalse(ContentItem.objects.get(neo4j_id='gone').is_active)
+        changes = mock_snapshot.apply_changes.call_args.kwargs
+        self.assertEqual([doc['id'] for doc in changes['upserts']], ['q1', 'q2'])
+        self.assertEqual(changes['removed_keys'], ['QUOTE:gone'])
+
+
+class TestNeo4jOutageFailover(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        bulk_sync_topics([
+            {'id': 'faith', 'title': 'Faith', 'level': 0, 'tags': ['trust', 'hope']},
+            {'id': 'grace', 'title': 'Grace', 'level': 1, 'parent': 'faith', 'tags': ['gift']},
+        ])
+        self.service = TopicsService()
+        self.service.neo4j = Mock()
+        self.service.breaker = Mock(is_open=True, state='open')
+
+    def test_open_breaker_serves_topics_from_mirror(self):
+        # topics, then every tag in one prefetch query
+        with self.assertNumQueries(2):
+            topics = self.service.get_all_topics()
+
+        self.assertEqual({t['id']: t['tags'] for t in topics}, {'faith': ['hope', 'trust'], 'grace': ['gift']})
+        self.assertEqual(self.service.get_topic_by_id('grace')['parent'], 'faith')
+        self.assertEqual([t['id'] for t in self.service.search_topics('gift')], ['grace'])
+        self.assertEqual([c['id'] for c in self.service.get_topic_children('faith')], ['grace'])
+        self.assertFalse(self.service.neo4j.method_calls)
+
+    def test_topic_detail_has_one_shape_either_way(self):
+        mirrored = self.service.get_topic_by_id('grace')
+
+        self.service.breaker.is_open = False
+        self.service.neo4j.get_topics_by_id.return_value = [{
+            'id': 'grace', 'title': 'Grace', 'description': None, 'level': 1, 'parent': 'faith',
+            'thought_count': 3, 'tags': ['gift'], 'en_description': None,
+        }]
+        live = self.service.get_topic_by_id('grace', use_cache=False)
+
+        self.assertEqual(live, mirrored)
+        with patch('topics.views.topics_service', self.service):
+            self.assertEqual(self.client.get('/topics/api/grace/').json(), live)
+
+    @patch('thoughts_api.snapshot.content_snapshot.get_items')
+    def test_stats_count_tags_without_the_snapshot(self, mock_get_items):
+        mock_get_items.side_effect = RuntimeError('Neo4j circuit is open')
+
+        with patch('topics.views.topics_service', self.service):
+            response = self.client.get('/topics/api/stats/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['top_tags'], [['gift', 1], ['hope', 1], ['trust', 1]])
+        mock_get_items.assert_not_called()
+
+    def test_store_rebuilds_when_breaker_closes(self):
+        mirror_version = self.service.get_store_version()
+        self.service.breaker.is_open = False
 
-# Create your tests here.
+        self.assertEqual(mirror_version, f"{self.service.get_store_version()}.mirror")
@@ -25,10 +25,13 @@ web_patterns = [
 # API views (JSON)
 api_patterns = [
     path('', views.TopicsListAPIView.as_view(), name='api-list'),
-    path('<str:topic_id>/', views.TopicDetailAPIView.as_view(), name='api-detail'),
     path('hierarchy/data/', views.TopicsHierarchyAPIView.as_view(), name='api-hierarchy'),
     path('sync/', views.TopicsSyncAPIView.as_view(), name='api-sync'),
+    path('sync/<int:job_id>/', views.TopicSyncJobAPIView.as_view(), name='api-sync-job'),
     path('stats/', views.topics_stats_view, name='api-stats'),
+    # Catch-all topic id routes last so they don't shadow the fixed ones
+    path('<str:topic_id>/', views.TopicDetailAPIView.as_view(), name='api-detail'),
+    path('<str:topic_id>/children/', views.TopicChildrenAPIView.as_view(), name='api-children'),
 ]
 
 # Main URL patterns
@@ -4,7 +4,7 @@ Optimized for M1 MacBook with async support and caching
 """
 
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, Http404
+from django.http import HttpResponse, JsonResponse, Http404
 from django.views.generic import ListView, DetailView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
@@ -19,6 +19,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
 from .models import Topic, TopicTag, TopicSyncLog
+from .jobs import enqueue_sync
 from .services import topics_service
 from .serializers import TopicSerializer, TopicHierarchySerializer
 import logging
@@ -26,6 +27,17 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _get_depth(request):
+    """Optional non-negative depth query parameter; raises ValueError"""
+    depth = request.GET.get('depth')
+    if depth in (None, ''):
+        return None
+    depth = int(depth)
+    if depth < 0:
+        raise ValueError("depth must be zero or more")
+    return depth
+
+
 # Web Views (HTML Templates)
 
 class TopicsOverviewView(TemplateView):
@@ -111,7 +123,8 @@ class TopicDetailView(DetailView):
         if not topic_id:
             raise Http404("Topic not found")
         
-        topic = topics_service.get_topic_by_id(topic_id)
+        # The store row carries the id and parent the relations below need
+        topic = topics_service.store.get(topic_id)
         if not topic:
             raise Http404("Topic not found")
         
@@ -121,28 +134,14 @@ class TopicDetailView(DetailView):
         context = super().get_context_data(**kwargs)
         topic = self.object
         
-        # Get related topics (children and siblings)
+        # Related topics come from the indexed topic store
         try:
-            # Get children
-            all_topics = topics_service.get_all_topics()
-            children = [t for t in all_topics if t.get('parent') == topic['id']]
-            
-            # Get siblings (same parent)
-            parent_id = topic.get('parent')
-            siblings = []
-            if parent_id:
-                siblings = [t for t in all_topics if t.get('parent') == parent_id and t['id'] != topic['id']]
-            
-            # Get parent
-            parent = None
-            if parent_id:
-                parent = next((t for t in all_topics if t['id'] == parent_id), None)
-            
+            store = topics_service.store
             context.update({
-                'children': children,
-                'siblings': siblings,
-                'parent': parent,
-                'breadcrumbs': self._get_breadcrumbs(topic, all_topics),
+                'children': store.children(topic['id']),
+                'siblings': store.siblings(topic),
+                'parent': store.parent(topic),
+                'breadcrumbs': store.breadcrumbs(topic),
             })
             
         except Exception as e:
@@ -155,21 +154,6 @@ class TopicDetailView(DetailView):
             })
         
         return context
-    
-    def _get_breadcrumbs(self, topic, all_topics):
-        """Generate breadcrumb navigation"""
-        breadcrumbs = []
-        current = topic
-        
-        while current:
-            breadcrumbs.insert(0, current)
-            parent_id = current.get('parent')
-            if parent_id:
-                current = next((t for t in all_topics if t['id'] == parent_id), None)
-            else:
-                break
-        
-        return breadcrumbs
 
 
 class TopicsHierarchyView(TemplateView):
@@ -183,7 +167,8 @@ class TopicsHierarchyView(TemplateView):
         
         try:
             root_id = self.request.GET.get('root')
-            hierarchy = topics_service.get_topic_hierarchy(root_id)
+            depth = _get_depth(self.request)
+            hierarchy = topics_service.get_topic_hierarchy(root_id, depth)
             context['hierarchy'] = hierarchy
             
         except Exception as e:
@@ -273,15 +258,23 @@ class TopicDetailAPIView(APIView):
 class TopicsHierarchyAPIView(APIView):
     """
     API endpoint for topic hierarchy
+    
+    Query parameters: root (subtree to return) and depth (levels of
+    children below it). The JSON is prebuilt per data version, so this is
+    a cache lookup.
     """
     permission_classes = [AllowAny]
     
     def get(self, request):
         try:
             root_id = request.GET.get('root')
-            hierarchy = topics_service.get_topic_hierarchy(root_id)
-            
-            return Response(hierarchy)
+            depth = _get_depth(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            data = topics_service.get_topic_hierarchy_json(root_id, depth)
+            return HttpResponse(data or '{}', content_type='application/json')
             
         except Exception as e:
             logger.error(f"Error in TopicsHierarchyAPIView: {e}")
@@ -291,22 +284,62 @@ class TopicsHierarchyAPIView(APIView):
             )
 
 
+class TopicChildrenAPIView(APIView):
+    """
+    API endpoint for the direct children of a topic, for expanding the
+    hierarchy one level at a time
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, topic_id):
+        try:
+            children = topics_service.get_topic_children(topic_id)
+            if children is None:
+                return Response(
+                    {'error': 'Topic not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            return Response({
+                'topic': topic_id,
+                'results': children,
+                'count': len(children),
+            })
+            
+        except Exception as e:
+            logger.error(f"Error in TopicChildrenAPIView: {e}")
+            return Response(
+                {'error': 'Failed to fetch children'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class TopicsSyncAPIView(APIView):
     """
     API endpoint for syncing topics from Neo4j
+    
+    Queues a sync job for the topics_worker processes and returns at once;
+    poll the job URL for its status. Pass incremental=true to sync only
+    the topics whose content changed, or content=true to mirror thoughts,
+    quotes and passages instead of topics.
     """
     permission_classes = [AllowAny]  # Consider adding proper permissions
     
     def post(self, request):
         try:
-            force = request.data.get('force', False)
-            success, message, count = topics_service.sync_topics_from_neo4j(force=force)
+            if request.data.get('content', False):
+                job = enqueue_sync('content')
+            elif request.data.get('incremental', False):
+                job = enqueue_sync('incremental')
+            else:
+                force = bool(request.data.get('force', False))
+                job = enqueue_sync('full', force=force)
             
             return Response({
-                'success': success,
-                'message': message,
-                'records_processed': count,
-            }, status=status.HTTP_200_OK if success else status.HTTP_400_BAD_REQUEST)
+                'success': True,
+                'message': f"Sync job {job.pk} queued",
+                **_job_data(job),
+            }, status=status.HTTP_202_ACCEPTED)
             
         except Exception as e:
             logger.error(f"Error in TopicsSyncAPIView: {e}")
@@ -316,6 +349,33 @@ class TopicsSyncAPIView(APIView):
             )
 
 
+class TopicSyncJobAPIView(APIView):
+    """
+    API endpoint for the status of a queued sync job
+    """
+    permission_classes = [AllowAny]
+    
+    def get(self, request, job_id):
+        job = TopicSyncLog.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_job_data(job))
+
+
+def _job_data(job):
+    return {
+        'job_id': job.pk,
+        'sync_type': job.sync_type,
+        'status': job.status,
+        'queued_at': job.queued_at,
+        'started_at': job.started_at,
+        'completed_at': job.completed_at,
+        'records_processed': job.records_processed,
+        'stage_stats': job.stage_stats,
+        'error_message': job.error_message,
+    }
+
+
 # Utility views
 
 @api_view(['GET'])
@@ -336,8 +396,9 @@ def topics_stats_view(request):
             level = topic.get('level', 0)
             level_counts[level] = level_counts.get(level, 0) + 1
             
-            tags = topic.get('tags', [])
-            for tag in tags:
+            # Counted from the topics already loaded, which also come from
+            # the mirror while Neo4j is down
+            for tag in topic.get('tags') or []:
                 tag_counts[tag] = tag_counts.get(tag, 0) + 1
         
         # Get sync logs
@@ -359,7 +420,7 @@ def topics_stats_view(request):
         return Response({
             'total_topics': total_count,
             'level_distribution': level_counts,
-            'top_tags': sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10],
+            'top_tags': sorted(tag_counts.items(), key=lambda x: (-x[1], x[0].lower()))[:10],
             'recent_syncs': sync_history,
             'cache_stats': cache_stats,
         })
@@ -1,5 +1,6 @@
 import React, { useEffect, useRef, useState } from 'react';
 import * as d3 from 'd3';
+import { decodeBinaryGraph } from './graphFormat';
 
 const GraphView = ({ api }) => {
   const svgRef = useRef();
@@ -13,13 +14,13 @@ const GraphView = ({ api }) => {
     const fetchGraphData = async () => {
       try {
         setLoading(true);
-        const response = await fetch('http://localhost:8000/graph/api/data/');
+        const response = await fetch('http://localhost:8000/graph/api/data/?format=binary');
         
         if (!response.ok) {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const data = await response.json();
+        const data = decodeBinaryGraph(await response.arrayBuffer());
         console.log('Graph data received:', data);
         
         if (!data.nodes || !data.links) {
@@ -59,12 +60,22 @@ const GraphView = ({ api }) => {
       .domain(['Topic', 'Thought', 'Quote', 'Passage'])
       .range(['#8B5CF6', '#10B981', '#F59E0B', '#3B82F6']);
 
+    // Server-computed positions are centred on the origin; start from them
+    // and only run a short, cool refinement instead of a full simulation
+    const preLaidOut = graphData.nodes.every(d => d.x !== undefined && d.y !== undefined);
+    if (preLaidOut) {
+      graphData.nodes.forEach(d => { d.x += width / 2; d.y += height / 2; });
+    }
+
     // Create simulation
     const simulation = d3.forceSimulation(graphData.nodes)
       .force("link", d3.forceLink(graphData.links).id(d => d.id).distance(100))
       .force("charge", d3.forceManyBody().strength(-300))
       .force("center", d3.forceCenter(width / 2, height / 2))
       .force("collision", d3.forceCollide().radius(30));
+    if (preLaidOut) {
+      simulation.alpha(0.1);
+    }
 
     // Create links
     const link = svg.append("g")
@@ -104,7 +115,7 @@ const GraphView = ({ api }) => {
 
     // Add tooltips
     node.append("title")
-      .text(d => `${d.type}: ${d.title || d.name || d.id || 'Unknown'}${d.tags ? `\nTags: ${d.tags.join(', ')}` : ''}`);
+      .text(d => `${d.type}: ${d.title || d.name || d.id || 'Unknown'}${d.tags && d.tags.length ? `\nTags: ${d.tags.join(', ')}` : ''}`);
 
     // Update positions on simulation tick
     simulation.on("tick", () => {
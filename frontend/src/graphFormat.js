@@ -0,0 +1,98 @@
+// Decoders for the compact graph payloads served with ?format=columnar
+// and ?format=binary (see backend/graph_app/formats.py for the layout).
+
+const EXTRA_NODE_COLUMNS = ['x', 'y', 'hops', 'cluster', 'size', 'external'];
+const EXTRA_LINK_COLUMNS = ['weight'];
+const BINARY_VERSION = 2;
+const LEVEL_NONE = -1;
+
+const pad4 = (n) => (n + 3) & ~3;
+
+const buildGraph = (strings, nodeCols, linkCols, meta) => {
+  const str = (i) => (i < 0 ? null : strings[i]);
+  const nodes = new Array(nodeCols.id.length);
+  for (let i = 0; i < nodes.length; i++) {
+    const node = {
+      id: str(nodeCols.id[i]),
+      title: str(nodeCols.title[i]),
+      type: str(nodeCols.type[i]),
+      level: nodeCols.level[i] === LEVEL_NONE ? null : nodeCols.level[i],
+      group: nodeCols.group[i],
+      tags: Array.from(nodeCols.tags[i], str),
+    };
+    EXTRA_NODE_COLUMNS.forEach((field) => {
+      if (nodeCols[field]) node[field] = nodeCols[field][i];
+    });
+    nodes[i] = node;
+  }
+  const links = new Array(linkCols.source.length);
+  for (let i = 0; i < links.length; i++) {
+    const link = {
+      source: nodes[linkCols.source[i]].id,
+      target: nodes[linkCols.target[i]].id,
+      type: str(linkCols.type[i]),
+    };
+    EXTRA_LINK_COLUMNS.forEach((field) => {
+      if (linkCols[field]) link[field] = linkCols[field][i];
+    });
+    links[i] = link;
+  }
+  return { nodes, links, meta };
+};
+
+export const decodeColumnarGraph = (data) =>
+  buildGraph(data.strings, data.nodes, data.links, data.meta || {});
+
+export const decodeBinaryGraph = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'BOTG') {
+    throw new Error('Not a binary graph payload');
+  }
+  if (view.getUint8(4) !== BINARY_VERSION) {
+    throw new Error(`Unsupported binary graph version ${view.getUint8(4)}`);
+  }
+  const stringCount = view.getUint32(8, true);
+  const nodeCount = view.getUint32(12, true);
+  const linkCount = view.getUint32(16, true);
+  const stringBytes = view.getUint32(20, true);
+  let offset = 24;
+
+  const offsets = new Uint32Array(buffer, offset, stringCount + 1);
+  offset += pad4(4 * (stringCount + 1));
+  const utf8 = new TextDecoder();
+  const bytes = new Uint8Array(buffer, offset, stringBytes);
+  const strings = new Array(stringCount);
+  for (let i = 0; i < stringCount; i++) {
+    strings[i] = utf8.decode(bytes.subarray(offsets[i], offsets[i + 1]));
+  }
+  offset += pad4(stringBytes);
+
+  const take = (Type, count) => {
+    const array = new Type(buffer, offset, count);
+    offset += pad4(count * Type.BYTES_PER_ELEMENT);
+    return array;
+  };
+  const nodeCols = {
+    id: take(Int32Array, nodeCount),
+    title: take(Int32Array, nodeCount),
+    type: take(Int32Array, nodeCount),
+    level: take(Int16Array, nodeCount),
+    group: take(Uint8Array, nodeCount),
+  };
+  const tagOffsets = take(Uint32Array, nodeCount + 1);
+  const tags = take(Int32Array, tagOffsets[nodeCount]);
+  nodeCols.tags = Array.from({ length: nodeCount }, (_, i) =>
+    tags.subarray(tagOffsets[i], tagOffsets[i + 1]));
+  const linkCols = {
+    source: take(Uint32Array, linkCount),
+    target: take(Uint32Array, linkCount),
+    type: take(Int32Array, linkCount),
+  };
+
+  const trailerLength = view.getUint32(offset, true);
+  const trailer = JSON.parse(utf8.decode(new Uint8Array(buffer, offset + 4, trailerLength)));
+  Object.assign(nodeCols, trailer.columns);
+  Object.assign(linkCols, trailer.link_columns);
+  return buildGraph(strings, nodeCols, linkCols, trailer.meta);
+};